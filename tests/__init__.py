@@ -0,0 +1 @@
+"""Tests for txtadv. Run them with python -m pytest or python -m unittest."""
@@ -0,0 +1,74 @@
+"""Tests for memory-mapped World archives."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.file import archive, snapshot
+
+
+def _world(count):
+    rooms = [txtadv.Room(f"Room {i}", f"Room number {i}.", [None] * 6, []) for i in range(count)]
+    for north, south in zip(rooms, rooms[1:]):
+        north.exits[1] = south
+        south.exits[0] = north
+    for i, room in enumerate(rooms):
+        txtadv.Item(f"stone {i}", "a stone", "A grey stone.", room)
+    return txtadv.World(rooms[0], name="Archived", stdoutin=False)
+
+
+class ArchiveTest(unittest.TestCase):
+    """Opening archives, and filling Rooms in and emptying them again."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "world.taarch")
+        archive.save_archive(_world(10), self.path)
+
+    def _open(self, cache_size):
+        world = archive.load_archive(self.path, cache_size=cache_size)
+        self.addCleanup(world.archive.close)
+        player = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        return world, player
+
+    def test_not_an_archive(self):
+        for data in (b"", b"nonsense", archive.ARCHIVE_MAGIC + b"\xff\xff" + bytes(16)):
+            with open(self.path, "wb") as file:
+                file.write(data)
+            self.assertRaises(snapshot.SnapshotError, archive.Archive, self.path)
+
+    def test_rooms_are_filled_in_when_used(self):
+        world, _player = self._open(100)
+        self.assertEqual(world.name, "Archived")
+        loaded = world.archive.loaded()
+        room = world.graph.find("room 5")
+        self.assertEqual(world.archive.loaded(), loaded)
+        self.assertEqual([item.name for item in room.items], ["stone 5"])
+        self.assertEqual(world.archive.loaded(), loaded + 1)
+
+    def test_eviction(self):
+        world, player = self._open(2)
+        for _ in range(9):
+            world.handle_input(player, "south")
+        self.assertEqual(player.loc.name, "Room 9")
+        self.assertGreater(world.archive.evictions, 0)
+        self.assertLessEqual(world.archive.loaded(), 3)
+        for _ in range(9):
+            world.handle_input(player, "north")
+        self.assertIs(player.loc, world.start)
+        self.assertEqual([item.name for item in player.loc.items], ["stone 0"])
+
+    def test_changed_rooms_are_kept(self):
+        world, player = self._open(1)
+        world.handle_input(player, "get stone")
+        for _ in range(5):
+            world.handle_input(player, "south")
+        self.assertEqual([item.name for item in world.start.items], [])
+        self.assertEqual([item.name for item in player.inventory.items], ["stone 0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
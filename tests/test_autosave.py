@@ -0,0 +1,89 @@
+"""Tests for autosaving and recovering a World."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.file import autosave, snapshot
+
+
+def _world():
+    north = txtadv.Room("North", "A room.", [None] * 6, [])
+    south = txtadv.Room("South", "Another room.", [None] * 6, [])
+    north.exits[1] = south
+    south.exits[0] = north
+    txtadv.Item("lamp", "a lamp", "A brass lamp.", north)
+    txtadv.Item("key", "a key", "A rusty key.", south)
+    world = txtadv.World(north, name="Test", stdoutin=False)
+    player = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+    return world, player
+
+
+def _state(world):
+    return ([(room.name, [exit_room and exit_room.name for exit_room in room.exits],
+              [item.name for item in room.items]) for room in world.graph.rooms()],
+            [(player.loc.name, [item.name for item in player.inventory.items])
+             for player in world.players])
+
+
+class AutosaveTest(unittest.TestCase):
+    """Autosaver and recover."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.world, self.player = _world()
+        self.saver = autosave.Autosaver(self.world, self.directory, interval=0, compact_after=3)
+        self.saver.start()
+        self.addCleanup(self.saver.close)
+
+    def _recover(self):
+        self.saver.close()
+        return autosave.recover(self.directory)
+
+    def test_nothing_to_recover(self):
+        self.assertIsNone(autosave.recover(os.path.join(self.directory, "nothing")))
+
+    def test_recover_journal(self):
+        self.world.handle_input(self.player, "get lamp")
+        self.world.handle_input(self.player, "south")
+        extra = txtadv.Room("East", "A new room.", [None] * 6, [])
+        self.player.loc.exits[2] = extra
+        txtadv.Item("coin", "a coin", "A gold coin.", extra)
+        self.world.handle_input(self.player, "look")
+        self.assertEqual(_state(self._recover()), _state(self.world))
+
+    def test_recover_after_compacting(self):
+        for direction in ("south", "north", "south", "north", "south"):
+            self.world.handle_input(self.player, direction)
+        self.assertGreater(self.saver.generation, 1)
+        recovered = self._recover()
+        self.assertEqual(_state(recovered), _state(self.world))
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_removed_items_stay_removed(self):
+        lamp = self.world.start.items.find("lamp")
+        self.world.start.remove_item(lamp)
+        self.world.handle_input(self.player, "look")
+        recovered = self._recover()
+        self.assertEqual([item.name for item in recovered.start.items], [])
+        self.assertEqual(_state(recovered), _state(self.world))
+
+    def test_cut_off_batch_is_left_out(self):
+        self.world.handle_input(self.player, "south")
+        self.saver.close()
+        journal = [name for name in os.listdir(self.directory) if name.endswith(".tajournal")][0]
+        with open(os.path.join(self.directory, journal), "rb+") as file:
+            file.truncate(os.path.getsize(file.name) - 3)
+        self.assertEqual(autosave.recover(self.directory).players[0].loc.name, "North")
+
+    def test_save_in_background(self):
+        file_name = os.path.join(self.directory, "saves", "slot.tasnap")
+        autosave.save_in_background(self.world, file_name).join()
+        self.assertEqual(_state(snapshot.load_world(file_name)), _state(self.world))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for the chat log."""
+import io
+import unittest
+
+import txtadv
+from txtadv.chat import ChatLog
+
+
+def _rooms(count):
+    return [txtadv.Room(f"Room {i}", "A room.", [None] * 6, []) for i in range(count)]
+
+
+class ChatLogTest(unittest.TestCase):
+    """ChatLog channels, pages and search."""
+
+    def test_bounded(self):
+        log = ChatLog(maxlen=3, room_maxlen=2)
+        room, = _rooms(1)
+        for i in range(5):
+            log.add(f"message {i}", room)
+        self.assertEqual([message.text for message in log], ["message 2", "message 3", "message 4"])
+        self.assertEqual([message.text for message in log.channel(room)],
+                         ["message 3", "message 4"])
+        self.assertEqual(log.search("message 0"), [])
+        self.assertNotIn("0", log.words)
+
+    def test_quiet_rooms_are_forgotten(self):
+        log = ChatLog(max_rooms=2)
+        first, second, third = _rooms(3)
+        log.add("hello", first)
+        log.add("hello", second)
+        log.add("hello again", first)
+        log.add("hello", third)
+        self.assertEqual(list(log.rooms), [first, third])
+        self.assertEqual(len(log.channel(first)), 2)
+        self.assertEqual(log.channel(second), ())
+
+    def test_pages(self):
+        log = ChatLog()
+        for i in range(5):
+            log.add(f"message {i}")
+        self.assertEqual([message.text for message in log.page(1, size=2)],
+                         ["message 3", "message 4"])
+        self.assertEqual([message.text for message in log.page(3, size=2)], ["message 0"])
+        self.assertEqual(log.page(4, size=2), [])
+        self.assertEqual(log.pages(size=2), 3)
+        self.assertEqual([message.text for message in log.last(2)], ["message 3", "message 4"])
+
+    def test_search(self):
+        log = ChatLog()
+        room, other = _rooms(2)
+        log.add("Hello, world!", room)
+        log.add("hello there", other)
+        log.add("goodbye world")
+        self.assertEqual([message.text for message in log.search("hello!")],
+                         ["Hello, world!", "hello there"])
+        self.assertEqual([message.text for message in log.search("WORLD hello")],
+                         ["Hello, world!"])
+        self.assertEqual([message.text for message in log.search("hello", other)],
+                         ["hello there"])
+        self.assertEqual(log.search("?!"), [])
+        self.assertEqual(log.search("hello nobody"), [])
+
+    def test_chat_search_command(self):
+        room, = _rooms(1)
+        world = txtadv.World(room, name="Test", stdoutin=False)
+        player = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        world.chat.add("hello everyone", room)
+        world.handle_input(player, "chat search hello!")
+        self.assertIn("hello everyone", player.outstream.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for styles and Styled text."""
+import io
+import unittest
+
+import txtadv
+from txtadv import color
+from txtadv.color import Styled, register_style, style, RED, BLUE, RESET
+from txtadv.messaging import info, setinfomode, no_origin, origin
+
+
+class StyleTest(unittest.TestCase):
+    """Working out the escape sequence of a style."""
+
+    def test_styles(self):
+        self.assertEqual(style("red"), RED)
+        self.assertEqual(style(" Blue "), BLUE)
+        self.assertEqual(style("rgb(255, 128, 0)"), color.rgb(255, 128, 0))
+        self.assertEqual(style("rgb(300,0,0)"), color.rgb(255, 0, 0))
+        self.assertEqual(style("#ff8000"), color.rgb(255, 128, 0))
+        self.assertEqual(style(RED), RED)
+        for name in ("mauve", "#zzzzzz", "rgb(1,2)"):
+            with self.assertRaises(ValueError):
+                style(name)
+
+    def test_register_style(self):
+        register_style("test-exit", "#00ff00")
+        self.assertEqual(style("test-exit"), color.rgb(0, 255, 0))
+        self.assertEqual(color.colored("north", "test-exit"), color.rgb(0, 255, 0) + "north" + RESET)
+        with self.assertRaises(ValueError):
+            register_style("test-broken", "mauve")
+
+
+class StyledTest(unittest.TestCase):
+    """Text with a style for each span."""
+
+    def test_render(self):
+        text = Styled("You see ").add("a lamp", "blue").add(".")
+        self.assertEqual(text.plain(), "You see a lamp.")
+        self.assertEqual(text.render(), "You see " + BLUE + "a lamp" + RESET + ".")
+        self.assertEqual(str(text), text.render())
+        self.assertEqual(len(text), len("You see a lamp."))
+        self.assertEqual(Styled().plain(), "")
+
+    def test_add(self):
+        text = "> " + Styled("lamp", "red") + "\n"
+        self.assertIsInstance(text, Styled)
+        self.assertEqual(text.render(), "> " + RED + "lamp" + RESET + "\n")
+        both = Styled("a", "red") + Styled("b", "blue")
+        self.assertEqual(both.render(), RED + "a" + RESET + BLUE + "b" + RESET)
+
+    def test_sent_to_players(self):
+        setinfomode(no_origin)
+        self.addCleanup(setinfomode, origin)
+        room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        world = txtadv.World(room, name="Test", stdoutin=False)
+        plain = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        plain.colored = False
+        fancy = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        fancy.colored = True
+        message = Styled("a ").add("lamp", "blue")
+        info(message, plain)
+        info(message, fancy)
+        self.assertEqual(plain.outstream.getvalue(), "a lamp")
+        self.assertIn(BLUE + "lamp" + RESET, fancy.outstream.getvalue())
+        # What's kept of what a Player was sent is always plain.
+        self.assertEqual(list(fancy.transcript.all()), ["a lamp"])
+
+
+if __name__ == "__main__":
+    unittest.main()
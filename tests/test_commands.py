@@ -0,0 +1,98 @@
+"""Tests for finding Commands by alias, and for the stats command."""
+import io
+import re
+import unittest
+
+import txtadv
+from txtadv import commands, stats
+
+
+def _world():
+    room = txtadv.Room("Room", "A room.", [None] * 6, [])
+    room.exits[1] = txtadv.Room("South", "Another room.", [None] * 6, [])
+    world = txtadv.World(room, name="Test", stdoutin=False)
+    player = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+    return world, player
+
+
+class CommandListTest(unittest.TestCase):
+    """CommandList.find and CommandList.get."""
+
+    def test_find_by_prefix(self):
+        cmds = commands.CommandList(commands.globalcmds)
+        self.assertEqual(cmds.find("look around").name, "look")
+        self.assertEqual(cmds.find("LOOK").name, "look")
+        self.assertIsNone(cmds.find("?!"))
+
+    def test_first_command_wins(self):
+        first = commands.Command("first", lambda *args: None, "", "", aliases=["x"])
+        second = commands.Command("second", lambda *args: None, "", "", aliases=["x"])
+        cmds = commands.CommandList([first, second])
+        self.assertIs(cmds.find("x"), first)
+        self.assertIs(cmds.get("x"), first)
+
+    def test_index_follows_changes(self):
+        cmds = commands.CommandList()
+        version = cmds.version
+        cmd = commands.Command("zap", lambda *args: None, "", "")
+        cmds.append(cmd)
+        self.assertGreater(cmds.version, version)
+        self.assertIs(cmds.find("zap it"), cmd)
+        cmds.remove(cmd)
+        self.assertIsNone(cmds.find("zap it"))
+
+
+class ResolveTest(unittest.TestCase):
+    """World.resolve and the commands that use it."""
+
+    def test_exact_alias_beats_prefix(self):
+        world, _player = _world()
+        self.assertEqual(world.resolve("say hello there").name, "say")
+        self.assertEqual(world.resolve("s").name, "south")
+
+    def test_again_redoes_the_last_command(self):
+        world, player = _world()
+        world.handle_input(player, "say hello there")
+        start = player.loc
+        world.handle_input(player, "again")
+        self.assertIs(player.loc, start)
+        self.assertEqual(len(world.chat.messages), 2)
+
+    def test_entity_exec_uses_exact_alias(self):
+        world, _player = _world()
+        entity = txtadv.Entity.__new__(txtadv.Entity)
+        txtadv.Player.__init__(entity, world.start, None, txtadv._NullStream(), #pylint: disable=protected-access
+                               colored=False, buffered=False)
+        world.add_entity(entity)
+        entity.exec("say hi", world)
+        self.assertIs(entity.loc, world.start)
+        self.assertEqual(len(world.chat.messages), 1)
+
+
+class StatsTest(unittest.TestCase):
+    """The stats command."""
+
+    def tearDown(self):
+        stats.disable()
+
+    def test_default_table_has_commands(self):
+        world, player = _world()
+        player.admin = True
+        stats.enable()
+        world.handle_input(player, "look")
+        player.outstream.seek(0)
+        player.outstream.truncate()
+        world.handle_input(player, "stats")
+        tables = {}
+        for line in re.sub(r"\x1b\[[0-9;]*m", "", player.outstream.getvalue()).splitlines():
+            if line.startswith("  "):
+                tables[kind].append(line.split()[0])
+            else:
+                kind = line.split()[0]
+                tables[kind] = []
+        self.assertEqual(list(tables), list(stats.KINDS))
+        self.assertEqual(tables[stats.COMMAND], ["look"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests for the EventBus and how Subscribers are run."""
+import asyncio
+import gc
+import threading
+import unittest
+
+import txtadv
+from txtadv.events import EventBus, Subscriber, RUN_IN_THREAD, RUN_AS_TASK
+
+
+class _Thing:
+    """Something that can trigger events."""
+
+
+class _Box(_Thing):
+    """A kind of _Thing."""
+
+
+class _Lamp(txtadv.Item):
+    """An Item class of its own, so that subscribing to every one of it doesn't reach other tests."""
+    __slots__ = ()
+
+
+class EventBusTest(unittest.TestCase):
+    """Events reaching the Subscribers of their source and of its classes only."""
+
+    def test_per_source(self):
+        bus = EventBus()
+        first, second = _Thing(), _Thing()
+        called = []
+        bus.subscribe("poke", Subscriber(called.append), first)
+        bus.trigger("poke", second, "second")
+        bus.trigger("poke", first, "first")
+        self.assertEqual(called, ["first"])
+
+    def test_per_class(self):
+        bus = EventBus()
+        called = []
+        bus.subscribe("poke", Subscriber(called.append), source_class=_Box)
+        bus.trigger("poke", _Thing(), "thing")
+        bus.trigger("poke", _Box(), "box")
+        self.assertEqual(called, ["box"])
+
+    def test_unsubscribe(self):
+        bus = EventBus()
+        thing = _Thing()
+        called = []
+        sub = Subscriber(called.append)
+        bus.subscribe("poke", sub, thing)
+        bus.unsubscribe("poke", sub, thing)
+        bus.trigger("poke", thing, "thing")
+        self.assertEqual(called, [])
+        self.assertEqual(sub.events, [])
+
+    def test_sources_are_let_go(self):
+        bus = EventBus()
+        thing = _Thing()
+        bus.subscribe("poke", Subscriber(print), thing)
+        del thing
+        gc.collect()
+        self.assertEqual(len(bus._by_source["poke"]), 0) #pylint: disable=protected-access
+
+    def test_items(self):
+        room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        lamp = _Lamp("lamp", "A lamp.", "A brass lamp.", room)
+        other = _Lamp("lamp", "A lamp.", "A tin lamp.", room)
+        own, every = [], []
+        lamp.on_event("use", Subscriber(own.append))
+        _Lamp.on_any_event("use", Subscriber(every.append))
+        txtadv.Item("rock", "A rock.", "A rock.", room).use()
+        other.use()
+        lamp.use()
+        self.assertEqual(own, ["lamp"])
+        self.assertEqual(every, ["lamp", "lamp"])
+
+
+class RunInTest(unittest.TestCase):
+    """Subscribers that don't run on the game thread."""
+
+    def test_run_in_thread(self):
+        done = threading.Event()
+        threads = []
+
+        def slow(value):
+            threads.append((threading.current_thread(), value))
+            done.set()
+
+        Subscriber(slow, RUN_IN_THREAD).dispatch("saved")
+        self.assertTrue(done.wait(5))
+        self.assertIsNot(threads[0][0], threading.current_thread())
+        self.assertEqual(threads[0][1], "saved")
+
+    def test_run_as_task(self):
+        called = []
+
+        async def later(value):
+            called.append(value)
+
+        async def trigger():
+            Subscriber(later, RUN_AS_TASK).dispatch("task")
+            Subscriber(called.append, RUN_AS_TASK).dispatch("call")
+            self.assertEqual(called, [])
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        asyncio.run(trigger())
+        self.assertEqual(sorted(called), ["call", "task"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Tests for RoomGraph."""
+import os
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.file import archive
+
+
+def _rooms(count):
+    rooms = [txtadv.Room(f"Room {i}", "A room.", [None] * 6, []) for i in range(count)]
+    for north, south in zip(rooms, rooms[1:]):
+        north.exits[1] = south
+        south.exits[0] = north
+    return rooms
+
+
+class RoomGraphTest(unittest.TestCase):
+    """Paths, and when they're worked out again."""
+
+    def test_path(self):
+        rooms = _rooms(4)
+        world = txtadv.World(rooms[0], stdoutin=False)
+        self.assertEqual(world.graph.path(rooms[0], rooms[3]), ["south"] * 3)
+        self.assertIs(world.graph.find("room 2"), rooms[2])
+        self.assertEqual(len(world.graph.rooms()), 4)
+
+    def test_only_reachable_exits_go_stale(self):
+        rooms = _rooms(3)
+        world = txtadv.World(rooms[0], stdoutin=False)
+        world.graph.rooms()
+        version = world.graph.version
+        elsewhere = _rooms(2)
+        elsewhere[0].exits[4] = elsewhere[1]
+        txtadv.Player(rooms[0], None, txtadv._NullStream()) #pylint: disable=protected-access
+        self.assertEqual(world.graph.version, version)
+        rooms[2].exits[2] = elsewhere[0]
+        self.assertGreater(world.graph.version, version)
+        self.assertEqual(world.graph.path(rooms[0], elsewhere[1]), ["south", "south", "east", "south"])
+
+    def test_renamed_room_is_found_by_its_new_name(self):
+        rooms = _rooms(3)
+        world = txtadv.World(rooms[0], stdoutin=False)
+        self.assertIs(world.graph.find("room 2"), rooms[2])
+        rooms[2].name = "Cellar"
+        self.assertIsNone(world.graph.find("room 2"))
+        self.assertIs(world.graph.find("cellar"), rooms[2])
+
+    def test_unreachable_paths_go_stale(self):
+        rooms = _rooms(2)
+        world = txtadv.World(rooms[0], stdoutin=False)
+        elsewhere = _rooms(3)
+        self.assertEqual(world.graph.path(elsewhere[0], elsewhere[2]), ["south", "south"])
+        elsewhere[0].exits[4] = elsewhere[2]
+        self.assertEqual(world.graph.path(elsewhere[0], elsewhere[2]), ["up"])
+
+    def test_archived_rooms_are_not_loaded(self):
+        rooms = _rooms(20)
+        fd, path = tempfile.mkstemp(suffix=".taarch")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        archive.save_archive(txtadv.World(rooms[0], stdoutin=False), path)
+        opened = archive.Archive(path)
+        self.addCleanup(opened.close)
+        world = opened.world()
+        loads = opened.loads
+        self.assertEqual(len(world.graph.rooms()), 20)
+        self.assertEqual(world.graph.path(world.start, world.graph.find("room 19")), ["south"] * 19)
+        self.assertEqual(opened.loads, loads)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for bounded histories that spill to disk."""
+import io
+import os
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.history import History
+
+
+class HistoryTest(unittest.TestCase):
+    """History and the files it spills to."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.path = os.path.join(self.directory, "player.commands.jsonl")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _history(self, entries, maxlen=2, path=None):
+        history = History(maxlen, self.path if path is None else path)
+        history.extend(entries)
+        return history
+
+    def test_spill(self):
+        history = self._history(["look", "n", "get lamp", "s"])
+        self.assertEqual(list(history), ["get lamp", "s"])
+        self.assertEqual(history.spilled, 2)
+        self.assertEqual(list(history.all()), ["look", "n", "get lamp", "s"])
+        history.close()
+        history.append("wait")
+        self.assertEqual(list(history.all()), ["look", "n", "get lamp", "s", "wait"])
+
+    def test_no_limit(self):
+        history = self._history(["look", "n", "s"], maxlen=None)
+        self.assertEqual(list(history.all()), ["look", "n", "s"])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_earlier_run_is_forgotten(self):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('"wait"\n"wait"\n')
+        history = self._history(["look", "n", "s"])
+        self.assertEqual(list(history.all()), ["look", "n", "s"])
+
+    def test_one_file_each(self):
+        first = self._history(["look", "n", "s"])
+        second = self._history(["wait", "wait", "wait"])
+        self.assertNotEqual(first.path, second.path)
+        self.assertEqual(list(first.all()), ["look", "n", "s"])
+        self.assertEqual(list(second.all()), ["wait", "wait", "wait"])
+
+    def test_players_with_the_same_name(self):
+        room = txtadv.Room("Room", "A room.", [None] * 6, [])
+        old_dir, old_size = txtadv.Player.history_dir, txtadv.Player.history_size
+        txtadv.Player.history_dir, txtadv.Player.history_size = self.directory, 1
+        try:
+            players = [txtadv.Player(room, io.StringIO(), io.StringIO(), name="Bob Smith")
+                       for _ in range(2)]
+        finally:
+            txtadv.Player.history_dir, txtadv.Player.history_size = old_dir, old_size
+        for number, player in enumerate(players):
+            player.commands.extend([f"say {number}", "look"])
+        self.assertEqual([list(player.commands.all()) for player in players],
+                         [["say 0", "look"], ["say 1", "look"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
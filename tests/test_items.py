@@ -0,0 +1,99 @@
+"""Tests for the indexes of ItemList."""
+import unittest
+
+import txtadv
+
+
+def _room(name="Room"):
+    return txtadv.Room(name, "A room.", [None] * 6, [])
+
+
+def _item(name, room):
+    return txtadv.Item(name, "An item", "A very ordinary item", room)
+
+
+class ItemListTest(unittest.TestCase):
+    """ItemList keeps its order and its name index in step with its Items."""
+
+    def test_order_and_names(self):
+        room = _room()
+        lamp = _item("lamp", room)
+        first = _item("key", room)
+        second = _item("key", room)
+        self.assertEqual(list(room.items), [lamp, first, second])
+        self.assertEqual(room.items.named("key"), [first, second])
+        self.assertIs(room.items.find("lamp"), lamp)
+        room.items.remove(first)
+        self.assertEqual(room.items.named("key"), [second])
+        self.assertIs(room.items.find("key"), second)
+        self.assertNotIn(first, room.items)
+        self.assertRaises(ValueError, room.items.remove, first)
+
+    def test_move(self):
+        room, other = _room(), _room("Other")
+        lamp = _item("lamp", room)
+        lamp.move(other)
+        self.assertNotIn("lamp", room.items)
+        self.assertIs(other.items.find("lamp"), lamp)
+
+    def test_rename_then_move(self):
+        room, other = _room(), _room("Other")
+        lamp = _item("lamp", room)
+        _item("lamp", room)
+        lamp.name = "torch"
+        self.assertIs(room.items.find("torch"), lamp)
+        self.assertEqual(len(room.items.named("lamp")), 1)
+        lamp.move(other)
+        self.assertEqual(len(room.items), 1)
+        self.assertNotIn("torch", room.items)
+        self.assertEqual(len(room.items.named("lamp")), 1)
+        self.assertIs(other.items.find("torch"), lamp)
+
+    def test_rename_keeps_order(self):
+        room = _room()
+        items = [_item(name, room) for name in ("a", "b", "c")]
+        items[1].name = "d"
+        self.assertEqual(list(room.items), items)
+        self.assertEqual(room.items.matching(("d",)), [items[1]])
+        self.assertEqual(room.items.matching(("b",)), [])
+
+    def test_name_index_made_when_searched(self):
+        room = _room()
+        first = _item("key", room)
+        lamp = _item("lamp", room)
+        room.items.remove(lamp)
+        second = _item("key", room)
+        self.assertEqual(room.items.named("key"), [first, second])
+        first.name = "old key"
+        self.assertEqual(room.items.named("key"), [second])
+        room.items.clear()
+        self.assertEqual(len(room.items), 0)
+        self.assertIsNone(room.items.find("key"))
+        self.assertRaises(ValueError, room.items.remove, first)
+        room.items.append(first)
+        self.assertIs(room.items.find("old key"), first)
+
+
+class RoomContainersTest(unittest.TestCase):
+    """A Room only makes its ExitList and ItemList when they're used."""
+
+    def test_lazy_exits_and_items(self):
+        room, other = _room(), _room("Other")
+        self.assertIsInstance(room.exits, txtadv.ExitList)
+        self.assertIs(room.exits.owner, room)
+        room.exits[0] = other
+        self.assertEqual(room.exits.version, 1)
+        self.assertIsInstance(other.items, txtadv.ItemList)
+        self.assertEqual(len(other.items), 0)
+
+    def test_made_with_items(self):
+        room = _room()
+        lamp = _item("lamp", room)
+        other = txtadv.Room("Other", "A room.", [None] * 6, [lamp])
+        self.assertEqual(list(other.items), [lamp])
+        items = txtadv.ItemList()
+        self.assertIs(txtadv.Room("Third", "A room.", [None] * 6, items).items, items)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the undo journal and the undo command."""
+import io
+import unittest
+
+import txtadv
+from txtadv import journal
+
+
+def _out(player):
+    text = player.outstream.getvalue()
+    player.outstream.seek(0)
+    player.outstream.truncate()
+    return text
+
+
+class UndoTest(unittest.TestCase):
+    """Journal.undo and the undo command."""
+
+    def setUp(self):
+        self.hall = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        self.study = txtadv.Room("Study", "A study.", [None] * 6, [])
+        self.hall.exits[0] = self.study
+        self.study.exits[1] = self.hall
+        self.lamp = txtadv.Item("lamp", "A lamp", "A brass lamp", self.hall)
+        self.world = txtadv.World(self.hall, name="Test", stdoutin=False)
+        self.alice = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        self.bob = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+
+    def test_undo_get_and_move(self):
+        self.world.handle_input(self.alice, "get lamp")
+        self.world.handle_input(self.alice, "n")
+        self.assertIs(self.alice.loc, self.study)
+        self.world.handle_input(self.alice, "undo")
+        self.assertIs(self.alice.loc, self.hall)
+        self.world.handle_input(self.alice, "undo")
+        self.assertIs(self.lamp.loc, self.hall)
+        self.assertIn(self.lamp, self.hall.items)
+        self.assertNotIn(self.lamp, self.alice.inventory.items)
+        _out(self.alice)
+        self.world.handle_input(self.alice, "undo")
+        self.assertIn("nothing to undo", _out(self.alice))
+
+    def test_commands_that_change_nothing_are_not_kept(self):
+        self.world.handle_input(self.alice, "look")
+        self.assertFalse(self.world.journal.undo(self.alice))
+
+    def test_conflict_is_reported_and_dropped(self):
+        self.world.handle_input(self.alice, "get lamp")
+        self.world.handle_input(self.alice, "n")
+        self.world.handle_input(self.alice, "drop lamp")
+        self.world.handle_input(self.bob, "n")
+        self.world.handle_input(self.bob, "get lamp")
+        _out(self.alice)
+        self.world.handle_input(self.alice, "undo")
+        self.assertIn("can't be undone", _out(self.alice))
+        self.assertIn(self.lamp, self.bob.inventory.items)
+        # The drop is forgotten, so the next undo goes back past it.
+        self.world.handle_input(self.alice, "undo")
+        self.assertIn("Undone", _out(self.alice))
+        self.assertIs(self.alice.loc, self.hall)
+        self.world.handle_input(self.alice, "undo")
+        self.assertIn("can't be undone", _out(self.alice))
+        self.world.handle_input(self.alice, "undo")
+        self.assertIn("nothing to undo", _out(self.alice))
+
+    def test_item_taken_out_of_its_room(self):
+        self.world.handle_input(self.alice, "get lamp")
+        self.alice.inventory.remove_item(self.lamp)
+        with self.assertRaises(journal.UndoConflict):
+            self.world.journal.undo(self.alice)
+        self.assertFalse(self.world.journal.undo(self.alice))
+
+    def test_undo_isnt_recorded(self):
+        self.world.handle_input(self.alice, "n")
+        self.world.handle_input(self.alice, "undo")
+        self.world.handle_input(self.alice, "undo")
+        self.assertIs(self.alice.loc, self.hall)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Tests for buffered Player output."""
+import io
+import unittest
+
+import txtadv
+from txtadv.messaging import info, flush_pending, setinfomode, no_origin, origin
+
+
+class _Writes(io.StringIO):
+    """A stream that counts the writes that aren't empty."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        if s:
+            self.writes += 1
+        return super().write(s)
+
+
+class BufferTest(unittest.TestCase):
+    """Output being held back until the end of each command."""
+
+    def setUp(self):
+        self.hall = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        self.world = txtadv.World(self.hall, name="Test", stdoutin=False)
+        setinfomode(no_origin)
+        self.addCleanup(setinfomode, origin)
+
+    def _player(self, buffered=True):
+        player = self.world.create_player(io.StringIO(), _Writes(), buffered=buffered)
+        player.colored = False
+        return player
+
+    def test_buffered_until_flushed(self):
+        player = self._player()
+        info("one\n", player)
+        info("two\n", player)
+        self.assertEqual(player.outstream.getvalue(), "")
+        flush_pending()
+        self.assertEqual(player.outstream.getvalue(), "one\ntwo\n")
+        self.assertEqual(player.outstream.writes, 1)
+        self.assertEqual(player.buffer, [])
+
+    def test_unbuffered_written_straight_away(self):
+        player = self._player(buffered=False)
+        info("one\n", player)
+        self.assertEqual(player.outstream.getvalue(), "one\n")
+        info("two\n", player)
+        self.assertEqual(player.outstream.writes, 2)
+
+    def test_flushed_by_hand_is_not_written_twice(self):
+        player = self._player()
+        info("one\n", player)
+        player.flush()
+        flush_pending()
+        self.assertEqual(player.outstream.getvalue(), "one\n")
+        self.assertEqual(player.outstream.writes, 1)
+
+    def test_one_write_per_command(self):
+        alice = self._player()
+        bob = self._player()
+        self.world.handle_input(alice, "look")
+        self.assertIn("A hall.", alice.outstream.getvalue())
+        self.assertEqual(alice.outstream.writes, 1)
+        # Everyone a command sent something to is flushed at the end of it, not just who typed it.
+        self.world.handle_input(alice, "say hello")
+        self.assertIn("hello", bob.outstream.getvalue())
+        self.assertEqual(bob.outstream.writes, 1)
+        self.assertEqual(alice.outstream.writes, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
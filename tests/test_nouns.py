@@ -0,0 +1,69 @@
+"""Tests for working out which Items a phrase means."""
+import unittest
+
+import txtadv
+from txtadv import nouns
+
+
+class NounsTest(unittest.TestCase):
+    """txtadv.nouns and ItemList.matching."""
+
+    def setUp(self):
+        self.room = txtadv.Room("Room", "A room.", [None] * 6, [])
+        self.rusty = txtadv.Item("a rusty key", "A key", "A rusty key", self.room)
+        self.lamp = txtadv.Item("brass lamp", "A lamp", "A brass lamp", self.room)
+        self.keys = txtadv.Item("keys", "Keys", "A bunch of keys", self.room)
+        self.brass = txtadv.Item("brass key", "A key", "A brass key", self.room)
+
+    def test_words(self):
+        self.assertEqual(nouns.words("The Rusty key"), ("rusty", "key"))
+        self.assertEqual(nouns.parse("all the keys"), (True, ("keys",)))
+
+    def test_plural_matches_both(self):
+        self.assertEqual(self.room.items.matching(("keys",)), [self.rusty, self.keys, self.brass])
+        self.assertEqual(self.room.items.matching(("brass", "keys")), [self.brass])
+        self.assertEqual(self.room.items.matching(("lamps",)), [self.lamp])
+        self.assertEqual(self.room.items.matching(("brass", "lamp", "key")), [])
+
+    def test_resolve(self):
+        self.assertEqual(nouns.resolve("the rusty key", self.room.items), ([self.rusty], False))
+        self.assertEqual(nouns.resolve("keys", self.room.items), ([self.keys], False))
+        self.assertEqual(nouns.resolve("key", self.room.items), ([self.rusty, self.brass], False))
+        self.assertEqual(nouns.resolve("all keys", self.room.items),
+                         ([self.rusty, self.keys, self.brass], True))
+        self.assertEqual(nouns.resolve("all", self.room.items)[0], list(self.room.items))
+
+    def test_resolve_follows_renames(self):
+        self.room.items.matching(("key",))
+        self.rusty.name = "old lamp"
+        self.assertEqual(nouns.resolve("all lamps", self.room.items),
+                         ([self.rusty, self.lamp], True))
+        self.assertEqual(nouns.resolve("all keys", self.room.items), ([self.keys, self.brass], True))
+
+    def test_repeated_word(self):
+        old_map = txtadv.Item("a very very old map", "A map", "A very old map", self.room)
+        study = txtadv.Room("Study", "A study.", [None] * 6, [])
+        self.room.items.matching(("lamp",))
+        old_map.name = "a very very very old map"
+        self.assertEqual(nouns.resolve("old map", self.room.items), ([old_map], False))
+        old_map.move(study)
+        self.assertEqual(self.room.items.matching(("very",)), [])
+        study.items.matching(("map",))
+        old_map.name = "a very new map"
+        self.assertEqual(study.items.matching(("very", "new")), [old_map])
+        old_map.move(self.room)
+        self.assertEqual(study.items.matching(("very",)), [])
+
+    def test_resolve_names(self):
+        names = ["a rusty key", "brass key", "keys"]
+        self.assertEqual(nouns.resolve_names("rusty", names), ["a rusty key"])
+        self.assertEqual(nouns.resolve_names("key", names), [])
+        self.assertEqual(nouns.resolve_names("all keys", names), names)
+        self.assertEqual(nouns.resolve_names("", names), [])
+
+    def test_choices(self):
+        self.assertEqual(nouns.choices([self.rusty, self.brass]), "a rusty key or brass key")
+
+
+if __name__ == "__main__":
+    unittest.main()
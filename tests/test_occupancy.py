@@ -0,0 +1,79 @@
+"""Tests for World.occupants, the index of who is in which Room."""
+import io
+import os
+import tempfile
+import unittest
+
+import txtadv
+
+
+class OccupancyTest(unittest.TestCase):
+    """World.occupants follows Players and Entities around."""
+
+    def setUp(self):
+        self.hall = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        self.study = txtadv.Room("Study", "A study.", [None] * 6, [])
+        self.hall.exits[0] = self.study
+        self.study.exits[1] = self.hall
+        self.world = txtadv.World(self.hall, name="Test", stdoutin=False)
+        self.alice = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        self.bob = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _entity(self, *lines, room=None):
+        file_name = os.path.join(self._directory.name, f"entity{len(self.world.entities)}.txt")
+        with open(file_name, "w", encoding="ascii") as file:
+            file.write("\n".join(lines) + "\n")
+        entity = txtadv.Entity(room or self.hall, file_name)
+        self.world.add_entity(entity)
+        return entity
+
+    def test_players(self):
+        self.assertEqual(self.world.occupants_of(self.hall), [self.alice, self.bob])
+        self.world.handle_input(self.alice, "n")
+        self.assertEqual(self.world.occupants_of(self.hall), [self.bob])
+        self.assertEqual(self.world.occupants_of(self.study), [self.alice])
+        self.world.remove_player(self.bob)
+        self.assertNotIn(self.hall, self.world.occupants)
+
+    def test_local_chat_only_reaches_the_room(self):
+        self.world.handle_input(self.alice, "n")
+        self.world.handle_input(self.alice, "say hello")
+        self.assertIn("says: hello", self.alice.outstream.getvalue())
+        self.assertNotIn("hello", self.bob.outstream.getvalue())
+
+    def test_announce_moves(self):
+        self.world.announce_moves = True
+        self.world.handle_input(self.alice, "n")
+        self.assertIn("leaves", self.bob.outstream.getvalue())
+
+    def test_entities(self):
+        entered = []
+        self.study.on_event("enter", txtadv.Subscriber(entered.append))
+        entity = self._entity("n", "wait", "repeat")
+        self.assertIs(entity.world, self.world)
+        self.assertIn(entity, self.world.occupants_of(self.hall))
+        self.world.advance()
+        self.assertIs(entity.loc, self.study)
+        self.assertEqual(self.world.occupants_of(self.study), [entity])
+        self.assertEqual(entered, [entity])
+        self.world.remove_entity(entity)
+        self.assertIsNone(entity.world)
+        self.assertNotIn(self.study, self.world.occupants)
+
+    #pylint: disable=protected-access
+    def test_entity_moves_wake_listeners(self):
+        listener = self._entity("if said hi {", "say hello", "}", "wait", "repeat")
+        walker = self._entity("wait", "repeat", room=self.study)
+        self.world.advance()
+        self.world.advance()
+        self.assertIn(listener, self.world._listens)
+        walker.move(self.hall)
+        self.assertNotIn(listener, self.world._listens)
+
+
+if __name__ == "__main__":
+    unittest.main()
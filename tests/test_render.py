@@ -0,0 +1,45 @@
+"""Tests for the look cache in txtadv.commands.render_room."""
+import unittest
+
+import txtadv
+from txtadv import commands
+
+
+class RenderRoomTest(unittest.TestCase):
+    """render_room and when it has to put the Room together again."""
+
+    def setUp(self):
+        self.room = txtadv.Room("Room", "A room.", [None] * 6, [])
+        self.room.exits[0] = txtadv.Room("North", "Another room.", [None] * 6, [])
+        self.key = txtadv.Item("rusty key", "A key", "A rusty key", self.room)
+
+    def test_cached(self):
+        first = commands.render_room(self.room, False)
+        self.assertIn("rusty key", first)
+        self.assertIs(commands.render_room(self.room, False), first)
+        self.assertIn("rusty key", commands.render_room(self.room, True))
+
+    def test_items_change(self):
+        commands.render_room(self.room, False)
+        txtadv.Item("lamp", "A lamp", "A brass lamp", self.room)
+        self.assertIn("lamp", commands.render_room(self.room, False))
+        self.room.items.remove(self.key)
+        self.assertNotIn("rusty key", commands.render_room(self.room, False))
+
+    def test_item_renamed(self):
+        commands.render_room(self.room, False)
+        commands.render_room(self.room, True)
+        self.key.name = "shiny key"
+        self.assertIn("shiny key", commands.render_room(self.room, False))
+        self.assertNotIn("rusty key", commands.render_room(self.room, True))
+
+    def test_exits_and_desc_change(self):
+        commands.render_room(self.room, False)
+        self.room.exits[2] = txtadv.Room("East", "Another room.", [None] * 6, [])
+        self.assertIn("east", commands.render_room(self.room, False).lower())
+        self.room.desc = "A different room."
+        self.assertIn("A different room.", commands.render_room(self.room, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for capturing sessions and replaying them with txtadv.replay."""
+import io
+import os
+import tempfile
+import unittest
+
+import txtadv
+from txtadv import replay
+
+
+def _build_world():
+    room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+    room.exits[0] = txtadv.Room("Study", "A study.", [None] * 6, [])
+    room.exits[0].exits[1] = room
+    txtadv.Item("rusty key", "A key", "A rusty key", room)
+    txtadv.Item("brass lamp", "A lamp", "A brass lamp", room.exits[0])
+    return txtadv.World(room, name="Test", stdoutin=False)
+
+
+def _play(world, sessions):
+    """Runs each Player's lines one at a time, a turn after every round, like World.run."""
+    players = []
+    for name in sessions:
+        player = txtadv.Player(world.start, io.StringIO(), io.StringIO(), colored=False,
+                               name=name, buffered=False)
+        world.add_player(player)
+        players.append(player)
+    for turn in range(max(len(lines) for lines in sessions.values())):
+        for player in players:
+            lines = sessions[player.name]
+            if turn < len(lines):
+                world.handle_input(player, lines[turn])
+        world.advance()
+
+
+SESSIONS = {
+    "alice": ["get key", "n", "get lamp", "say got it"],
+    "bob": ["n", "s", "look"],
+}
+
+
+class ReplayTest(unittest.TestCase):
+    """capture, replay and verify."""
+
+    def setUp(self):
+        world = _build_world()
+        world.rng.seed(7)
+        _play(world, SESSIONS)
+        self.captured = replay.capture(world, seed=7)
+
+    def test_capture(self):
+        self.assertEqual(self.captured["players"], SESSIONS)
+        self.assertEqual(self.captured["state"]["players"]["alice"]["inventory"],
+                         ["brass lamp", "rusty key"])
+        self.assertEqual(self.captured["state"]["chat"], 1)
+
+    def test_replay_matches(self):
+        for render in (True, False):
+            result = replay.replay(_build_world, self.captured, render=render)
+            result.verify()
+            self.assertEqual(result.commands, 7)
+            self.assertEqual(result.turns, 4)
+            result.verify(replay.digest(self.captured["state"]))
+
+    def test_mismatch(self):
+        captured = dict(self.captured, players=dict(SESSIONS, alice=["get key"]))
+        result = replay.replay(_build_world, captured, render=False)
+        with self.assertRaises(replay.ReplayMismatch) as raised:
+            result.verify()
+        self.assertTrue(any("alice" in difference for difference in raised.exception.differences))
+        self.assertNotEqual(result.differences(self.captured["state"]), [])
+        with self.assertRaises(replay.ReplayMismatch):
+            result.verify("0" * 64)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "traffic.json")
+            replay.save_capture(self.captured, file_name)
+            self.assertEqual(replay.load_capture(file_name), self.captured)
+
+
+if __name__ == "__main__":
+    unittest.main()
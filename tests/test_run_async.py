@@ -0,0 +1,83 @@
+"""Tests for World.run_async."""
+import asyncio
+import io
+import unittest
+
+import txtadv
+
+
+class _Idle:
+    """An input stream with an async readline that gives its lines and then waits forever."""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    async def readline(self):
+        if self.lines:
+            return self.lines.pop(0)
+        await asyncio.Event().wait()
+        return ""
+
+
+def _world():
+    room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+    return txtadv.World(room, name="Test", stdoutin=False)
+
+
+class RunAsyncTest(unittest.TestCase):
+    """Reading every Player's input on its own."""
+
+    def test_returns_when_input_ends(self):
+        world = _world()
+        alice = world.create_player(io.StringIO("look\n"), io.StringIO())
+        bob = world.create_player(io.StringIO("look\nlook\n"), io.StringIO())
+        asyncio.run(asyncio.wait_for(world.run_async(tick_interval=3600), 5))
+        self.assertEqual(world.players, [])
+        self.assertEqual(alice.outstream.getvalue().count("A hall."), 1)
+        self.assertEqual(bob.outstream.getvalue().count("A hall."), 2)
+
+    def test_idle_player_does_not_block(self):
+        world = _world()
+        idle = world.create_player(_Idle([]), io.StringIO())
+        busy = world.create_player(_Idle(["look\n", "look\n"]), io.StringIO())
+
+        async def play():
+            task = asyncio.ensure_future(world.run_async(tick_interval=3600))
+            while busy.outstream.getvalue().count("A hall.") < 2:
+                await asyncio.sleep(0.001)
+            world.stop()
+            await task
+
+        asyncio.run(asyncio.wait_for(play(), 5))
+        self.assertNotIn("A hall.", idle.outstream.getvalue())
+        self.assertEqual(world.players, [idle, busy])
+
+    def test_player_added_while_running(self):
+        world = _world()
+        world.create_player(_Idle([]), io.StringIO())
+        late = io.StringIO()
+
+        async def play():
+            task = asyncio.ensure_future(world.run_async(tick_interval=3600))
+            await asyncio.sleep(0)
+            world.create_player(_Idle(["look\n"]), late)
+            while "A hall." not in late.getvalue():
+                await asyncio.sleep(0.001)
+            world.stop()
+            await task
+
+        asyncio.run(asyncio.wait_for(play(), 5))
+
+    def test_timers_in_seconds_run_between_turns(self):
+        world = _world()
+        world.create_player(_Idle([]), io.StringIO())
+        turns = []
+        world.scheduler.after_turns(1, turns.append, "turn")
+        world.scheduler.after_seconds(0.01, world.stop)
+        asyncio.run(asyncio.wait_for(world.run_async(tick_interval=3600), 5))
+        # The first turn starts straight away, and the next one is an hour off.
+        self.assertEqual(turns, ["turn"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for the Scheduler and for when Entities are ticked."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.parallel import ParallelTicker
+from txtadv.schedule import Scheduler
+
+
+class SchedulerTest(unittest.TestCase):
+    """Timers counted in turns and in seconds."""
+
+    def test_turns(self):
+        scheduler = Scheduler()
+        called = []
+        scheduler.after_turns(2, called.append, "two")
+        scheduler.after_turns(1, called.append, "one")
+        scheduler.after_turns(1, called.append, "also one")
+        cancelled = scheduler.after_turns(1, called.append, "cancelled")
+        cancelled.cancel()
+        self.assertEqual(len(scheduler), 3)
+        self.assertEqual(scheduler.advance(), 2)
+        self.assertEqual(called, ["one", "also one"])
+        scheduler.advance()
+        self.assertEqual(called, ["one", "also one", "two"])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_seconds(self):
+        now = [100.0]
+        scheduler = Scheduler(clock=lambda: now[0])
+        called = []
+        scheduler.after_seconds(5, called.append, "later")
+        self.assertEqual(scheduler.next_time(), 105.0)
+        scheduler.run_due()
+        self.assertEqual(called, [])
+        now[0] = 105.0
+        scheduler.run_due()
+        self.assertEqual(called, ["later"])
+        self.assertIsNone(scheduler.next_time())
+
+
+class _Counted(txtadv.Entity):
+    """An Entity that remembers the turns it was ticked on."""
+    __slots__ = ("ticks",)
+
+    def tick(self, world):
+        self.ticks.append(world.scheduler.turns)
+        return super().tick(world)
+
+
+class EntityTickTest(unittest.TestCase):
+    """World ticks Entities when they want to be, and wakes waiting ones up."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        self.yard = txtadv.Room("Yard", "A yard.", [None] * 6, [])
+        self.room.exits[0] = self.yard
+        self.yard.exits[1] = self.room
+        self.world = txtadv.World(self.room, stdoutin=False)
+        self.player = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+
+    def _script(self, *lines):
+        file_name = os.path.join(self.directory, f"script{len(os.listdir(self.directory))}.txt")
+        with open(file_name, "w", encoding="ascii") as file:
+            file.write("\n".join(lines) + "\n")
+        return file_name
+
+    def _entity(self, *lines):
+        entity = _Counted(self.room, self._script(*lines))
+        entity.ticks = []
+        self.world.add_entity(entity)
+        return entity, entity.ticks
+
+    def _turns(self, count):
+        for _ in range(count):
+            self.world.advance()
+
+    def test_sleep_and_idle(self):
+        _entity, ticks = self._entity("sleep 3", "say done")
+        self._turns(10)
+        self.assertEqual(ticks, [1, 4])
+
+    def test_listening_entity_wakes_on_chat(self):
+        _entity, ticks = self._entity("if said hello {", "say hi", "}", "wait", "repeat")
+        self._turns(10)
+        self.assertEqual(ticks, [1, 2])
+        self.world.handle_input(self.player, "say hello")
+        self._turns(3)
+        self.assertEqual(ticks, [1, 2, 11, 12])
+        self.assertEqual(self.world.chat.messages[-1].text.split(": ")[-1], "hi")
+
+    def test_listening_entity_wakes_on_moves(self):
+        _entity, ticks = self._entity("if get key {", "say got it", "}", "wait", "repeat")
+        self._turns(5)
+        self.assertEqual(ticks, [1, 2])
+        self.world.handle_input(self.player, "north")
+        self._turns(1)
+        self.assertEqual(ticks, [1, 2, 6])
+        key = txtadv.Item("key", "a key", "A key.", self.yard)
+        key.move(self.room)
+        self._turns(3)
+        self.assertEqual(ticks[3], 7)
+        self.assertEqual(self.world.chat.messages[-1].text.split(": ")[-1], "got it")
+
+    def test_wake(self):
+        entity, ticks = self._entity("wait", "repeat")
+        self._turns(5)
+        self.world.wake(entity, 2)
+        self._turns(3)
+        self.assertEqual(ticks, [1, 2, 7])
+
+    def test_parallel_listening(self):
+        ticker = ParallelTicker(self.world, processes=0)
+        ticker.start()
+        self.addCleanup(ticker.close)
+        entity = txtadv.Entity(self.room, self._script("if said hello {", "say hi", "}",
+                                                       "wait", "repeat"))
+        self.world.add_entity(entity)
+        self._turns(5)
+        self.assertIsNone(self.world._wakeups[entity]) #pylint: disable=protected-access
+        self.world.handle_input(self.player, "say hello")
+        self._turns(2)
+        self.assertEqual(self.world.chat.messages[-1].text.split(": ")[-1], "hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for compiling and running Entity scripts."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import txtadv
+from txtadv import script
+from txtadv.schedule import IDLE
+
+
+class ScriptTest(unittest.TestCase):
+    """compile_script and the VM that runs it."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.room = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+        self.room.exits[0] = txtadv.Room("Yard", "A yard.", [None] * 6, [])
+        self.world = txtadv.World(self.room, stdoutin=False)
+        self.player = self.world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+
+    def _entity(self, *lines):
+        file_name = os.path.join(self.directory, f"script{len(self.world.entities)}.txt")
+        with open(file_name, "w", encoding="ascii") as file:
+            file.write("\n".join(lines) + "\n")
+        entity = txtadv.Entity(self.room, file_name)
+        self.world.add_entity(entity)
+        return entity
+
+    def _said(self):
+        return [message.text.split(": ", 1)[-1] for message in self.world.chat.messages]
+
+    def test_blocks_have_to_match(self):
+        self.assertRaises(script.ScriptError, script.compile_script, ["if look {", "say x"])
+        self.assertRaises(script.ScriptError, script.compile_script, ["}"])
+        self.assertRaises(script.ScriptError, script.compile_script, ["look {", "}"])
+
+    def test_if_goes_by_what_the_command_did(self):
+        txtadv.Item("key", "a key", "A key.", self.room)
+        entity = self._entity("if get key {", "say got it", "}",
+                              "if get key {", "say got another", "}",
+                              "if west {", "say went west", "}",
+                              "if north {", "say went north", "}")
+        self.assertIs(entity.tick(self.world), IDLE)
+        self.assertEqual(self._said(), ["got it", "went north"])
+        self.assertEqual([item.name for item in entity.inventory.items], ["key"])
+
+    def test_said(self):
+        entity = self._entity("if said hello {", "say hi", "}", "wait", "repeat")
+        entity.tick(self.world)
+        self.assertEqual(self._said(), [])
+        self.world.handle_input(self.player, "say hello")
+        entity.tick(self.world)
+        self.assertEqual(self._said(), ["hello", "hi"])
+        entity.tick(self.world)
+        self.assertEqual(self._said(), ["hello", "hi"])
+
+    def test_wait_and_sleep(self):
+        entity = self._entity("say one", "wait", "say two", "sleep 3", "say three")
+        self.assertEqual(entity.tick(self.world), 1)
+        self.assertEqual(entity.tick(self.world), 3)
+        self.assertIs(entity.tick(self.world), IDLE)
+        self.assertEqual(self._said(), ["one", "two", "three"])
+
+    def test_steps_per_tick(self):
+        entity = self._entity(*["say x"] * 25)
+        entity.tick(self.world)
+        self.assertEqual(entity.pc, txtadv.Entity.steps_per_tick)
+
+    def test_programs_are_shared(self):
+        first = self._entity("say x")
+        second = txtadv.Entity(self.room, os.path.join(self.directory, "script0.txt"))
+        self.assertIs(first.program, second.program)
+
+
+if __name__ == "__main__":
+    unittest.main()
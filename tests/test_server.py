@@ -0,0 +1,85 @@
+"""Tests for the local TCP server."""
+import asyncio
+import json
+import unittest
+
+import txtadv
+from txtadv.wip.multiplayer.server import Server
+
+
+def _world():
+    hall = txtadv.Room("Hall", "A hall.", [None] * 6, [])
+    yard = txtadv.Room("Yard", "A yard.", [None] * 6, [])
+    hall.exits[0] = yard
+    yard.exits[1] = hall
+    return txtadv.World(hall, name="Test", stdoutin=False)
+
+
+async def _read_until(reader, text):
+    """Everything read from reader up to and including text."""
+    return (await reader.readuntil(text.encode())).decode()
+
+
+class ServerTest(unittest.TestCase):
+    """Players and event listeners connecting over TCP."""
+
+    def test_player_and_listener(self):
+        world = _world()
+        server = Server(world, port=0)
+
+        async def play():
+            game = asyncio.ensure_future(server.serve_forever(event_port=0))
+            while getattr(server, "event_port", None) is None:
+                await asyncio.sleep(0.001)
+            events, listener = await asyncio.open_connection(server.host, server.event_port)
+            listener.write(b"subscribe MoveEvent\n")
+            await listener.drain()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            await _read_until(reader, "Hall> ")
+            self.assertEqual(len(world.players), 1)
+            # Wait until the subscription has been read before moving.
+            while not any(server.listeners.values()):
+                await asyncio.sleep(0.001)
+            writer.write(b"look\n")
+            self.assertIn("A hall.", await _read_until(reader, "Hall> "))
+            writer.write(b"n\n")
+            await _read_until(reader, "Yard> ")
+            event = json.loads(await events.readline())
+            self.assertEqual(event["event"], "MoveEvent")
+            self.assertEqual((event["data"]["old"], event["data"]["new"]), ("Hall", "Yard"))
+            writer.close()
+            while world.players:
+                await asyncio.sleep(0.001)
+            self.assertEqual(server.connections, {})
+            world.stop()
+            await game
+            self.assertEqual(await events.read(), b"")
+            listener.close()
+
+        asyncio.run(asyncio.wait_for(play(), 5))
+
+    def test_close_disconnects_everyone(self):
+        world = _world()
+        server = Server(world, port=0)
+
+        async def play():
+            game = asyncio.ensure_future(server.serve_forever())
+            while not server._servers: #pylint: disable=protected-access
+                await asyncio.sleep(0.001)
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            await _read_until(reader, "Hall> ")
+            world.stop()
+            await game
+            self.assertEqual(world.players, [])
+            # Whatever was still on its way, then the connection is closed.
+            await reader.read()
+            self.assertTrue(reader.at_eof())
+            writer.close()
+            with self.assertRaises(OSError):
+                await asyncio.open_connection(server.host, server.port)
+
+        asyncio.run(asyncio.wait_for(play(), 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
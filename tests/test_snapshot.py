@@ -0,0 +1,65 @@
+"""Tests for reading and writing World snapshots."""
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+import txtadv
+from txtadv.file import snapshot, save
+
+
+def _world():
+    north = txtadv.Room("North", "A room.", [None] * 6, [])
+    south = txtadv.Room("South", "Another room.", [None] * 6, [])
+    north.exits[1] = south
+    south.exits[0] = north
+    txtadv.Item("lamp", "a lamp", "A brass lamp.", north)
+    txtadv.Item("key", "a key", "A rusty key.", south)
+    world = txtadv.World(north, name="Test", author="Someone", desc="A test", stdoutin=False)
+    player = world.create_player(io.StringIO(), io.StringIO(), buffered=False)
+    return world, player
+
+
+def _state(world):
+    return ([(room.name, room.desc, [exit_room and exit_room.name for exit_room in room.exits],
+              [item.name for item in room.items]) for room in world.graph.rooms()],
+            [(player.name, player.loc.name, [item.name for item in player.inventory.items])
+             for player in world.players])
+
+
+class SnapshotTest(unittest.TestCase):
+    """write_world and read_world."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_round_trip(self):
+        world, player = _world()
+        world.handle_input(player, "get lamp")
+        world.handle_input(player, "south")
+        data = io.BytesIO()
+        snapshot.write_world(world, data)
+        data.seek(0)
+        loaded = snapshot.read_world(data)
+        self.assertEqual(_state(loaded), _state(world))
+        self.assertEqual((loaded.name, loaded.author, loaded.desc), ("Test", "Someone", "A test"))
+        again = io.BytesIO()
+        snapshot.write_world(loaded, again)
+        self.assertEqual(again.getvalue(), data.getvalue())
+
+    def test_not_a_snapshot(self):
+        self.assertRaises(snapshot.SnapshotError, snapshot.read_world, io.BytesIO(b"nonsense"))
+
+    def test_save_goes_to_save_dir(self):
+        world, _player = _world()
+        world.save_dir = os.path.join(self.directory, "saves")
+        file_name = save(world)
+        self.assertEqual(file_name, os.path.join(world.save_dir, "Test.tasnap"))
+        self.assertEqual(os.listdir(world.save_dir), ["Test.tasnap"])
+        self.assertEqual(_state(snapshot.load_world(file_name)), _state(world))
+
+
+if __name__ == "__main__":
+    unittest.main()
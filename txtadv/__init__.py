@@ -1,9 +1,20 @@
 """A feature-rich text adventure framework in Python."""
 import sys
-import os
-from txtadv import commands
-from txtadv.messaging import info, setinfomode, no_origin, origin, error as err
+import asyncio
+import inspect
 import random
+import threading
+from txtadv import commands, stats
+from txtadv.chat import ChatLog
+from txtadv.events import (RUN_NOW, RUN_IN_THREAD, RUN_AS_TASK, Subscriber, Event, EventBus, BUS,
+                           MoveEvent, UseEvent, DropEvent, EnterEvent, ChatEvent, LeaveEvent)
+from txtadv.journal import Journal
+from txtadv.location.graph import RoomGraph
+from txtadv.messaging import info, setinfomode, no_origin, origin, error as err, flush_pending
+from txtadv.objects import (track_changes, untrack_changes, watch_moves, unwatch_moves,
+                            EventSource, Object, Item, ItemList, ExitList, Room, Player,
+                            _NullStream, Entity)
+from txtadv.schedule import Scheduler, IDLE, LISTEN
 
 __version__ = "1.0.1"
 
@@ -21,287 +32,33 @@ class _CONSTANTS:
 _CONSTANTS = _CONSTANTS()
 
 
-class Subscriber:
-    """A Subscriber to an Event"""
-    save = ["func", "events"]
-
-    def __init__(self, func):
-        self.func = func
-        self.events = []
-
-    def __call__(self, *args, **kwargs):
-        self.func(*args, **kwargs)
-
-    def __setitem__(self, key, val):
-        self.events.append(val)
-
-    def subscribe(self, event):
-        """Add an Event to this Subscriber"""
-        self.events.append(event)
-        event.subscribers.append(self)
-
-    def __getitem__(self, key):
-        """get item"""
-        return self.__dict__[key]
-
-
-class Event:
-    """An Event that can have multiple Subscribers"""
-    save = ["subscribers"]
-
-    def __init__(self):
-        self.subscribers = []
-
-    def add_subscriber(self, subscriber: Subscriber):
-        """Add an subscriber to this Event"""
-        self.subscribers.append(subscriber)
-        subscriber.events.append(self)
-
-    def trigger(self, *args, **kwargs):
-        """Trigger this Event with one or more arguments"""
-        #entity = Entity(None,"none.entity")
-        #entity.outstream = sys.stdout
-        for sub in self.subscribers:
-            sub(*args, **kwargs)
-
-    def __getitem__(self, key):
-        """get item"""
-        return self.__dict__[key]
-
-
-class MoveEvent(Event):
-    """A Event that is triggered when an Object is moved(Includes the player picking it up)."""
-
-
-class UseEvent(Event):
-    """A Event that is triggered when an Item is used."""
-
-
-class DropEvent(Event):
-    """A Event that is triggered when something is dropped."""
-
-
-class EnterEvent(Event):
-    """A Event that is triggered when a Player enters a Room."""
-
-
-class ChatEvent(Event):
-    """A Event that is triggered when a Player or Entity says a message."""
-
-
-class Object:
-    """A base Object. Do not use, instead use Item or Player."""
-    events = {"move": MoveEvent()}
-    default_flags = {}
-
-    def __init__(self, name: str, sdesc: str, ldesc: str, location):
-        self.name = name
-        self.sdesc = sdesc
-        self.ldesc = ldesc
-        self.loc = location
-        self.iname = name
-        self.flags = self.__class__.default_flags
-
-    @property
-    def location(self):
-        """The location of this Object"""
-        return self.loc
-
-    def move(self, newloc):
-        """Moves this Object to a different Room"""
-        self.loc = newloc
-        #self.events["move"].trigger(self.iname)
-
-    def on_event(self, event_name: str, subscriber: Subscriber):
-        """Makes subscriber be triggered when event_name is triggered."""
-        try:
-            self.__class__.events[event_name].add_subscriber(subscriber)
-        except KeyError as exc:
-            sys.tracebacklimit = -1
-            raise ValueError(f"Unknown event `{event_name}`") from exc
-
-    def __getitem__(self, key):
-        """get item"""
-        return self.__dict__[key]
-
-
-class Item(Object):
-    """An Item. Doesn't do much by default, although it can."""
-    events = Object.events.update({"use": UseEvent()})
-    default_flags = {"consume_on_use": False, "pickup_to_examine": True}
-
-    def __init__(self, name: str, sdesc: str, ldesc: str, location):
-        super().__init__(name, sdesc, ldesc, location)
-        location.items.append(self)
-
-    def move(self, newloc):
-        self.loc.items.remove(self)
-        super().move(newloc)
-        newloc.items.append(self)
-
-    def use(self):
-        """Use the item"""
-        self.__class__.events["use"].trigger(self.iname)
-    
-
-
-class Room:
-    """The Room class can contain a number of items and have up to 6 exits:
-    north, south, east, west, up, and down."""
-    events = {"enter": EnterEvent()}
-    save   = ["name","desc","exits","items"]
-
-    def __init__(self, name: str, desc: str, exits, items) -> None:
-        self.name = name
-        self.iname = name
-        self.desc = desc
-        self.exits = exits
-        self.items = items
-
-    def move_item(self, item: Item, newloc):
-        """Moves an Item to a different Room if it is in this Room"""
-        if item in self.items:
-            item.move(newloc)
-            self.items.remove(item)
-
-    def remove_item(self, item: Item):
-        """Removes an Item from this Room"""
-        if item in self.items:
-            self.items.remove(item)
-
-    def on_event(self, event_name: str, subscriber: Subscriber):
-        """Makes subscriber be triggered when event_name is triggered."""
-        error = False
-        try:
-            self.__class__.events[event_name].add_subscriber(subscriber)
-        except KeyError:
-            sys.tracebacklimit = -1
-            error = True
-        if error:
-            raise ValueError(f"Unknown event `{event_name}`")
-
-    def enter(self, player):
-        """Trigger the enter event with the Player passed"""
-        self.__class__.events["enter"].trigger(player)
-
-    def __contains__(self, key):
-        for i in self.items:
-            if key in (i.iname, i):
-                return True
-        for i in self.exits:
-            if key in (i.iname, i):
-                return True
-        return False
-
-    def __getitem__(self, key):
-        """get item"""
-        return self.__dict__[key]
-
-
-#pylint: disable-next=invalid-name
-numPlayers = 0
-
-
-class Player(Object):
-    """A Player. Don't use, instead use World.create_player or just instance a new World."""
-    events = Object.events.update({"get": MoveEvent()})
-    default_flags = {}
-
-    #pylint: disable-next=too-many-arguments
-    def __init__(self,
-                 startloc,
-                 instream,
-                 outstream,
-                 colored=True,
-                 name="Player"):
-        #pylint: disable-next=global-statement,invalid-name
-        global numPlayers
-        numPlayers += 1
-        if name == "Player":
-            name = "Player" + str(numPlayers)
-        super().__init__(name, "", "", startloc)
-        self.inventory = Room("Inventory", "How did you get here?", [], [])
-        self.instream = instream
-        self.outstream = outstream
-        self.colored = colored
-        self.name = name
-        self.transcript = []
-        self.commands = []
+def _async_readline(stream):
+    #pylint: disable-next=line-too-long
+    """Returns a coroutine function that reads a line from stream. Streams with an async readline (like asyncio.StreamReader) are used directly, anything else is read on its own thread so that it can block as much as it wants."""
+    if inspect.iscoroutinefunction(stream.readline):
+        return stream.readline
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
 
-    def pickup(self, item: Item):
-        """Pickup an item."""
-        item.move(self.inventory)
-        #self.events["get"].trigger(player=self, item=item)
+    def reader():
+        while True:
+            line = stream.readline()
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+            if not line:
+                return
 
+    started = []
 
-    def __repr__(self):
-        return f"{self.__class__}({self.__dict__})"
+    async def readline():
+        if not started:
+            started.append(threading.Thread(target=reader, daemon=True))
+            started[0].start()
+        return await lines.get()
 
-    def __str__(self):
-        return self.name
-
-
-class Entity(Player):
-    #pylint: disable-next=line-too-long
-    """An Entity. Can be described as a scripted player.(NOTE: Still very much in development. We suggest not using it currently."""
-
-    def __init__(self, startloc: Room, file_name: str):
-        self.colored = False
-        self.prevcontext = 0
-        self.context = 0
-        self.file_name = file_name
-        with open(file_name, 'r', encoding='ascii') as file:
-            with open(os.devnull, 'w', encoding='ascii') as null:
-                super().__init__(startloc, file, null, colored=False)
-                self.instream = file
-
-    def exec_from_file(self, file_name):
-        """Set the file executed from"""
-        self.file_name = file_name
-        #pylint: disable-next=consider-using-with
-        self.instream = open(self.file_name, 'r', encoding='ascii')
-
-    def tick(self, world):
-        """Tickes the entity and makes it perform an action."""
-        #pylint: disable-next=consider-using-with
-        #self.outstream = open(os.devnull, 'w', encoding='ascii')
-        #self.exec(self.instream.readline(), world)
-
-    def exec(self, instruction, world):
-        """Executes an instruction for this Entity."""
-        cmd_count = 0
-        if self.context == "skip" and instruction == "}":
-            self.context = self.prevcontext
-            return ""
-        try:
-            if self.context > 0 and instruction == "}":
-                self.context -= 1
-        except TypeError:
-            pass
-        found = False
-        for cmd in world.cmds:
-            for alias in cmd.aliases:
-                if instruction.startswith(alias) and self.context != "skip":
-                    setinfomode(origin)
-                    test = cmd(instruction, world, self)
-                    if test:
-                        return test
-                    found = True
-                    break
-                cmd_count += 1
-            cmd_count -= len(cmd.aliases)
-            if not found:
-                cmd_count += 1
-            else:
-                break
-        if cmd_count == len(world.cmds):
-            entity = Player(None, os.devnull, sys.stdout)
-            err("Invalid command. Run 'help' to get a list of commands.\n",
-                entity)
-            return ""
-        return ""
+    return readline
 
 
+#pylint: disable-next=too-many-public-methods
 class World:
     """The World class. Houses all of the information pertaining to the game."""
 
@@ -318,59 +75,362 @@ class World:
         self.name = name
         self.desc = desc
         if callable(cmds):
-            self.cmds = cmds()
-        else:
-            self.cmds = cmds
-        if stdoutin:
-            self.players = [Player(start, sys.stdin, sys.stdout)]
-        else:
-            self.players = []
-        self.invalid_text = ["Pardon?","A fantastical idea!","What does that mean?","I don't understand."]
+            cmds = cmds()
+        self.cmds = commands.CommandList(cmds)
+        self.players = []
+        self.occupants = {}
+        self.announce_moves = False
+        self.invalid_text = ["Pardon?","A fantastical idea!","What does that mean?",
+                             "I don't understand."]
         self.entities = []
-        self.chat = []
-        self.states = []
+        # Every random choice the game makes goes through this, so that it can be seeded.
+        self.rng = random.Random()
+        self.chat = ChatLog()
+        self.journal = Journal()
+        self.graph = RoomGraph(start)
+        # The next stable object id handed out by txtadv.file.snapshot.
+        self.next_oid = 1
+        # Where the save command writes snapshots, and the txtadv.file.autosave.Autosaver if any.
+        self.save_dir = "saves"
+        self.autosaver = None
+        # The txtadv.file.archive.Archive the Rooms are loaded from, if any.
+        self.archive = None
+        self.scheduler = Scheduler()
+        # The txtadv.parallel.ParallelTicker that runs Entity ticks in other processes, if any.
+        self.parallel = None
+        # The Timer of the next tick of every Entity, or None if it's IDLE.
+        self._wakeups = {}
+        # The Entities that are waiting for something to happen, by Room, and the other way round.
+        self._listening = {}
+        self._listens = {}
         self.chat_event = ChatEvent()
         self.chat_subscriber = Subscriber(self.new_chat)
         self.chat_event.add_subscriber(self.chat_subscriber)
+        self.move_event = MoveEvent()
+        self.leave_event = LeaveEvent()
+        self._prompt = "> "
+        self._readers = None
+        self._stop = None
+        if stdoutin:
+            self.add_player(Player(start, sys.stdin, sys.stdout, admin=True))
 
-    def run(self, prompt: str = "> ") -> None:
-        """Runs the game"""
-        while True:
-            for player in self.players:
+    def run(self, prompt: str = "> ", stop_when_empty: bool = True) -> None:
+        #pylint: disable-next=line-too-long
+        """Runs the game. A Player whose input ends is removed, and if stop_when_empty is True this returns once every Player is gone."""
+        while not (stop_when_empty and not self.players):
+            for player in list(self.players):
                 setinfomode(no_origin)
-                self.states.append(self)
                 info(player.loc.name + prompt, player)
+                player.flush()
                 sys.tracebacklimit = -1
-                inp = player.instream.readline().replace("\n", "")
-                player.commands.append(inp)
+                line = player.instream.readline()
                 sys.tracebacklimit = 1000
-                cmd_count = 0
-                found = False
-                for cmd in self.cmds:
-                    for alias in cmd.aliases:
-                        if inp.split(" ")[0].lower().startswith(alias.lower()):
-                            setinfomode(no_origin)
-                            cmd(inp, self, player)
-                            found = True
-                            break
-                    if not found:
-                        cmd_count += 1
-                    else:
-                        break
-                if not found:
-                    err(
-                        f"{random.choice(self.invalid_text)}\n",
-                        player)
-            for i in self.entities:
-                i.tick(self)
-
-    def create_player(self, instream, outstream) -> None:
-        """Creates a new Player in this World."""
-        self.players.append(Player(self.start, instream, outstream))
+                if not line:
+                    self.remove_player(player)
+                    continue
+                self.handle_input(player, line.replace("\n", ""))
+            self.advance()
+            flush_pending()
+            if self.autosaver is not None:
+                self.autosaver.tick()
+
+    def advance(self) -> None:
+        """Starts the next turn, ticking the Entities and running the timers that are due."""
+        self.scheduler.advance()
+        if self.parallel is not None:
+            self.parallel.run()
+
+    def handle_input(self, player, inp: str) -> None:
+        """Runs a single line of input typed by a Player."""
+        player.commands.append(inp)
+        cmd = self.resolve(inp)
+        if stats.ACTIVE is None:
+            self._dispatch(player, inp, cmd)
+        else:
+            stats.timed(stats.DISPATCH, "<invalid>" if cmd is None else cmd.name,
+                        self._dispatch, player, inp, cmd)
+        if self.autosaver is not None:
+            self.autosaver.tick()
+
+    def _dispatch(self, player, inp: str, cmd) -> None:
+        """Runs the Command found for a line of input, or says there isn't one."""
+        before = player.loc
+        self.journal.begin(player)
+        try:
+            if cmd is not None:
+                setinfomode(no_origin)
+                cmd(inp, self, player)
+            else:
+                err(
+                    f"{self.rng.choice(self.invalid_text)}\n",
+                    player)
+            if player.loc is not before:
+                self.move_event.trigger(player, before, player.loc)
+        finally:
+            self.journal.commit()
+            flush_pending()
+
+    async def run_async(self,
+                        prompt: str = "> ",
+                        tick_interval: float = 1.0,
+                        stop_when_empty: bool = True) -> None:
+        #pylint: disable-next=line-too-long
+        """Runs the game with asyncio. Every Player's input is read on its own, so one Player that hasn't typed anything doesn't hold up everyone else, and Entities are ticked every tick_interval seconds. Returns when World.stop is called, or when every Player's input has ended if stop_when_empty is True."""
+        self._prompt = prompt
+        self._readers = {}
+        self._stop = asyncio.Event()
+        for player in self.players:
+            self._start_reader(player)
+        ticker = asyncio.ensure_future(self._tick_loop(tick_interval))
+        stopper = asyncio.ensure_future(self._stop.wait())
+        try:
+            while not self._stop.is_set():
+                if stop_when_empty and not self._readers:
+                    break
+                done, _ = await asyncio.wait(
+                    list(self._readers.values()) + [stopper, ticker],
+                    return_when=asyncio.FIRST_COMPLETED)
+                for player, reader in list(self._readers.items()):
+                    if reader in done:
+                        del self._readers[player]
+                for task in done:
+                    if not task.cancelled():
+                        task.result()
+        finally:
+            for task in list(self._readers.values()) + [stopper, ticker]:
+                task.cancel()
+            self._readers = None
+
+    def stop(self) -> None:
+        """Stops World.run_async."""
+        if self._stop is not None:
+            self._stop.set()
+
+    def _start_reader(self, player) -> None:
+        """Starts reading the input of a Player while World.run_async is running."""
+        self._readers[player] = asyncio.ensure_future(self._read_player(player))
+
+    async def _read_player(self, player) -> None:
+        """Reads and runs the input of a Player until it ends."""
+        readline = _async_readline(player.instream)
+        while True:
+            setinfomode(no_origin)
+            info(player.loc.name + self._prompt, player)
+            player.flush()
+            inp = await readline()
+            if isinstance(inp, bytes):
+                inp = inp.decode()
+            if not inp:
+                self.remove_player(player)
+                return
+            self.handle_input(player, inp.rstrip("\r\n"))
+
+    async def _tick_loop(self, interval: float) -> None:
+        #pylint: disable-next=line-too-long
+        """Starts a new turn every interval seconds, and wakes up in between for anything on World.scheduler that is counted in seconds."""
+        clock = self.scheduler.clock
+        next_turn = clock()
+        while True:
+            if clock() >= next_turn:
+                self.advance()
+                next_turn += interval
+            else:
+                self.scheduler.run_due()
+            flush_pending()
+            if self.autosaver is not None:
+                self.autosaver.tick()
+            wake = next_turn
+            next_time = self.scheduler.next_time()
+            if next_time is not None:
+                wake = min(wake, next_time)
+            await asyncio.sleep(max(0.0, wake - clock()))
+
+    def _command_list(self):
+        """The indexed Command list of this World."""
+        if not isinstance(self.cmds, commands.CommandList):
+            # Someone replaced World.cmds with a plain list, so index it now.
+            self.cmds = commands.CommandList(self.cmds)
+        return self.cmds
+
+    def find_command(self, inp: str, exact: bool = False):
+        #pylint: disable-next=line-too-long
+        """Finds the Command that inp starts with, or None if there isn't one. If exact is True, inp has to be one of the Command's aliases."""
+        if exact:
+            return self._command_list().get(inp)
+        return self._command_list().find(inp)
+
+    def resolve(self, inp: str):
+        #pylint: disable-next=line-too-long
+        """Finds the Command for a line of input by its first word. A Command with that word as an alias wins over one that only has a prefix of it, so 'say' isn't taken for 's'."""
+        verb = inp.split(" ")[0]
+        return self.find_command(verb, exact=True) or self.find_command(verb)
+
+    def add_command(self, cmd) -> None:
+        """Adds a Command to this World."""
+        self._command_list().append(cmd)
+
+    def remove_command(self, cmd) -> None:
+        """Removes a Command from this World."""
+        self._command_list().remove(cmd)
+
+    def create_player(self, instream, outstream, buffered=True) -> Player:
+        #pylint: disable-next=line-too-long
+        """Creates a new Player in this World. If buffered is False, everything sent to the Player is written straight away instead of once at the end of each command."""
+        return self.add_player(Player(self.start, instream, outstream, buffered=buffered))
+
+    def add_player(self, player: Player) -> Player:
+        """Adds a Player to this World."""
+        self.players.append(player)
+        player.world = self
+        self.occupants.setdefault(player.loc, {})[player] = None
+        if self._readers is not None:
+            self._start_reader(player)
+        return player
+
+    def remove_player(self, player: Player) -> None:
+        """Removes a Player from this World and triggers World.leave_event with it."""
+        if player in self.players:
+            self.players.remove(player)
+            player.world = None
+            self._vacate(player, player.loc)
+            player.transcript.close()
+            player.commands.close()
+            self.journal.forget(player)
+            if self._readers is not None and player in self._readers:
+                reader = self._readers.pop(player)
+                if reader is not asyncio.current_task():
+                    reader.cancel()
+            self.leave_event.trigger(player)
+
+    def occupants_of(self, room) -> list:
+        """The Players and Entities in a Room."""
+        return list(self.occupants.get(room, ()))
+
+    def announce_room(self, room, message: str, exclude=None) -> None:
+        """Sends a message to every Player and Entity in a Room, except exclude."""
+        setinfomode(no_origin)
+        for player in self.occupants.get(room, ()):
+            if player is not exclude:
+                info(message, player)
+        setinfomode(origin)
+
+    def player_moved(self, player: Player, oldloc, newloc) -> None:
+        #pylint: disable-next=line-too-long
+        """Keeps World.occupants up to date when a Player or Entity moves and triggers the enter event of the new Room. Called by Player.move."""
+        self._vacate(player, oldloc)
+        self.occupants.setdefault(newloc, {})[player] = None
+        if self._listening:
+            self.stir(oldloc, newloc)
+        if self.announce_moves:
+            self.announce_room(oldloc, f"{player.name} leaves.\n")
+            self.announce_room(newloc, f"{player.name} arrives.\n", exclude=player)
+        if newloc is not None:
+            newloc.enter(player)
+
+    def _vacate(self, player: Player, room) -> None:
+        """Removes a Player from the occupants of a Room."""
+        occupants = self.occupants.get(room)
+        if occupants is not None:
+            occupants.pop(player, None)
+            if not occupants:
+                del self.occupants[room]
 
     def add_entity(self, entity: Entity) -> None:
-        """Adds an Entity to this World."""
+        """Adds an Entity to this World. It is first ticked next turn."""
         self.entities.append(entity)
+        # Like a Player, so that its moves keep World.occupants up to date and enter Rooms.
+        entity.world = self
+        self.occupants.setdefault(entity.loc, {})[entity] = None
+        self.wake(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Removes an Entity from this World, so it isn't ticked any more."""
+        if entity in self.entities:
+            self.entities.remove(entity)
+            entity.world = None
+            self._vacate(entity, entity.loc)
+        self._unlisten(entity)
+        timer = self._wakeups.pop(entity, None)
+        if timer is not None:
+            timer.cancel()
+
+    def wake(self, entity: Entity, turns: int = 1) -> None:
+        #pylint: disable-next=line-too-long
+        """Ticks an Entity in turns turns, even if it's IDLE, instead of whenever it was going to be."""
+        self._unlisten(entity)
+        timer = self._wakeups.get(entity)
+        if timer is not None:
+            timer.cancel()
+        self._wakeups[entity] = self.scheduler.after_turns(turns, self._tick_entity, entity)
+
+    def _tick_entity(self, entity: Entity) -> None:
+        """Ticks an Entity and schedules its next tick."""
+        self._wakeups[entity] = None
+        if self.parallel is not None and self.parallel.add(entity):
+            return
+        if stats.ACTIVE is None:
+            self._ticked(entity, entity.tick(self))
+        else:
+            self._ticked(entity, stats.timed(stats.TICK, entity.file_name, entity.tick, self))
+
+    def _ticked(self, entity: Entity, delay) -> None:
+        """Schedules the next tick of an Entity that has just been ticked."""
+        # Unless it was removed or woken up while it was ticking.
+        if delay is IDLE or self._wakeups.get(entity, False) is not None:
+            return
+        if delay is LISTEN:
+            self._listen(entity)
+            return
+        self._wakeups[entity] = self.scheduler.after_turns(max(1, delay or 1),
+                                                            self._tick_entity, entity)
+
+    def _listen(self, entity: Entity) -> None:
+        """Leaves an Entity alone until something happens in its Room or inventory."""
+        rooms = (entity.loc, entity.inventory)
+        self._listens[entity] = rooms
+        for room in rooms:
+            self._listening.setdefault(room, {})[entity] = None
+        watch_moves(self)
+
+    def _unlisten(self, entity: Entity) -> None:
+        """Stops an Entity waiting for something to happen."""
+        for room in self._listens.pop(entity, ()):
+            listeners = self._listening.get(room)
+            if listeners is not None:
+                listeners.pop(entity, None)
+                if not listeners:
+                    del self._listening[room]
+        if not self._listens:
+            unwatch_moves(self)
+
+    def stir(self, *rooms) -> None:
+        #pylint: disable-next=line-too-long
+        """Wakes up the Entities waiting for something to happen in rooms. Called when something is said there, or a Player or Item moves in or out. Call it yourself if you change a Room some other way that an Entity's script could notice."""
+        for room in rooms:
+            for entity in list(self._listening.get(room, ())):
+                self.wake(entity)
+
+    def restore(self, saved) -> None:
+        #pylint: disable-next=line-too-long
+        """Takes on the Rooms and Entities of another World, such as one loaded from a snapshot. Players are matched up by name and moved to where they were in saved, and get their saved inventory."""
+        self.start = saved.start
+        self.graph = RoomGraph(saved.start)
+        for entity in list(self.entities):
+            self.remove_entity(entity)
+        for entity in saved.entities:
+            self.add_entity(entity)
+        self.next_oid = max(self.next_oid, saved.next_oid)
+        names = {player.name: player for player in saved.players}
+        for player in self.players:
+            match = names.get(player.name)
+            loc = saved.start if match is None else match.loc
+            if match is not None:
+                player.inventory = match.inventory
+            player.move(loc)
+        # Nothing from before can be undone any more, including the moves just made.
+        self.journal.groups.clear()
+        if self.journal.current is not None:
+            self.journal.current = []
 
     def send_chat(self, message: str, source: str, local=None) -> None:
         #pylint: disable-next=line-too-long
@@ -380,16 +440,17 @@ class World:
     def new_chat(self, message, source, local=None) -> None:
         #pylint: disable-next=line-too-long
         """DO NOT USE. Instead run World.send_chat(message: str, source: str, local: NoneType or Room)"""
-        self.chat.append(source + " says: " + message)
+        self.chat.add(f"{source} says: {message}", local)
+        if self._listening:
+            self.stir(*(list(self._listening) if local is None else (local,)))
         setinfomode(no_origin)
         if local is None:
             for player in self.players:
-                info(source + " says: " + message + "\n", player)
+                info(f"{source} says: {message}\n", player)
             setinfomode(origin)
             return
-        for player in self.players:
-            if player.loc == local:
-                info(source + " says: " + message + "\n", player)
+        for player in self.occupants.get(local, ()):
+            info(f"{source} says: {message}\n", player)
         setinfomode(origin)
 
     def __getitem__(self, key):
@@ -0,0 +1,16 @@
+"""Benchmarks for txtadv. Run a benchmark with `python -m txtadv.bench.<name>`."""
+import time
+
+
+def rate(func, seconds: float = 1.0, batch: int = 100) -> float:
+    """Calls func over and over for about seconds seconds and returns the calls per second."""
+    calls = 0
+    start = time.perf_counter()
+    end = start + seconds
+    now = start
+    while now < end:
+        for _ in range(batch):
+            func()
+        calls += batch
+        now = time.perf_counter()
+    return calls / (now - start)
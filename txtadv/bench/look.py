@@ -0,0 +1,54 @@
+"""How long look takes in a Room with many Items, with and without the render cache."""
+import io
+import json
+import sys
+import time
+
+import txtadv
+from txtadv import commands
+from txtadv.messaging import flush_pending
+
+
+def _world(items: int):
+    room = txtadv.Room("Room", "A room full of things.", [None] * 6, [])
+    room.exits[0] = txtadv.Room("North", "Another room.", [None] * 6, [])
+    room.exits[3] = txtadv.Room("West", "Another room.", [None] * 6, [])
+    for i in range(items):
+        txtadv.Item(f"item {i}", "An item", "A very ordinary item", room)
+    world = txtadv.World(room, name="Bench", stdoutin=False)
+    player = world.create_player(io.StringIO(), io.StringIO())
+    return world, player
+
+
+def _time_look(items: int, looks: int, cached: bool) -> float:
+    """The seconds per look, throwing the cache away before every look if cached is False."""
+    world, player = _world(items)
+    room = player.loc
+    start = time.perf_counter()
+    for _ in range(looks):
+        if not cached:
+            room._render = None #pylint: disable=protected-access
+        commands.look("look", world, player)
+        flush_pending()
+        player.outstream.seek(0)
+        player.outstream.truncate()
+    return (time.perf_counter() - start) / looks
+
+
+def run(sizes=(1, 10, 100, 1000), looks: int = 2000) -> dict:
+    """Runs the benchmark and returns the results."""
+    results = {}
+    for items in sizes:
+        uncached = _time_look(items, looks, False)
+        cached = _time_look(items, looks, True)
+        results[items] = {
+            "uncached_us": 1e6 * uncached,
+            "cached_us": 1e6 * cached,
+            "speedup": uncached / cached if cached else 0.0,
+        }
+    return {"looks": looks, "items": results}
+
+
+if __name__ == "__main__":
+    json.dump(run(looks=int(sys.argv[1]) if len(sys.argv) > 1 else 2000), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,115 @@
+"""Memory used per Room and per Item, compared to the old __dict__ based objects, which kept
+their exits and Items in plain lists."""
+import gc
+import json
+import sys
+import tracemalloc
+
+import txtadv
+
+
+class _LegacyRoom:
+    #pylint: disable-next=line-too-long
+    """A Room laid out the way it used to be: a __dict__, a copy of its name in iname and plain lists of exits and Items."""
+
+    def __init__(self, name, desc, exits, items):
+        self.name = name
+        self.iname = name
+        self.desc = desc
+        self.exits = exits
+        self.items = items
+
+
+class _LegacyItem:
+    """An Item laid out the way it used to be, with flags pointing at the class's default_flags."""
+    default_flags = {"consume_on_use": False, "pickup_to_examine": True}
+
+    def __init__(self, name, sdesc, ldesc, location):
+        self.name = name
+        self.sdesc = sdesc
+        self.ldesc = ldesc
+        self.loc = location
+        self.iname = name
+        self.flags = self.default_flags
+        location.items.append(self)
+
+
+def _measure(build, count: int) -> float:
+    """The bytes allocated per object by build(count), which has to return what it made."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    made = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del made
+    gc.collect()
+    return (after - before) / count
+
+
+def _room(room_class, name):
+    return room_class(name, "A room", [None] * 6, [])
+
+
+def _rooms(room_class, used: bool = False):
+    def build(count):
+        rooms = [_room(room_class, f"Room {i}") for i in range(count)]
+        if used:
+            for room in rooms:
+                len(room.exits)
+                len(room.items)
+        return rooms
+    return build
+
+
+def _items(room_class, item_class, per_room: int = 1000, searched: bool = False):
+    def build(count):
+        rooms = [_room(room_class, f"Room {i}") for i in range(count // per_room)]
+        # The Rooms are made first, and their Items looked at once, so that they aren't counted.
+        for room in rooms:
+            len(room.items)
+        start = tracemalloc.get_traced_memory()[0]
+        items = [item_class(f"item {i}", "An item", "A very ordinary item", rooms[i % len(rooms)])
+                 for i in range(count)]
+        if searched:
+            for room in rooms:
+                room.items.find("")
+        return rooms, items, start
+    return build
+
+
+def _measure_items(build, count: int) -> float:
+    """Like _measure, but leaves out the Rooms the Items are put in."""
+    gc.collect()
+    tracemalloc.start()
+    made = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = made[2]
+    del made
+    gc.collect()
+    return (after - start) / count
+
+
+def run(count: int = 10 ** 6) -> dict:
+    """Runs the benchmark and returns the results."""
+    return {
+        "objects": count,
+        "slots": {
+            "bytes_per_room": _measure(_rooms(txtadv.Room), count),
+            "bytes_per_item": _measure_items(_items(txtadv.Room, txtadv.Item), count),
+            # Once a Room's exits and Items have been used, and its Items searched by name.
+            "bytes_per_used_room": _measure(_rooms(txtadv.Room, used=True), count),
+            "bytes_per_searched_item": _measure_items(
+                _items(txtadv.Room, txtadv.Item, searched=True), count),
+        },
+        "legacy": {
+            "bytes_per_room": _measure(_rooms(_LegacyRoom), count),
+            "bytes_per_item": _measure_items(_items(_LegacyRoom, _LegacyItem), count),
+        },
+    }
+
+
+if __name__ == "__main__":
+    json.dump(run(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,67 @@
+"""Messages per second through txtadv.messaging, compared to the old inspect.stack based version."""
+import inspect
+import io
+import json
+import sys
+
+from txtadv import Player, Room
+from txtadv.bench import rate
+from txtadv.color import colored
+from txtadv.messaging import info, setinfomode, origin, no_origin, flush_pending
+
+
+def _legacy_info(message, target):
+    """How info used to work: probe the target and walk the stack for the origin."""
+    try:
+        target.write("")
+        write = True
+    except AttributeError:
+        write = False
+    prefix = inspect.stack()[1].function.upper() + ": "
+    if write:
+        target.write(colored(prefix + message, 'black'))
+        target.flush()
+    else:
+        target.outstream.write(colored(prefix + message, 'black'))
+        target.transcript.append(inspect.stack()[1].function.upper() + ": " + message)
+        target.outstream.flush()
+
+
+def run(seconds: float = 1.0) -> dict:
+    """Runs the benchmark and returns the results."""
+    room = Room("bench", "A room for benchmarking", [None] * 6, [])
+    player = Player(room, io.StringIO(), io.StringIO(), buffered=False)
+    results = {}
+
+    def send():
+        player.transcript.clear()
+        player.outstream.seek(0)
+        info("A message\n", player)
+
+    def send_legacy():
+        player.transcript.clear()
+        player.outstream.seek(0)
+        _legacy_info("A message\n", player)
+
+    def send_buffered():
+        player.transcript.clear()
+        player.outstream.seek(0)
+        for _ in range(10):
+            info("A message\n", player)
+        flush_pending()
+
+    setinfomode(origin)
+    results["origin"] = rate(send, seconds)
+    setinfomode(no_origin)
+    results["no_origin"] = rate(send, seconds)
+    player.buffered = True
+    results["no_origin_buffered"] = rate(send_buffered, seconds) * 10
+    player.buffered = False
+    results["legacy_origin"] = rate(send_legacy, seconds / 4, batch=10)
+    setinfomode(origin)
+    return results
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
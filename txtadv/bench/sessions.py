@@ -0,0 +1,177 @@
+"""Drives a World headlessly with scripted Players and measures how fast it handles commands.
+
+    python -m txtadv.bench.sessions --players 10 --size 50 --commands 1000 --output run.json
+
+builds a 50x50 grid of Rooms, connects 10 Players whose input is a script of 1000 random
+commands each, runs the World until every script is used up and writes the results as json.
+Results from two releases can be compared key by key.
+"""
+import argparse
+import asyncio
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import txtadv
+
+# The commands a scripted Player picks from, with how often.
+COMMANDS = (
+    ("look", 4),
+    ("north", 3),
+    ("south", 3),
+    ("east", 3),
+    ("west", 3),
+    ("get {item}", 2),
+    ("drop {item}", 2),
+    ("examine {item}", 2),
+    ("inventory", 1),
+    ("say hello", 1),
+    ("chat", 1),
+)
+
+
+class CountingStream:
+    """An outstream that only counts what's written to it, so output doesn't pile up in memory."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.writes = 0
+
+    def write(self, data):
+        """Count data"""
+        self.bytes += len(data)
+        self.writes += 1
+        return len(data)
+
+    def flush(self):
+        """Nothing to flush"""
+
+
+class AsyncScript(io.StringIO):
+    """An instream with a script in it, with a coroutine readline for World.run_async."""
+
+    async def readline(self, size=-1): #pylint: disable=invalid-overridden-method
+        return super().readline(size)
+
+
+def build_world(size: int = 50, items_per_room: int = 1):
+    """A size by size grid of Rooms, each with items_per_room Items."""
+    grid = [[txtadv.Room(f"Room {x},{y}", f"Room {x},{y} of the grid.", [None] * 6, [])
+             for x in range(size)] for y in range(size)]
+    for y, row in enumerate(grid):
+        for x, room in enumerate(row):
+            room.exits[0] = grid[y - 1][x] if y else None
+            room.exits[1] = grid[y + 1][x] if y + 1 < size else None
+            room.exits[2] = row[x + 1] if x + 1 < size else None
+            room.exits[3] = row[x - 1] if x else None
+            for i in range(items_per_room):
+                txtadv.Item(f"item{i}", "An item", "A very ordinary item.", room)
+    return txtadv.World(grid[0][0], name="Bench", stdoutin=False)
+
+
+def make_script(commands: int, items_per_room: int = 1, seed: int = 0) -> str:
+    """A script of commands random commands, the same every time for the same seed."""
+    rng = random.Random(seed)
+    choices = [command for command, _ in COMMANDS]
+    weights = [weight for _, weight in COMMANDS]
+    lines = []
+    for command in rng.choices(choices, weights, k=commands):
+        lines.append(command.format(item=f"item{rng.randrange(max(1, items_per_room))}"))
+    return "\n".join(lines) + "\n"
+
+
+def _percentile(values: list, fraction: float) -> float:
+    """The value fraction of the way through sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+#pylint: disable-next=too-many-arguments,too-many-locals
+def run(players: int = 10, size: int = 50, commands: int = 1000, items_per_room: int = 1,
+        seed: int = 0, mode: str = "sync", trace_memory: bool = False) -> dict:
+    #pylint: disable-next=line-too-long
+    """Runs the benchmark and returns the results. mode is "sync" for World.run or "async" for World.run_async. trace_memory measures peak memory with tracemalloc, which is more exact than the peak RSS but slows everything down."""
+    random.seed(seed)
+    world = build_world(size, items_per_room)
+    outstreams = []
+    for num in range(players):
+        script = make_script(commands, items_per_room, seed + num)
+        instream = AsyncScript(script) if mode == "async" else io.StringIO(script)
+        outstreams.append(CountingStream())
+        world.create_player(instream, outstreams[-1])
+    latencies = []
+    handle_input = world.handle_input
+
+    def timed(player, inp):
+        start = time.perf_counter()
+        handle_input(player, inp)
+        latencies.append(time.perf_counter() - start)
+
+    world.handle_input = timed
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "async":
+        asyncio.run(world.run_async(tick_interval=3600))
+    else:
+        world.run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        "txtadv": txtadv.__version__,
+        "python": platform.python_version(),
+        "params": {"players": players, "size": size, "commands": commands,
+                   "items_per_room": items_per_room, "seed": seed, "mode": mode},
+        "commands": len(latencies),
+        "seconds": elapsed,
+        "commands_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": 1000 * _percentile(latencies, 0.50),
+            "p99": 1000 * _percentile(latencies, 0.99),
+            "max": 1000 * latencies[-1] if latencies else 0.0,
+        },
+        "output_bytes": sum(stream.bytes for stream in outstreams),
+        "peak_traced_bytes": peak,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+
+
+def main(argv=None) -> None:
+    """Runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--size", type=int, default=50, help="the grid is size by size Rooms")
+    parser.add_argument("--commands", type=int, default=1000, help="commands per Player")
+    parser.add_argument("--items-per-room", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--output", help="write the results here instead of to stdout")
+    args = parser.parse_args(argv)
+    results = run(args.players, args.size, args.commands, args.items_per_room, args.seed,
+                  args.mode, args.trace_memory)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Snapshot save/load speed and size for a large World, compared to the old per-field save."""
+import io
+import json
+import marshal
+import pickle
+import sys
+import time
+
+import txtadv
+from txtadv.file import snapshot
+
+
+def _rooms(rooms: int, items_per_room: int) -> list:
+    """rooms Rooms that aren't connected, each with items_per_room items."""
+    made = [txtadv.Room(f"Room {i}", "A room", [None] * 6, []) for i in range(rooms)]
+    for room in made:
+        for i in range(items_per_room):
+            txtadv.Item(f"item {i}", "An item", "A very ordinary item", room)
+    return made
+
+
+def build_world(rooms: int = 100000, items_per_room: int = 1):
+    """A World with a chain of rooms, each with a few items."""
+    chain = _rooms(rooms, items_per_room)
+    for room, next_room in zip(chain, chain[1:]):
+        room.exits[0] = next_room
+        next_room.exits[1] = room
+    world = txtadv.World(chain[0], name="Bench", stdoutin=False)
+    world.create_player(io.StringIO(), io.StringIO())
+    return world
+
+
+def _legacy_single_save(item):
+    """How txtadv.file.save saved every field: json, then marshal, then pickle."""
+    try:
+        return json.dumps(item)
+    except TypeError:
+        try:
+            return marshal.dumps(item)
+        except (TypeError, ValueError):
+            return pickle.dumps(item)
+
+
+def _legacy(rooms: int, items_per_room: int = 1) -> dict:
+    #pylint: disable-next=line-too-long
+    """Time the old per-field save of rooms Rooms like the ones of build_world. They aren't connected, since pickling a Room follows its exits, which runs out of stack on a chain of them, and saves the whole chain again for every Room."""
+    made = _rooms(rooms, items_per_room)
+    size = 0
+    start = time.perf_counter()
+    for room in made:
+        for field in txtadv.Room.save:
+            size += len(_legacy_single_save(room[field]))
+    return {"rooms": rooms, "bytes": size, "write_seconds": time.perf_counter() - start}
+
+
+def run(rooms: int = 100000, legacy_rooms=None) -> dict:
+    """Runs the benchmark and returns the results. legacy_rooms defaults to rooms."""
+    world = build_world(rooms)
+    results = {"rooms": rooms}
+    for name, compress in (("none", snapshot.COMPRESS_NONE), ("zlib", snapshot.COMPRESS_ZLIB)):
+        data = io.BytesIO()
+        start = time.perf_counter()
+        snapshot.write_world(world, data, compress)
+        written = time.perf_counter()
+        data.seek(0)
+        loaded = snapshot.read_world(data)
+        read = time.perf_counter()
+        results[name] = {
+            "bytes": len(data.getvalue()),
+            "write_seconds": written - start,
+            "read_seconds": read - written,
+            "rooms_loaded": len(loaded.graph.rooms()),
+        }
+    results["legacy"] = _legacy(rooms if legacy_rooms is None else legacy_rooms)
+    return results
+
+
+if __name__ == "__main__":
+    json.dump(run(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,147 @@
+"""A bounded, searchable log of the chat messages in a World."""
+import collections
+import queue
+import re
+import threading
+
+_WORDS = re.compile(r"\w+")
+
+
+class ChatMessage(collections.namedtuple("ChatMessage", ["seq", "text", "room"])):
+    """A chat message. room is None for messages sent to the entire World."""
+    __slots__ = ()
+
+    def __str__(self):
+        return self.text
+
+
+class ChatLog:
+    #pylint: disable-next=line-too-long
+    """Keeps the last maxlen chat messages of a World, plus the last room_maxlen messages of each of the max_rooms Rooms that were talked in last, with an index of the words in them. If archive is a file name, every message is also appended to it on a background thread."""
+
+    #pylint: disable-next=too-many-arguments
+    def __init__(self, maxlen: int = 1000, room_maxlen: int = 100, archive=None,
+                 max_rooms: int = 1000):
+        self.messages = collections.deque(maxlen=maxlen)
+        self.room_maxlen = room_maxlen
+        self.max_rooms = max_rooms
+        # The messages of each Room, the Room talked in last at the end.
+        self.rooms = {}
+        self.words = {}
+        self.archive = archive
+        self._seq = 0
+        self._queue = None
+        self._writer = None
+
+    def add(self, text: str, room=None) -> ChatMessage:
+        """Adds a message. Use room to say which Room it was said in, or None for the World."""
+        if len(self.messages) == self.messages.maxlen:
+            self._unindex(self.messages[0])
+        message = ChatMessage(self._seq, text, room)
+        self._seq += 1
+        self.messages.append(message)
+        if room is not None:
+            channel = self.rooms.pop(room, None)
+            if channel is None:
+                channel = collections.deque(maxlen=self.room_maxlen)
+                if len(self.rooms) >= self.max_rooms:
+                    del self.rooms[next(iter(self.rooms))]
+            channel.append(message)
+            self.rooms[room] = channel
+        for word in set(_WORDS.findall(text.lower())):
+            self.words.setdefault(word, {})[message.seq] = message
+        if self.archive is not None:
+            self._archive(message)
+        return message
+
+    def append(self, text: str) -> None:
+        """Adds a message to the World channel, like a list."""
+        self.add(text)
+
+    def channel(self, room=None):
+        """The messages of a Room, or every message if room is None, oldest first."""
+        if room is None:
+            return self.messages
+        return self.rooms.get(room, ())
+
+    def last(self, count: int, room=None) -> list:
+        """The last count messages, oldest first."""
+        channel = self.channel(room)
+        count = max(0, min(count, len(channel)))
+        return [channel[-i] for i in range(count, 0, -1)]
+
+    def page(self, number: int, size: int = 20, room=None) -> list:
+        """Page number of the messages, oldest first. Page 1 is the newest size messages."""
+        channel = self.channel(room)
+        end = len(channel) - (number - 1) * size
+        start = max(0, end - size)
+        if number < 1 or end <= 0:
+            return []
+        return [channel[i] for i in range(start, end)]
+
+    def pages(self, size: int = 20, room=None) -> int:
+        """How many pages of messages there are."""
+        return -(-len(self.channel(room)) // size)
+
+    def search(self, text: str, room=None, limit: int = 20) -> list:
+        """The last limit messages containing every word of text, oldest first."""
+        found = [self.words.get(word) for word in set(_WORDS.findall(text.lower()))]
+        if not found or not all(found):
+            return []
+        found.sort(key=len)
+        found, others = found[0], found[1:]
+        result = []
+        for seq in reversed(found):
+            message = found[seq]
+            if (room is None or message.room is room) and all(seq in words for words in others):
+                result.append(message)
+                if len(result) == limit:
+                    break
+        result.reverse()
+        return result
+
+    def close(self) -> None:
+        """Waits for everything to be archived and stops the background writer."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+
+    def _unindex(self, message: ChatMessage) -> None:
+        """Removes a message that is about to be forgotten from the word index."""
+        for word in set(_WORDS.findall(message.text.lower())):
+            found = self.words.get(word)
+            if found is not None:
+                found.pop(message.seq, None)
+                if not found:
+                    del self.words[word]
+
+    def _archive(self, message: ChatMessage) -> None:
+        """Hands a message to the background writer, starting it if needed."""
+        if self._writer is None:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write, daemon=True)
+            self._writer.start()
+        room = "" if message.room is None else message.room.name
+        self._queue.put(f"{room}\t{message.text}\n")
+
+    def _write(self) -> None:
+        """Appends queued messages to the archive until None is queued."""
+        with open(self.archive, 'a', encoding='utf-8') as file:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    return
+                file.write(line)
+                if self._queue.empty():
+                    file.flush()
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
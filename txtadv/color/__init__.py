@@ -12,16 +12,108 @@ CYAN = "\u001b[36m"
 WHITE = "\u001b[37m"
 RESET = "\033[0m"
 
+# The ANSI sequence of every style name that has been used, so each is only worked out once.
+_STYLES = {}
+_NAMED = {"black": BLACK, "grey": GREY, "gray": GRAY, "red": RED, "green": GREEN,
+          "yellow": YELLOW, "blue": BLUE, "magenta": MAGENTA, "cyan": CYAN, "white": WHITE,
+          "reset": RESET}
+
+
 def rgb(red, green, blue):
     """RGB colored start part without reset character"""
     return f"\u001b[38;2;{red};{green};{blue}m"
 
 
+def _resolve(name: str) -> str:
+    """The ANSI sequence for a style name. Raises ValueError if there isn't one."""
+    if name.startswith('\u001b'):
+        return name
+    lower = name.strip().lower()
+    if lower in _NAMED:
+        return _NAMED[lower]
+    if lower.startswith("rgb(") and lower.endswith(")"):
+        parts = lower[4:-1].split(",")
+        if len(parts) == 3 and all(part.strip().isdigit() for part in parts):
+            return rgb(*(min(255, int(part)) for part in parts))
+    if lower.startswith("#") and len(lower) == 7:
+        try:
+            return rgb(int(lower[1:3], 16), int(lower[3:5], 16), int(lower[5:7], 16))
+        except ValueError:
+            pass
+    raise ValueError(f"Unknown style `{name}`")
+
+
+def style(name: str) -> str:
+    #pylint: disable-next=line-too-long
+    """The ANSI sequence for a style: a color name like 'blue', 'rgb(255, 128, 0)', '#ff8000', a name given to register_style, or an ANSI sequence itself."""
+    sequence = _STYLES.get(name)
+    if sequence is None:
+        sequence = _STYLES[name] = _resolve(name)
+    return sequence
+
+
+def register_style(name: str, sequence: str) -> None:
+    """Make name a style of its own, like register_style('item', 'blue')."""
+    _STYLES[name] = style(sequence)
+
+
 def colored(text, color):
     """Colored text"""
-    if color.startswith('\u001b') or color.startswith('\033'):
-        return color + text + RESET
-    return globals()[color.upper()] + text + RESET
+    try:
+        return _STYLES[color] + text + RESET
+    except KeyError:
+        return style(color) + text + RESET
+
+
+class Styled:
+    #pylint: disable-next=line-too-long
+    """Text made of spans that each have a style, or none. It's rendered colored or plain in one go, so plain text never has escape sequences put together for it. Styles are looked up when a span is added."""
+    __slots__ = ("spans",)
+
+    def __init__(self, text: str = "", style_name=None):
+        if not text:
+            self.spans = []
+        elif style_name is None:
+            self.spans = [(text, None)]
+        else:
+            self.spans = [(text, _STYLES.get(style_name) or style(style_name))]
+
+    def add(self, text: str, style_name=None) -> "Styled":
+        """Add a span of text in style_name, or with no style if it's None. Returns self."""
+        if style_name is not None:
+            style_name = _STYLES.get(style_name) or style(style_name)
+        self.spans.append((text, style_name))
+        return self
+
+    def render(self, color: bool = True) -> str:
+        """This as a str, with escape sequences if color is True."""
+        if not color:
+            return "".join([text for text, _ in self.spans])
+        return "".join([text if sequence is None else sequence + text + RESET
+                        for text, sequence in self.spans])
+
+    def plain(self) -> str:
+        """This as a str without any escape sequences."""
+        return self.render(False)
+
+    def __add__(self, other):
+        result = Styled()
+        result.spans = self.spans + (other.spans if isinstance(other, Styled) else [(other, None)])
+        return result
+
+    def __radd__(self, other):
+        result = Styled()
+        result.spans = [(other, None)] + self.spans
+        return result
+
+    def __len__(self):
+        return sum(len(text) for text, _ in self.spans)
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.spans!r})"
 
 def background_color(color):
     #pylint: disable-next=line-too-long
@@ -1,15 +1,17 @@
 """The command-related stuff in txtadv."""
 from txtadv.location import get_loc_from_num, get_num_from_loc
-from txtadv.messaging import error, info, setinfomode, no_origin, origin
-from txtadv.color import colored
-import random
+from txtadv.messaging import error, info, info_rendered, setinfomode, no_origin, origin
+from txtadv.color import colored, Styled
+from txtadv import nouns, stats as _stats
+from txtadv.journal import UndoConflict
 import sys
-import pickle
+import os
 import datetime
 
 
 class Command:
-    """A command, such as 'look' or 'examine'."""
+    #pylint: disable-next=line-too-long
+    """A command, such as 'look' or 'examine'. Its func returns something true if it did what it was asked, and None if it couldn't, which is what script 'if' blocks go by."""
 
     #pylint: disable-next=too-many-arguments
     def __init__(self, name: str, func, desc: str, ldesc: str, aliases=None):
@@ -32,71 +34,207 @@ class Command:
         return self.help()
 
     def __call__(self, *args):
-        self.func(*args)
-
-
-#pylint: disable-next=too-many-branches
-def look(inp, _world, player):
-    """Look around from the perspective of the Player passed in."""
-    inp = inp.replace("look", "", 1).strip()
-    if inp.split(" ")[0] == "at":
-        inp = inp.replace("at", "", 1).strip()
-        examine("examine " + inp, _world, player)
-        return
-    setinfomode(no_origin)
-    info(player.loc.name + ": " + player.loc.desc + "\n", player)
-    if len(player.loc.items) > 0:
-        info("There is ", player)
-    for i in player.loc.items:
-        info(colored(i.name, 'blue'), player)
-    info("\n", player)
+        if _stats.ACTIVE is None:
+            return self.func(*args)
+        return _stats.timed(_stats.COMMAND, self.name, self.func, *args)
+
+
+class CommandList(list):
+    """A list of Commands with a prebuilt alias index, so that finding the Command for
+    some input doesn't have to scan every alias of every Command."""
+
+    def __init__(self, cmds=()):
+        super().__init__(cmds)
+        self._index = {}
+        self._lengths = []
+        self._dirty = True
+        # Bumped whenever the list changes, so things that looked up Commands know to look again.
+        self.version = 0
+
+    def rebuild(self):
+        """Rebuild the alias index. Called automatically after the list is changed."""
+        self._index = {}
+        for order, cmd in enumerate(self):
+            for alias in cmd.aliases:
+                # The first Command with an alias wins, same as a linear scan would.
+                self._index.setdefault(alias.lower(), (order, cmd))
+        self._lengths = sorted({len(alias) for alias in self._index})
+        self._dirty = False
+
+    def find(self, inp: str):
+        """Find the Command that inp starts with, or None if there isn't one.
+        If more than one alias matches, the Command that comes first in the list wins."""
+        if self._dirty:
+            self.rebuild()
+        inp = inp.lower()
+        best_order = len(self)
+        best = None
+        for length in self._lengths:
+            if length > len(inp):
+                break
+            found = self._index.get(inp[:length])
+            if found is not None and found[0] < best_order:
+                best_order, best = found
+        return best
+
+    def get(self, alias: str):
+        """The Command with exactly that alias, or None if there isn't one."""
+        if self._dirty:
+            self.rebuild()
+        found = self._index.get(alias.lower())
+        if found is None:
+            return None
+        return found[1]
+
+    def _changed(self):
+        self._dirty = True
+        self.version += 1
+
+    def append(self, cmd):
+        super().append(cmd)
+        self._changed()
+
+    def extend(self, cmds):
+        super().extend(cmds)
+        self._changed()
+
+    def insert(self, index, cmd):
+        super().insert(index, cmd)
+        self._changed()
+
+    def remove(self, cmd):
+        super().remove(cmd)
+        self._changed()
+
+    def pop(self, index=-1):
+        cmd = super().pop(index)
+        self._changed()
+        return cmd
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, key, val):
+        super().__setitem__(key, val)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __iadd__(self, cmds):
+        result = super().__iadd__(cmds)
+        self._changed()
+        return result
+
+
+def _room_parts(room) -> list:
+    """The messages look sends for a Room, one by one, as Styled text."""
+    parts = [Styled(room.name + ": " + room.desc + "\n")]
+    if len(room.items) > 0:
+        parts.append(Styled("There is "))
+    for i in room.items:
+        parts.append(Styled(i.name, 'blue'))
+    parts.append(Styled("\n"))
     nones = 0
-    for i in player.loc.exits:
+    for i in room.exits:
         nones = nones + int(not i)
-    if len(player.loc.exits) == 1 and nones != len(player.loc.exits):
-        info("There is an exit ", player)
-    elif len(player.loc.exits) > 1 and nones != len(player.loc.exits):
-        info("There are exits ", player)
-    for index, val in enumerate(player.loc.exits):
+    if len(room.exits) == 1 and nones != len(room.exits):
+        parts.append(Styled("There is an exit "))
+    elif len(room.exits) > 1 and nones != len(room.exits):
+        parts.append(Styled("There are exits "))
+    for index, val in enumerate(room.exits):
         if val:
             loc = get_loc_from_num(index)
-            res = ''
+            res = Styled()
             if loc == 'up':
-                loc = 'above you'
-                loc = colored(loc, 'green')
-                res = loc
+                res.add('above you', 'green')
             elif loc == 'down':
-                loc = 'below you'
-                loc = colored(loc, 'green')
-                res = loc
+                res.add('below you', 'green')
             else:
-                loc = colored(loc, 'green')
-                res = 'to the ' + loc
-            if index == len(player.loc.exits) - 1:
-                res = 'and ' + res + colored('.', 'grey')
+                res.add('to the ').add(loc, 'green')
+            if index == len(room.exits) - 1:
+                res = 'and ' + res + Styled('.', 'grey')
             else:
-                res = res + colored(', ', 'grey')
-            info(res, player)
-    info("\n", player)
+                res.add(', ', 'grey')
+            parts.append(res)
+    parts.append(Styled("\n"))
+    return parts
+
+
+def render_room(room, color: bool = True) -> str:
+    #pylint: disable-next=line-too-long
+    """What look shows for a Room, colored for Players that use color if color is True. It's put together once and kept until the Room's Items, exits, name or desc change."""
+    items = room.items
+    exits = room.exits
+    cached = getattr(room, "_render", None)
+    if (cached is None or cached[0] is not items or cached[1] != items.version
+            or cached[2] is not exits or cached[3] != exits.version
+            or cached[4] is not room.name or cached[5] is not room.desc):
+        parts = _room_parts(room)
+        cached = [items, items.version, exits, exits.version, room.name, room.desc,
+                  "".join(part.plain() for part in parts), parts]
+        room._render = cached #pylint: disable=protected-access
+    if not color:
+        return cached[6]
+    if isinstance(cached[7], list):
+        # Colored the same way info colors each message, the first time it's needed.
+        cached[7] = "".join(colored(part.render(), 'black') for part in cached[7])
+    return cached[7]
+
+
+def look(inp, _world, player):
+    """Look around from the perspective of the Player passed in."""
+    inp = inp.replace("look", "", 1).strip()
+    if inp.split(" ")[0] == "at":
+        inp = inp.replace("at", "", 1).strip()
+        return examine("examine " + inp, _world, player)
+    room = player.loc
+    plain = render_room(room, False)
+    info_rendered(plain, render_room(room, True) if player.colored else plain, player)
     setinfomode(origin)
+    return True
+
+
+def _phrase(inp):
+    """What comes after the command, however the command was typed."""
+    parts = inp.strip().split(None, 1)
+    return parts[1] if len(parts) > 1 else ""
+
+
+def _one(items, player):
+    """The Item meant if all of items have the same name, or None after asking which one."""
+    if any(item.name != items[0].name for item in items):
+        error(f"Which do you mean: {nouns.choices(items)}?\n", player)
+        return None
+    return items[0]
 
 
 def examine(inp, _world, player):
     """Examine an item."""
-    inp = inp.replace("examine ", "", 1)
-    item = None
-    for i in player.inventory.items:
-        if i.name == inp:
-            item = i
-    for i in player.loc.items:
-        if i.name == inp:
-            item = i
-    if not item:
+    items, everything = nouns.resolve(_phrase(inp), player.loc.items, player.inventory.items)
+    if everything:
+        error("You can only examine one thing at a time!\n", player)
+        return None
+    if not items:
         error("There's no object with that name!\n", player)
-        return
+        return None
+    item = _one(items, player)
+    if item is None:
+        return None
     setinfomode(no_origin)
-    info(colored(item.name + ': ' + item.ldesc, 'yellow') + '\n', player)
+    info(Styled(item.name + ': ' + item.ldesc, 'yellow') + '\n', player)
     setinfomode(origin)
+    return True
 
 
 def tahelp(inp, world, player):
@@ -106,7 +244,7 @@ def tahelp(inp, world, player):
     if inp != "":
         for i in world.cmds:
             if i.name == inp:
-                info(colored(i.name + ": " + i.ldesc + '\n', 'blue'), player)
+                info(Styled(i.name + ": " + i.ldesc + '\n', 'blue'), player)
                 setinfomode(origin)
                 return
         error(
@@ -114,9 +252,9 @@ def tahelp(inp, world, player):
             player)
     for index, val in enumerate(world.cmds):
         if index % 2 == 0:
-            info(colored(val.help() + '\n', 'yellow'), player)
+            info(Styled(val.help() + '\n', 'yellow'), player)
         elif index % 2 == 1:
-            info(colored(val.help() + '\n', 'blue'), player)
+            info(Styled(val.help() + '\n', 'blue'), player)
     setinfomode(origin)
 
 def about(_inp, world, player):
@@ -131,15 +269,35 @@ def move(inp, _world, player):
     dir = get_num_from_loc(inp)
     if dir == -1:
         error("What direction is that?\n", player)
-        return
+        return None
+    if player.loc.exits[dir] is None:
+        error("You can't go that way!\n", player)
+        return None
     player.move(player.loc.exits[dir])
-    look("look",_world,player)
+    return look("look",_world,player)
+
+
+def goto(inp, world, player):
+    """Go to a Room by name, taking the shortest way there"""
+    inp = inp.replace("goto", "", 1).strip()
+    room = world.graph.find(inp)
+    if room is None:
+        error("There's no room with that name!\n", player)
+        return None
+    path = world.graph.path(player.loc, room)
+    if path is None:
+        error("You can't get there from here!\n", player)
+        return None
+    for direction in path:
+        player.move(player.loc.exits[get_num_from_loc(direction)])
+    return look("look", world, player)
 
 
 def moveCommand(dir):
     """Create a move command for a specific direction"""
     def func(_inp,_world,_player):
-        move(f"go {dir}",_world,_player)
+        return move(f"go {dir}",_world,_player)
+    func.direction = dir
     return Command(dir,func,f"Go {dir}","I mean, isn't it obvious?",aliases=[str(dir)[0]])
 
 
@@ -147,123 +305,183 @@ def say(inp, world, player):
     """Say something in the room you are in"""
     inp = inp.replace("say", "", 1).strip()
     world.chat_event.trigger(inp, player.name, local=player.loc)
+    return True
 
 
 def announce(inp, world, player):
     """Announce something to the entire World"""
     inp = inp.replace("announce", "", 1).strip()
     world.chat_event.trigger(inp, player.name, local=None)
+    return True
 
 
-def list_chat(_inp, world, player):
-    """List all chat messages in this World"""
-    setinfomode(no_origin)
-    for i in world.chat:
-        info(i + "\n", player)
-    setinfomode(origin)
-
-
-"""def taif(inp, world, player):
+def list_chat(inp, world, player):
     #pylint: disable-next=line-too-long
-    \"""For Entities, this command is useful for shops or other similar things, because you can test if the player says or does something.\"""
-    inp = inp.replace("if", "", 1).strip()
-    try:
-        result = player.exec(inp.replace("}", "", 1).strip(), world)
-    except AttributeError:
-        error("Sorry, the 'if' command only works for Entities.", player)
-        return
-    if result:
-        player.context += 1
+    """List chat messages in this World. 'chat [page]', 'chat last <count>', 'chat search <word>', and 'chat here ...' for only the room you are in."""
+    words = inp.split()[1:]
+    room = None
+    if words and words[0] == "here":
+        room = player.loc
+        words = words[1:]
+    if len(words) >= 2 and words[0] == "last" and words[1].isdigit():
+        messages = world.chat.last(int(words[1]), room)
+    elif len(words) >= 2 and words[0] == "search":
+        messages = world.chat.search(" ".join(words[1:]), room)
+    elif len(words) == 1 and words[0].isdigit():
+        messages = world.chat.page(int(words[0]), room=room)
+    elif not words:
+        messages = world.chat.page(1, room=room)
     else:
-        player.prevcontext = player.context
-        player.context = "skip"
-
+        error("Try 'chat', 'chat 2', 'chat last 20' or 'chat search <word>'.\n", player)
+        return None
+    if not messages:
+        info("There's nothing there.\n", player)
+        return None
+    setinfomode(no_origin)
+    info("".join(message.text + "\n" for message in messages), player)
+    setinfomode(origin)
+    return True
 
-def said(inp, world, player):
-    \"""Test if something has been said(for entities only)\"""
-    inp = inp.replace("said", "", 1).strip()
-    try:
-        player.exec("look", world)
-    except AttributeError:
-        error("Sorry, the 'said' command only works for Entities.", player)
-    for i in world.chat:
-        ali = i.replace("says: ","")
-        tmp = ali.split(" ")[0]
-        ali = ali.replace(tmp,"").strip()
-        if inp in (i, ali):
-            return True
-    return False"""
 
 def get(inp, _world, player):
-    """Get an item"""
-    inp = inp.replace("get", "", 1).strip().replace("take", "", 1).strip()
-    for i in player.loc.items:
-        if i.name == inp:
-            player.pickup(i)
-            return
-    error("There's no item with that name in the room!\n", player)
+    """Get an item, or 'get all'"""
+    items, everything = nouns.resolve(_phrase(inp), player.loc.items)
+    if not items:
+        error("There's no item with that name in the room!\n" if not everything
+              else "There's nothing here to take!\n", player)
+        return None
+    if not everything:
+        item = _one(items, player)
+        if item is None:
+            return None
+        player.pickup(item)
+        return True
+    for item in items:
+        player.pickup(item)
+        info(f"{item.name}: Taken.\n", player)
+    return True
 
 
 def drop(inp, _world, player):
-    """Drop an item"""
-    inp = inp.replace("drop", "", 1).strip()
-    for i in player.inventory.items:
-        if i.name == inp:
-            i.move(player.loc)
-            return
-    error("There's no item with that name in your inventory!\n", player)
+    """Drop an item, or 'drop all'"""
+    items, everything = nouns.resolve(_phrase(inp), player.inventory.items)
+    if not items:
+        error("There's no item with that name in your inventory!\n" if not everything
+              else "You have nothing to drop!\n", player)
+        return None
+    if not everything:
+        item = _one(items, player)
+        if item is None:
+            return None
+        item.move(player.loc)
+        return True
+    for item in items:
+        item.move(player.loc)
+        info(f"{item.name}: Dropped.\n", player)
+    return True
 
 def inventory(_inp, _world, player):
     if len(player.inventory.items)==0:
         info("You have nothing.\n", player)
-        return
+        return None
     for i in player.inventory.items:
         info(f"{i.name}: {i.sdesc}\n", player)
+    return True
 
 def wait(_inp, _world, player):
     info("Time passes.\n", player)
+    return True
 
 def again(inp, world, player):
     """Perform a command again"""
     inp = player.commands[-2]
-    cmd_count = 0
-    found = False
-    for cmd in world.cmds:
-        for alias in cmd.aliases:
-            if inp.lower().startswith(alias.lower()):
-                setinfomode(origin)
-                cmd(inp, world, player)
-                found = True
-                break
-        if not found:
-            cmd_count += 1
-        else:
-            break
-    if not found:
-        error(
-            f"{random.choice(world.invalid_text)}\n",
-        player)
-
-#def undo(_inp, world, player):
-#    state = world.states[-2]
-#    world.__dict__ = state.__dict__
+    cmd = world.resolve(inp)
+    if cmd is not None:
+        setinfomode(origin)
+        return cmd(inp, world, player)
+    error(
+        f"{world.rng.choice(world.invalid_text)}\n",
+    player)
+    return None
+
+def undo(_inp, world, player):
+    """Undo the last command that changed something"""
+    try:
+        undone = world.journal.undo(player)
+    except UndoConflict:
+        error("Someone else has changed that since, so it can't be undone.\n", player)
+        return None
+    if not undone:
+        error("There's nothing to undo!\n", player)
+        return None
+    info("Undone.\n", player)
+    return True
 
 def quit(_inp, world, _player):
     """Quit the game"""
     sys.exit(0)
 
 def save(inp, world, player):
+    if world.autosaver is not None and not inp.replace("save", "", 1).strip():
+        world.autosaver.checkpoint()
+        info("Saved.\n", player)
+        return
+    #pylint: disable-next=import-outside-toplevel
+    from txtadv.file.autosave import save_in_background
     inp = inp.replace("save", "", 1).strip()
-    game = {"player": {"inventory": player.inventory, "loc": player.loc}}
-    pickle.dump(game, open(f"txtadv/saves/{inp or datetime.datetime.now().ctime()}.tasave","wb"))
+    name = inp or datetime.datetime.now().strftime("%Y-%m-%d-%H%M%S")
+    save_in_background(world, os.path.join(world.save_dir, f"{name}.tasnap"))
     info("Saved.\n", player)
 
 def load(inp, world, player):
+    #pylint: disable-next=import-outside-toplevel
+    from txtadv.file.snapshot import load_world, SnapshotError
     inp = inp.replace("load", "", 1).strip().replace("restore", "", 1).strip()
-    for key, value in enumerate(pickle.load(open(f"txtadv/saves/{inp}.tasave", "rb"))["player"]):
-        world.players[0].__dict__[key] = value
+    try:
+        saved = load_world(os.path.join(world.save_dir, f"{inp}.tasnap"),
+                           world_class=type(world))
+    except (OSError, SnapshotError):
+        error("There's no save with that name!\n", player)
+        return
+    world.restore(saved)
     info("Loaded.\n", player)
 
+def stats(inp, _world, player):
+    #pylint: disable-next=line-too-long
+    """Show what's been taking the time. 'stats [dispatch|command|subscriber|tick]', 'stats on', 'stats off' and 'stats reset'. Only for admins."""
+    if not getattr(player, "admin", False):
+        error("Only admins can do that!\n", player)
+        return
+    words = inp.split()[1:]
+    if words == ["on"]:
+        _stats.enable(_stats.ACTIVE)
+        info("Recording stats.\n", player)
+        return
+    if words == ["off"]:
+        _stats.disable()
+        info("Stopped recording stats.\n", player)
+        return
+    if _stats.ACTIVE is None:
+        error("Stats aren't being recorded. Run 'stats on' to start.\n", player)
+        return
+    if words == ["reset"]:
+        _stats.ACTIVE.reset()
+        info("Stats reset.\n", player)
+        return
+    if len(words) > 1 or (words and words[0] not in _stats.KINDS):
+        error(f"Try 'stats', 'stats on', 'stats off', 'stats reset' or 'stats <kind>', "
+              f"where kind is one of {', '.join(_stats.KINDS)}.\n", player)
+        return
+    lines = []
+    for kind in words or _stats.KINDS:
+        lines.append(f"{kind:<40} {'count':>8} {'total ms':>10} {'p99 ms':>8} {'bytes':>10}\n")
+        for name, summary in _stats.ACTIVE.top(kind):
+            lines.append(f"  {name[-38:]:<38} {summary['count']:>8} {summary['total_ms']:>10.1f} "
+                         f"{summary['p99_ms']:>8.2f} {summary['output_bytes']:>10}\n")
+    setinfomode(no_origin)
+    info("".join(lines), player)
+    setinfomode(origin)
+
 
 globalcmds = [
     Command("save", save, "Save the game", "Good idea before doing something risky."),
@@ -275,9 +493,10 @@ globalcmds = [
             "Look at the room that the current player is in", aliases=["l"]),
     Command("examine", examine, "Examine an item",
             "Examine an item closely to get more info", aliases=["x"]),
+    Command("goto", goto, "Go to a room", "Go to a room by name, the shortest way there"),
     Command("go", move, "Go in a direction", "Go in a certain direction",
             ["move"]),
-    #Command("undo", undo, "Undo a command", "Undo a command"),
+    Command("undo", undo, "Undo a command", "Undo a command"),
     moveCommand("north"),
     moveCommand("south"),
     moveCommand("east"),
@@ -291,11 +510,16 @@ globalcmds = [
     Command("announce", announce, "Announce something to the entire World",
             "Unlike 'say', this command says something to the entire World"),
     Command("chat", list_chat, "List the chat messages",
-            "That's pretty much it", ["list chat"]),
+            "'chat 2' for older ones, 'chat last 20', 'chat search <word>', "
+            "and 'chat here' for this room",
+            ["list chat"]),
     Command("get", get, "Get an item", "You monster!"),
     Command("take", get, "Take an item", "Good. I can trust you."),
     Command("drop", drop, "Drop an item", "That's it."),
     Command("inventory", inventory, "Show your inventory", "See the items you have", aliases=["i"]),
     Command("wait", wait, "Wait a turn", "Might be useful, might not. Who knows.", aliases=["z"]),
-    Command("again", again, "Perform a command again", "Nice if you need to do something a bunch of times", aliases=["g"])
+    Command("stats", stats, "Show timing stats (admins only)",
+            "'stats on' to start recording, then 'stats' to see what's slow"),
+    Command("again", again, "Perform a command again",
+            "Nice if you need to do something a bunch of times", aliases=["g"])
 ]
@@ -0,0 +1,212 @@
+"""Events, the Subscribers they trigger and the EventBus that keeps the Events of everything."""
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import traceback
+import weakref
+from txtadv import stats
+
+
+# How a Subscriber can be run: on the game thread, on a thread pool or as an asyncio task.
+RUN_NOW = None
+RUN_IN_THREAD = "thread"
+RUN_AS_TASK = "task"
+
+_EXECUTOR = []
+
+
+def _executor():
+    """The thread pool Subscribers marked RUN_IN_THREAD run on."""
+    if not _EXECUTOR:
+        _EXECUTOR.append(
+            concurrent.futures.ThreadPoolExecutor(thread_name_prefix="txtadv-event"))
+    return _EXECUTOR[0]
+
+
+def _report(future):
+    """Print the exception of a Subscriber that didn't run on the game thread, if any."""
+    if not future.cancelled() and future.exception() is not None:
+        exc = future.exception()
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+
+class Subscriber:
+    #pylint: disable-next=line-too-long
+    """A Subscriber to an Event. Set run_in to RUN_IN_THREAD or RUN_AS_TASK to keep slow Subscribers (logging, saving...) from holding up the game."""
+    __slots__ = ("func", "events", "run_in")
+    save = ["func", "events"]
+
+    def __init__(self, func, run_in=RUN_NOW):
+        self.func = func
+        self.events = []
+        self.run_in = run_in
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def dispatch(self, *args, **kwargs):
+        """Run this Subscriber the way its run_in says to."""
+        if self.run_in is RUN_NOW:
+            self.func(*args, **kwargs)
+            return
+        if self.run_in == RUN_AS_TASK:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                if inspect.iscoroutinefunction(self.func):
+                    loop.create_task(self.func(*args, **kwargs))
+                else:
+                    loop.call_soon(functools.partial(self.func, *args, **kwargs))
+                return
+        # RUN_IN_THREAD, or RUN_AS_TASK without an event loop to run on.
+        func = self.func
+        if inspect.iscoroutinefunction(func):
+            func = functools.partial(asyncio.run, func(*args, **kwargs))
+            args, kwargs = (), {}
+        _executor().submit(func, *args, **kwargs).add_done_callback(_report)
+
+    def __setitem__(self, key, val):
+        self.events.append(val)
+
+    def subscribe(self, event):
+        """Add an Event to this Subscriber"""
+        self.events.append(event)
+        event.subscribers.append(self)
+
+    def __getitem__(self, key):
+        """get item"""
+        return getattr(self, key)
+
+
+class Event:
+    """An Event that can have multiple Subscribers"""
+    __slots__ = ("subscribers",)
+    save = ["subscribers"]
+
+    def __init__(self):
+        self.subscribers = []
+
+    def add_subscriber(self, subscriber: Subscriber):
+        """Add an subscriber to this Event"""
+        self.subscribers.append(subscriber)
+        subscriber.events.append(self)
+
+    def remove_subscriber(self, subscriber: Subscriber):
+        """Remove a subscriber from this Event"""
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+        if self in subscriber.events:
+            subscriber.events.remove(self)
+
+    def trigger(self, *args, **kwargs):
+        """Trigger this Event with one or more arguments"""
+        if stats.ACTIVE is not None:
+            for sub in self.subscribers:
+                stats.timed(stats.SUBSCRIBER, stats.name_of(sub.func), sub.dispatch,
+                            *args, **kwargs)
+            return
+        for sub in self.subscribers:
+            sub.dispatch(*args, **kwargs)
+
+    def trigger_later(self, scheduler, *args, turns=None, seconds=None, **kwargs):
+        #pylint: disable-next=line-too-long
+        """Trigger this Event in turns turns or seconds seconds, using a Scheduler such as World.scheduler. Returns the Timer, which can be cancelled."""
+        if seconds is not None:
+            return scheduler.after_seconds(seconds, self.trigger, *args, **kwargs)
+        return scheduler.after_turns(1 if turns is None else turns, self.trigger, *args, **kwargs)
+
+    def __getitem__(self, key):
+        """get item"""
+        return getattr(self, key)
+
+
+class EventBus:
+    #pylint: disable-next=line-too-long
+    """Keeps the Events of every Object, indexed by event name and source, so that an Event only reaches the Subscribers of the Object it happened to, plus the Subscribers of every Object of its class."""
+
+    def __init__(self):
+        self._by_class = {}
+        self._by_source = {}
+
+    #pylint: disable-next=too-many-arguments
+    def event(self, name: str, source=None, event_type=Event, source_class=object) -> Event:
+        #pylint: disable-next=line-too-long
+        """The Event for name and source, made if it doesn't exist yet. If source is None, it is the Event for name on everything that is a source_class."""
+        if source is None:
+            by_class = self._by_class.setdefault(name, {})
+            if source_class not in by_class:
+                by_class[source_class] = event_type()
+            return by_class[source_class]
+        by_source = self._by_source.get(name)
+        if by_source is None:
+            by_source = self._by_source[name] = weakref.WeakKeyDictionary()
+        if source not in by_source:
+            by_source[source] = event_type()
+        return by_source[source]
+
+    #pylint: disable-next=too-many-arguments
+    def subscribe(self, name: str, subscriber: Subscriber, source=None, event_type=Event,
+                  source_class=object) -> None:
+        #pylint: disable-next=line-too-long
+        """Trigger subscriber when name is triggered by source, or by anything that is a source_class if source is None."""
+        self.event(name, source, event_type, source_class).add_subscriber(subscriber)
+
+    def unsubscribe(self, name: str, subscriber: Subscriber, source=None,
+                    source_class=object) -> None:
+        """Stop triggering subscriber when name is triggered by source."""
+        if source is None:
+            event = self._by_class.get(name, {}).get(source_class)
+        else:
+            event = self._by_source.get(name, {}).get(source)
+        if event is not None:
+            event.remove_subscriber(subscriber)
+
+    def trigger(self, name: str, source, *args, **kwargs) -> None:
+        """Trigger name for the Subscribers of source and of every class source is."""
+        by_class = self._by_class.get(name)
+        if by_class:
+            for source_class in source.__class__.__mro__:
+                event = by_class.get(source_class)
+                if event is not None:
+                    event.trigger(*args, **kwargs)
+        by_source = self._by_source.get(name)
+        if by_source is not None:
+            event = by_source.get(source)
+            if event is not None:
+                event.trigger(*args, **kwargs)
+
+
+BUS = EventBus()
+
+
+class MoveEvent(Event):
+    """A Event that is triggered when an Object is moved(Includes the player picking it up)."""
+    __slots__ = ()
+
+
+class UseEvent(Event):
+    """A Event that is triggered when an Item is used."""
+    __slots__ = ()
+
+
+class DropEvent(Event):
+    """A Event that is triggered when something is dropped."""
+    __slots__ = ()
+
+
+class EnterEvent(Event):
+    """A Event that is triggered when a Player enters a Room."""
+    __slots__ = ()
+
+
+class ChatEvent(Event):
+    """A Event that is triggered when a Player or Entity says a message."""
+    __slots__ = ()
+
+
+class LeaveEvent(Event):
+    """A Event that is triggered when a Player leaves the World."""
+    __slots__ = ()
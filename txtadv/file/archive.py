@@ -0,0 +1,276 @@
+"""Packed, memory-mapped World archives, for Worlds too big to build in memory up front.
+
+An archive starts with ARCHIVE_MAGIC, a two byte format version, the number of Rooms, the
+number of the start Room and where the index is. Then come records in the snapshot format
+(see txtadv.file.snapshot): a W record and a C record for every class, then a block for
+every Room with its R, X and I records. The index has the offset and length of every block,
+by Room number.
+
+Opening an archive only reads the header. Rooms are made the first time they are needed and
+filled in from the archive the first time they are used (entered, looked at, searched...).
+Only the cache_size most recently used Rooms are kept filled in; older ones that nobody is
+in and that haven't changed are emptied again and reloaded when they're next used.
+"""
+import collections
+import json
+import mmap
+import struct
+import weakref
+
+import txtadv
+from txtadv.file import snapshot
+
+ARCHIVE_MAGIC = b"TXTADVAR"
+ARCHIVE_VERSION = 1
+
+_HEADER = struct.Struct("<IIQ")
+_ENTRY = struct.Struct("<QI")
+_START = len(ARCHIVE_MAGIC) + 2 + _HEADER.size
+
+
+class _Writer(snapshot.ObjectWriter):
+    """An ObjectWriter that numbers Rooms and Items itself, leaving the World alone."""
+
+    def __init__(self, world, writer):
+        super().__init__(world, writer)
+        self.ids = {}
+
+    def oid(self, obj) -> int:
+        found = self.ids.get(obj)
+        if found is None:
+            found = self.ids[obj] = len(self.ids)
+        return found
+
+
+def write_archive(world, file) -> None:
+    #pylint: disable-next=line-too-long
+    """Write the Rooms and Items of world to a binary file as an archive. Players and Entities aren't written."""
+    rooms = [room for room in snapshot._rooms(world) if room is not None] #pylint: disable=protected-access
+    # Inventories aren't part of the map.
+    inventories = {player.inventory for player in list(world.players) + list(world.entities)}
+    rooms = [room for room in rooms if room not in inventories]
+    writer = snapshot.RecordWriter(file, header=False)
+    objects = _Writer(world, writer)
+    for room in rooms:
+        objects.oid(room)
+    file.write(ARCHIVE_MAGIC + ARCHIVE_VERSION.to_bytes(2, "big"))
+    file.write(bytes(_HEADER.size))
+    writer.record(b"W", world.name, world.author, world.desc, objects.oid(world.start), 0)
+    for room in rooms:
+        objects.class_id(room.__class__)
+        for item in room.items:
+            objects.class_id(item.__class__)
+    writer.flush()
+    index = []
+    for room in rooms:
+        start = file.tell()
+        objects.room(room)
+        objects.exits(room)
+        for item in room.items:
+            objects.item(item)
+        writer.flush()
+        index.append(_ENTRY.pack(start, file.tell() - start))
+    index_at = file.tell()
+    file.write(b"".join(index))
+    file.seek(len(ARCHIVE_MAGIC) + 2)
+    file.write(_HEADER.pack(len(rooms), objects.oid(world.start), index_at))
+    file.seek(0, 2)
+
+
+def save_archive(world, file_name: str) -> None:
+    """Write the Rooms and Items of world to an archive file."""
+    with open(file_name, "wb") as file:
+        write_archive(world, file)
+
+
+def _check_header(data) -> None:
+    """Raise SnapshotError if data doesn't start like an archive this version can read."""
+    if data[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+        raise snapshot.SnapshotError("Not a txtadv archive")
+    version = int.from_bytes(data[len(ARCHIVE_MAGIC):len(ARCHIVE_MAGIC) + 2], "big")
+    if version > ARCHIVE_VERSION:
+        raise snapshot.SnapshotError(f"Archive has format version {version}, "
+                                     f"but this copy of txtadv reads up to {ARCHIVE_VERSION}")
+
+
+def _signature(room) -> tuple:
+    """Everything about a Room that would be lost if it were emptied."""
+    return (room.name, room.desc, tuple(room.exits),
+            tuple((item, item.name, item.sdesc, item.ldesc, _copy(item.custom_flags()))
+                  for item in room.items))
+
+
+def _copy(flags):
+    """A copy of flags, so that changing them later can be noticed."""
+    return None if flags is None else dict(flags)
+
+
+class Archive:
+    #pylint: disable-next=line-too-long
+    """An open archive file. Use Archive.world to get a World whose Rooms are loaded from it as they're used."""
+
+    def __init__(self, file_name: str, cache_size: int = 1024):
+        self.cache_size = cache_size
+        #pylint: disable-next=consider-using-with
+        self.file = open(file_name, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            # An empty file can't be mapped.
+            self.file.close()
+            raise snapshot.SnapshotError("Not a txtadv archive") from exc
+        try:
+            _check_header(self.map)
+        except snapshot.SnapshotError:
+            self.map.close()
+            self.file.close()
+            raise
+        self.count, self.start, self.index = _HEADER.unpack_from(self.map, len(ARCHIVE_MAGIC) + 2)
+        self.objects = snapshot.ObjectReader()
+        pos = _START
+        first = _ENTRY.unpack_from(self.map, self.index)[0] if self.count else self.index
+        while pos < first:
+            tag, fields, pos = snapshot.decode_record(self.map, pos)
+            self.objects.apply(tag, fields)
+        self.world_obj = None
+        # Rooms that nothing refers to any more are forgotten and remade when needed.
+        self._rooms = weakref.WeakValueDictionary()
+        self._loaded = collections.OrderedDict()
+        self._pinned = {}
+        self.loads = 0
+        self.evictions = 0
+        self._entered = txtadv.Subscriber(lambda player: self.used(player.loc))
+
+    def room(self, num: int):
+        """The Room with number num. It isn't filled in until it's used."""
+        room = self._rooms.get(num)
+        if room is None:
+            offset = _ENTRY.unpack_from(self.map, self.index + num * _ENTRY.size)[0]
+            cid = snapshot.decode_record(self.map, offset)[1][1]
+            #pylint: disable-next=protected-access
+            cls = self.objects._class(cid, txtadv.Room)
+            room = cls.__new__(cls)
+            room._loader = self #pylint: disable=protected-access
+            room._archived = (num, None) #pylint: disable=protected-access
+            self._rooms[num] = room
+        return room
+
+    def world(self, stdoutin: bool = False, **kwargs):
+        """A World that starts in the start Room of this archive."""
+        name, author, desc = self.objects.meta[:3]
+        kwargs.setdefault("name", name)
+        kwargs.setdefault("author", author)
+        kwargs.setdefault("desc", desc)
+        self.world_obj = txtadv.World(self.room(self.start), stdoutin=stdoutin, **kwargs)
+        self.world_obj.archive = self
+        txtadv.Room.on_any_event("enter", self._entered)
+        return self.world_obj
+
+    def loaded(self) -> int:
+        """How many Rooms are filled in right now."""
+        return len(self._loaded) + len(self._pinned)
+
+    #pylint: disable=protected-access
+    def peek(self, room) -> tuple:
+        """The name and exits of a Room, read from the archive without filling it in."""
+        offset = _ENTRY.unpack_from(self.map, self.index + room._archived[0] * _ENTRY.size)[0]
+        fields, pos = snapshot.decode_record(self.map, offset)[1:]
+        name = fields[2]
+        fields = snapshot.decode_record(self.map, pos)[1]
+        return name, [self.room(exit_num - 1) if exit_num else None for exit_num in fields[1:]]
+
+    def load(self, room) -> None:
+        """Fill in a Room from the archive. Done automatically the first time it's used."""
+        num = room._archived[0]
+        offset, length = _ENTRY.unpack_from(self.map, self.index + num * _ENTRY.size)
+        end = offset + length
+        items = txtadv.ItemList()
+        pos = offset
+        while pos < end:
+            tag, fields, pos = snapshot.decode_record(self.map, pos)
+            if tag == b"R":
+                room.name = fields[2]
+                room.desc = fields[3]
+            elif tag == b"X":
+                # Loading exits doesn't change them, so cached paths are left alone.
+                exits = txtadv.ExitList.__new__(txtadv.ExitList)
+                list.extend(exits, [self.room(exit_num - 1) if exit_num else None
+                                    for exit_num in fields[1:]])
+                exits.owner = room
+                exits.version = 0
+                room._exits = exits
+            else:
+                items.append(self._item(fields, room))
+        room._items = items
+        room._archived = (num, _signature(room))
+        self.loads += 1
+        self._loaded[room] = None
+        self._evict()
+
+    def _item(self, fields, room):
+        """Make an Item from the fields of an I record."""
+        _oid, cid, _loc, name, sdesc, ldesc, flags = fields
+        cls = self.objects._class(cid, txtadv.Item)
+        item = cls.__new__(cls)
+        item.name = name
+        item.sdesc = sdesc
+        item.ldesc = ldesc
+        item.flags = json.loads(flags) if flags else None
+        item.loc = room
+        return item
+
+    def used(self, room) -> None:
+        """Mark a filled in Room as just used, so it's the last to be emptied."""
+        if room in self._loaded:
+            self._loaded.move_to_end(room)
+
+    def _busy(self) -> set:
+        """The Rooms that Players or Entities are in."""
+        world = self.world_obj
+        if world is None:
+            return set()
+        busy = set(world.occupants)
+        busy.update(entity.loc for entity in world.entities)
+        return busy
+
+    def _evict(self) -> None:
+        """Empty the least recently used Rooms until no more than cache_size are filled in."""
+        if len(self._loaded) <= self.cache_size:
+            return
+        busy = self._busy()
+        for room in list(self._loaded):
+            if len(self._loaded) <= self.cache_size:
+                break
+            if room in busy:
+                self._loaded.move_to_end(room)
+                continue
+            del self._loaded[room]
+            num, signature = room._archived
+            if _signature(room) != signature:
+                # It has changed since it was loaded, so it has to stay in memory.
+                self._pinned[room] = None
+                continue
+            for key in ("_name", "desc", "_exits", "_items"):
+                delattr(room, key)
+            # What look shows for it refers to its Items, which have to be let go of too.
+            room._render = None
+            room._archived = (num, None)
+            room._loader = self
+            self.evictions += 1
+    #pylint: enable=protected-access
+
+    def close(self) -> None:
+        """Close the archive file. Rooms that haven't been filled in can't be used after this."""
+        txtadv.BUS.unsubscribe("enter", self._entered, source_class=txtadv.Room)
+        self.map.close()
+        self.file.close()
+
+
+def open_archive(file_name: str, cache_size: int = 1024) -> Archive:
+    """Open an archive file."""
+    return Archive(file_name, cache_size)
+
+
+def load_archive(file_name: str, cache_size: int = 1024, **kwargs):
+    """Open an archive file and return a World for it. World.archive is the Archive."""
+    return open_archive(file_name, cache_size).world(**kwargs)
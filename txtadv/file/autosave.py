@@ -0,0 +1,231 @@
+"""Incremental autosaving of a World: a full snapshot now and then, and a journal of changes.
+
+Everything lives in one directory. snapshot-<n>.tasnap is a snapshot (see
+txtadv.file.snapshot) and journal-<n>.tajournal holds the batches of changes made since
+snapshot <n> was taken. Only the newest snapshot and its journal are kept.
+"""
+import os
+import queue
+import re
+import threading
+import time
+
+from txtadv.file import snapshot
+from txtadv.objects import Room, Item, Player, Entity, track_changes, untrack_changes
+
+_SNAPSHOT = re.compile(r"snapshot-(\d+)\.tasnap$")
+
+
+def _snapshot_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"snapshot-{generation}.tasnap")
+
+
+def _journal_path(directory: str, generation: int) -> str:
+    return os.path.join(directory, f"journal-{generation}.tajournal")
+
+
+def _generations(directory: str) -> list:
+    """The generations of the snapshots in directory, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    found = (_SNAPSHOT.match(name) for name in os.listdir(directory))
+    return sorted(int(match.group(1)) for match in found if match)
+
+
+def _references(obj) -> list:
+    """The Rooms an object refers to."""
+    if isinstance(obj, Room):
+        return [room for room in obj.exits if room is not None]
+    refs = [obj.loc]
+    if isinstance(obj, Player):
+        refs.append(obj.inventory)
+    return refs
+
+
+def save_in_background(world, file_name: str) -> threading.Thread:
+    #pylint: disable-next=line-too-long
+    """Save a snapshot of world to a file. What's in the World is copied straight away, but encoded and written to disk on another thread, which is returned."""
+    records = snapshot.capture_world(world)
+
+    def write():
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_name + ".tmp", "wb") as file:
+            snapshot.write_records(records, file)
+        os.replace(file_name + ".tmp", file_name)
+
+    thread = threading.Thread(target=write, daemon=True)
+    thread.start()
+    return thread
+
+
+class Autosaver:
+    #pylint: disable-next=line-too-long
+    """Autosaves a World to directory. Every interval seconds the Objects and Rooms that changed are appended to the journal, and after compact_after journal batches a full snapshot is taken instead. What's saved is copied on the game thread, and encoded and written on a background thread."""
+
+    def __init__(self, world, directory: str, interval: float = 30.0, compact_after: int = 100):
+        self.world = world
+        self.directory = directory
+        self.interval = interval
+        self.compact_after = compact_after
+        self.dirty = set()
+        self.batches = 0
+        self.generation = 0
+        self._last = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._journal = None
+
+    def start(self) -> None:
+        """Start autosaving, beginning with a full snapshot."""
+        gens = _generations(self.directory)
+        self.generation = gens[-1] if gens else 0
+        self.world.autosaver = self
+        track_changes(self.dirty)
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+        self.compact()
+
+    def tick(self) -> None:
+        """Checkpoint if interval seconds have passed. Called by the World after every command."""
+        if time.monotonic() - self._last >= self.interval:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Save everything that changed since the last checkpoint."""
+        self._last = time.monotonic()
+        if not self.dirty:
+            return
+        if self.batches >= self.compact_after:
+            self.compact()
+            return
+        self.batches += 1
+        self._queue.put(("journal", self.generation, self._batch()))
+
+    def compact(self) -> None:
+        """Save a full snapshot, which replaces the old snapshot and journal."""
+        self._last = time.monotonic()
+        self.dirty.clear()
+        self.batches = 0
+        self.generation += 1
+        self._queue.put(("snapshot", self.generation, snapshot.capture_world(self.world)))
+
+    def close(self) -> None:
+        """Save what's left and stop autosaving."""
+        if self._thread is None:
+            return
+        self.checkpoint()
+        untrack_changes(self.dirty)
+        self._queue.put((None, None, None))
+        self._thread.join()
+        self._thread = None
+        if self.world.autosaver is self:
+            self.world.autosaver = None
+
+    def _batch(self) -> snapshot.RecordList:
+        """The records of the latest state of everything dirty, as a journal batch."""
+        dirty = set(self.dirty)
+        self.dirty.clear()
+        pending = list(dirty)
+        while pending:
+            # Rooms that were never saved have to be written before anything refers to them.
+            for ref in _references(pending.pop()):
+                if ref is not None and ref not in dirty and getattr(ref, "oid", None) is None:
+                    dirty.add(ref)
+                    pending.append(ref)
+        rooms = [obj for obj in dirty if isinstance(obj, Room)]
+        items = [obj for obj in dirty if isinstance(obj, Item)]
+        players = [obj for obj in dirty if isinstance(obj, Player)]
+        records = snapshot.RecordList()
+        objects = snapshot.ObjectWriter(self.world, records)
+        for room in rooms:
+            objects.room(room)
+        for room in rooms:
+            objects.exits(room)
+        for item in items:
+            if item in item.loc.items:
+                objects.item(item)
+            elif getattr(item, "oid", None) is not None:
+                # It was removed from the World, not just moved.
+                records.record(b"D", item.oid)
+        for player in players:
+            if isinstance(player, Entity):
+                objects.entity(player)
+            else:
+                objects.player(player)
+        records.record(b"B", self.batches)
+        return records
+
+    def _write(self) -> None:
+        """Write snapshots and journal batches as they are queued."""
+        while True:
+            kind, generation, records = self._queue.get()
+            if kind is None:
+                break
+            if kind == "snapshot":
+                self._write_snapshot(generation, records)
+            elif self._journal is not None:
+                snapshot.write_records(records, self._journal, snapshot.COMPRESS_NONE,
+                                       header=False)
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _write_snapshot(self, generation: int, records: snapshot.RecordList) -> None:
+        """Write a snapshot and start its journal, then remove older generations."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = _snapshot_path(self.directory, generation)
+        with open(path + ".tmp", "wb") as file:
+            snapshot.write_records(records, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + ".tmp", path)
+        if self._journal is not None:
+            self._journal.close()
+        #pylint: disable-next=consider-using-with
+        self._journal = open(_journal_path(self.directory, generation), "wb")
+        snapshot.RecordWriter(self._journal).close()
+        self._journal.flush()
+        for old in _generations(self.directory):
+            if old < generation:
+                os.remove(_snapshot_path(self.directory, old))
+                if os.path.exists(_journal_path(self.directory, old)):
+                    os.remove(_journal_path(self.directory, old))
+
+
+def recover(directory: str, instream=None, outstream=None):
+    #pylint: disable-next=line-too-long
+    """Load the newest autosave in directory: its snapshot plus every complete batch in its journal. Returns None if there isn't one. Players get instream and outstream."""
+    gens = _generations(directory)
+    if not gens:
+        return None
+    world = snapshot.load_world(_snapshot_path(directory, gens[-1]), instream, outstream)
+    journal = _journal_path(directory, gens[-1])
+    if not os.path.exists(journal):
+        return world
+    objects = snapshot.ObjectReader(snapshot.world_objects(world), instream, outstream)
+    with open(journal, "rb") as file:
+        pending = []
+        try:
+            reader = snapshot.RecordReader(file)
+            while not reader.at_end():
+                tag, fields = reader.record()
+                if tag != b"B":
+                    pending.append((tag, fields))
+                    continue
+                for record in pending:
+                    objects.apply(*record)
+                pending = []
+        except snapshot.SnapshotError:
+            # The last batch was cut off by the crash, so it is left out.
+            pass
+    for player in objects.players:
+        world.add_player(player)
+    for entity in objects.entities:
+        world.add_entity(entity)
+    if objects.objects:
+        world.next_oid = max(world.next_oid, max(objects.objects) + 1)
+    return world
@@ -6,7 +6,8 @@ import marshal
 import pickle
 import json
 from .. import messaging
-from .. import __init__ as txtadv
+import txtadv
+from txtadv.file import snapshot
 
 savepath = os.path.dirname(inspect.getfile(txtadv)) + "/saves"
 
@@ -33,6 +34,8 @@ class Call:
                     return bytes()
 
     def __call__(self, filename):
+        if os.path.exists(filename + ".tasnap"):
+            return snapshot.load_world(filename + ".tasnap")
         try:
             #pylint: disable-next=consider-using-with
             file = pickle.load(open(filename + ".save", 'rb'))
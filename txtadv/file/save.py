@@ -6,7 +6,8 @@ import marshal
 import pickle
 import json
 from .. import messaging
-from .. import __init__ as txtadv
+import txtadv
+from txtadv.file import snapshot
 savepath = os.path.dirname(inspect.getfile(txtadv)) + "/saves"
 
 
@@ -34,6 +35,12 @@ class Call:
                         return bytes()
 
     def __call__(self, item):
+        if isinstance(item, txtadv.World):
+            # Written straight to the file, to World.save_dir rather than into the package.
+            os.makedirs(item.save_dir, exist_ok=True)
+            file_name = os.path.join(item.save_dir, f"{item.name or 'world'}.tasnap")
+            snapshot.save_world(item, file_name)
+            return file_name
         copy = {}
         for ite in item.__class__.save.append("__class__"):
             copy[ite] = self.single_save(item.__getitem__(ite))
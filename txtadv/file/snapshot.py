@@ -0,0 +1,505 @@
+"""A versioned binary snapshot format for an entire World.
+
+A snapshot starts with MAGIC, a two byte format version and a byte saying how the rest is
+compressed. The rest is a stream of records, each a one byte tag, the length of its fields
+and then the fields. Numbers are little-endian unsigned 32 bit ints and strings are their
+length followed by utf-8. Every Room, Item, Player and Entity is written once with a stable
+object id (kept in its oid attribute), and everything that refers to it uses that id, so
+shared references survive a round trip.
+
+Records, in the order they are written:
+    W name author desc start next_oid             the World
+    C id "module:qualname"                        a class used by later records
+    R id class name desc                          a Room (including inventories)
+    X id north south east west up down            the exits of a Room, 0 for none, else id + 1
+    I id class loc name sdesc ldesc flags         an Item, flags is json or "" for the default
+    P id class name loc inventory colored         a Player
+    E id class loc inventory name file_name       an Entity
+    Z                                             the end
+
+Autosave journals (see txtadv.file.autosave) use the same records, minus W and Z, to write
+the latest state of whatever changed, with each batch of changes ended by
+    B number                                      the end of a batch
+and Items that were removed from the World written as
+    D id                                          an Item that is gone
+"""
+import importlib
+import json
+import os
+import struct
+import zlib
+
+from txtadv.objects import Room, Item, Player, Entity
+
+MAGIC = b"TXTADVSN"
+VERSION = 1
+
+COMPRESS_NONE = 0
+COMPRESS_ZLIB = 1
+
+_CHUNK = 1 << 16
+_HEADER = struct.Struct("<cI")
+_LENGTH = struct.Struct("<I")
+
+# The fields of every record: I is an int and S a string.
+_SCHEMAS = {
+    b"W": "SSSII",
+    b"C": "IS",
+    b"R": "IISS",
+    b"X": "IIIIIII",
+    b"I": "IIISSSS",
+    b"P": "IISIII",
+    b"E": "IIIISS",
+    b"B": "I",
+    b"D": "I",
+    b"Z": "",
+}
+
+
+def _compile(schema: str) -> list:
+    """Turn a schema into steps: a Struct for a run of ints, or None for a string."""
+    steps = []
+    ints = 0
+    for field in schema + "S":
+        if field == "I":
+            ints += 1
+            continue
+        if ints:
+            steps.append(struct.Struct(f"<{ints}I"))
+            ints = 0
+        steps.append(None)
+    return steps[:-1]
+
+
+_STEPS = {tag: _compile(schema) for tag, schema in _SCHEMAS.items()}
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is invalid or can't be read by this version of txtadv."""
+
+
+class RecordWriter:
+    """Writes records to a file, compressing them on the way if asked to."""
+
+    def __init__(self, file, compress: int = COMPRESS_NONE, level: int = 6, header: bool = True):
+        self.file = file
+        self.parts = []
+        self.compressor = zlib.compressobj(level) if compress == COMPRESS_ZLIB else None
+        if header:
+            file.write(MAGIC + VERSION.to_bytes(2, "big") + bytes((compress,)))
+
+    def record(self, tag: bytes, *fields) -> None:
+        """Write a record. Fields are ints or strs, in the order of the tag's schema."""
+        payload = []
+        pos = 0
+        for step in _STEPS[tag]:
+            if step is None:
+                data = fields[pos].encode("utf-8")
+                payload.append(_LENGTH.pack(len(data)))
+                payload.append(data)
+                pos += 1
+            else:
+                payload.append(step.pack(*fields[pos:pos + step.size // 4]))
+                pos += step.size // 4
+        payload = b"".join(payload)
+        self.parts.append(_HEADER.pack(tag, len(payload)))
+        self.parts.append(payload)
+        if len(self.parts) > 4096:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out everything recorded so far."""
+        data = b"".join(self.parts)
+        self.parts = []
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        if data:
+            self.file.write(data)
+
+    def close(self) -> None:
+        """Write out everything, including what the compressor is holding on to."""
+        self.flush()
+        if self.compressor is not None:
+            self.file.write(self.compressor.flush())
+
+
+class RecordReader:
+    """Reads records from a file, decompressing it on the way if needed."""
+
+    def __init__(self, file):
+        self.file = file
+        header = file.read(len(MAGIC) + 3)
+        if header[:len(MAGIC)] != MAGIC:
+            raise SnapshotError("Not a txtadv snapshot")
+        version = int.from_bytes(header[len(MAGIC):len(MAGIC) + 2], "big")
+        if version > VERSION:
+            raise SnapshotError(f"Snapshot has format version {version}, "
+                                f"but this copy of txtadv reads up to {VERSION}")
+        compress = header[-1]
+        if compress == COMPRESS_ZLIB:
+            self.decompressor = zlib.decompressobj()
+        elif compress == COMPRESS_NONE:
+            self.decompressor = None
+        else:
+            raise SnapshotError(f"Unknown compression {compress}")
+        self.buf = b""
+        self.pos = 0
+
+    def at_end(self) -> bool:
+        """Whether every record has been read."""
+        try:
+            self._fill(1)
+        except SnapshotError:
+            return True
+        return False
+
+    def _fill(self, needed: int) -> None:
+        """Make sure at least needed bytes are buffered after pos."""
+        while len(self.buf) - self.pos < needed:
+            data = self.file.read(_CHUNK)
+            if self.decompressor is not None:
+                data = self.decompressor.decompress(data) if data else self.decompressor.flush()
+            if not data:
+                raise SnapshotError("Snapshot ends in the middle of a record")
+            self.buf = self.buf[self.pos:] + data
+            self.pos = 0
+
+    def record(self):
+        """Read a record, returning its tag and a list of its fields."""
+        self._fill(_HEADER.size)
+        length = _HEADER.unpack_from(self.buf, self.pos)[1]
+        self._fill(_HEADER.size + length)
+        tag, fields, self.pos = decode_record(self.buf, self.pos)
+        return tag, fields
+
+
+class RecordList(list):
+    #pylint: disable-next=line-too-long
+    """Records kept in memory as (tag, fields) instead of being encoded, to be written later with write_records. Can be used wherever a RecordWriter is."""
+
+    def record(self, tag: bytes, *fields) -> None:
+        """Keep a record."""
+        self.append((tag, fields))
+
+
+def write_records(records, file, compress: int = COMPRESS_ZLIB, level: int = 6,
+                  header: bool = True) -> None:
+    """Write the records of a RecordList to a binary file."""
+    writer = RecordWriter(file, compress, level, header)
+    for tag, fields in records:
+        writer.record(tag, *fields)
+    writer.close()
+
+
+def decode_record(buf, pos: int = 0):
+    #pylint: disable-next=line-too-long
+    """Decode the record at pos in buf, which can be anything that supports slicing and struct.unpack_from (like an mmap). Returns its tag, a list of its fields and where the next record starts."""
+    tag, length = _HEADER.unpack_from(buf, pos)
+    steps = _STEPS.get(tag)
+    if steps is None:
+        raise SnapshotError(f"Unknown record {tag!r}")
+    pos += _HEADER.size
+    end = pos + length
+    fields = []
+    for step in steps:
+        if step is None:
+            size = _LENGTH.unpack_from(buf, pos)[0]
+            pos += 4
+            fields.append(buf[pos:pos + size].decode("utf-8"))
+            pos += size
+        else:
+            fields.extend(step.unpack_from(buf, pos))
+            pos += step.size
+    return tag, fields, end
+
+
+def _oid(world, obj) -> int:
+    """The stable id of obj, given one if it doesn't have one yet."""
+    oid = getattr(obj, "oid", None)
+    if oid is None:
+        oid = world.next_oid
+        world.next_oid += 1
+        obj.oid = oid
+    return oid
+
+
+def _rooms(world) -> list:
+    #pylint: disable-next=line-too-long
+    """Every Room the World can get to: through exits, Player and Entity locations and inventories."""
+    seen = {}
+    stack = [world.start]
+    for player in list(world.players) + list(world.entities):
+        stack.append(player.loc)
+        stack.append(player.inventory)
+    while stack:
+        room = stack.pop()
+        if room is None or room in seen:
+            continue
+        seen[room] = None
+        for exit_room in room.exits:
+            if exit_room is not None and exit_room not in seen:
+                stack.append(exit_room)
+    return list(seen)
+
+
+class ObjectWriter:
+    """Writes the records of Rooms, Items, Players and Entities of a World."""
+
+    def __init__(self, world, writer: RecordWriter):
+        self.world = world
+        self.writer = writer
+        self.classes = {}
+
+    def oid(self, obj) -> int:
+        """The stable id of obj, given one if it doesn't have one yet."""
+        return _oid(self.world, obj)
+
+    def class_id(self, cls) -> int:
+        """The id of a class, writing it the first time it is used."""
+        found = self.classes.get(cls)
+        if found is None:
+            found = self.classes[cls] = len(self.classes)
+            self.writer.record(b"C", found, f"{cls.__module__}:{cls.__qualname__}")
+        return found
+
+    def room(self, room) -> None:
+        """Write a Room, without its exits."""
+        self.writer.record(b"R", self.oid(room), self.class_id(room.__class__), room.name,
+                           room.desc)
+
+    def exits(self, room) -> None:
+        """Write the exits of a Room. Every Room it leads to has to be written too."""
+        exits = [0 if exit_room is None else self.oid(exit_room) + 1 for exit_room in room.exits]
+        exits += [0] * (6 - len(exits))
+        self.writer.record(b"X", self.oid(room), *exits[:6])
+
+    def item(self, item) -> None:
+        """Write an Item."""
+        flags = item.custom_flags()
+        flags = "" if flags is None else json.dumps(flags)
+        self.writer.record(b"I", self.oid(item), self.class_id(item.__class__),
+                           self.oid(item.loc), item.name, item.sdesc, item.ldesc, flags)
+
+    def player(self, player) -> None:
+        """Write a Player."""
+        self.writer.record(b"P", self.oid(player), self.class_id(player.__class__), player.name,
+                           self.oid(player.loc), self.oid(player.inventory),
+                           int(bool(player.colored)))
+
+    def entity(self, entity) -> None:
+        """Write an Entity."""
+        self.writer.record(b"E", self.oid(entity), self.class_id(entity.__class__),
+                           self.oid(entity.loc), self.oid(entity.inventory), entity.name,
+                           entity.file_name)
+
+
+def write_world(world, file, compress: int = COMPRESS_ZLIB, level: int = 6) -> None:
+    """Write a snapshot of world to a binary file."""
+    writer = RecordWriter(file, compress, level)
+    _write_objects(world, writer)
+    writer.close()
+
+
+def capture_world(world) -> RecordList:
+    #pylint: disable-next=line-too-long
+    """The records of a snapshot of world, without encoding them, so they can be written with write_records on another thread while the World goes on changing."""
+    records = RecordList()
+    _write_objects(world, records)
+    return records
+
+
+def _write_objects(world, writer) -> None:
+    """Write the records of a snapshot of world, from W to Z."""
+    objects = ObjectWriter(world, writer)
+    rooms = _rooms(world)
+    for room in rooms:
+        objects.oid(room)
+    for player in list(world.players) + list(world.entities):
+        objects.oid(player)
+    items = [item for room in rooms for item in room.items]
+    for item in items:
+        objects.oid(item)
+    writer.record(b"W", world.name, world.author, world.desc, world.start.oid, world.next_oid)
+    for room in rooms:
+        objects.room(room)
+    for room in rooms:
+        objects.exits(room)
+    for item in items:
+        objects.item(item)
+    for player in world.players:
+        objects.player(player)
+    for entity in world.entities:
+        objects.entity(entity)
+    writer.record(b"Z")
+
+
+def _load_class(name: str, base: type) -> type:
+    """Import a class written as module:qualname, which has to be a subclass of base."""
+    module, _, qualname = name.partition(":")
+    cls = importlib.import_module(module)
+    for part in qualname.split("."):
+        cls = getattr(cls, part)
+    if not isinstance(cls, type) or not issubclass(cls, base):
+        raise SnapshotError(f"{name} isn't a {base.__name__}")
+    return cls
+
+
+class ObjectReader:
+    #pylint: disable-next=line-too-long
+    """Applies records to a set of objects by id, making the objects that don't exist yet and updating the ones that do."""
+
+    def __init__(self, objects=None, instream=None, outstream=None):
+        self.objects = {} if objects is None else objects
+        self.instream = instream
+        self.outstream = outstream
+        self.classes = {}
+        self.meta = None
+        self.players = []
+        self.entities = []
+
+    def _class(self, cid: int, base: type) -> type:
+        """The class with id cid, imported the first time it is used."""
+        cls = self.classes[cid]
+        if isinstance(cls, str):
+            cls = self.classes[cid] = _load_class(cls, base)
+        return cls
+
+    def apply(self, tag: bytes, fields: list) -> None:
+        """Apply a record."""
+        handler = getattr(self, "_" + tag.decode("ascii"), None)
+        if handler is None:
+            raise SnapshotError(f"Unexpected record {tag!r}")
+        handler(*fields)
+
+    def _W(self, *fields): #pylint: disable=invalid-name
+        self.meta = fields
+
+    def _C(self, cid, name): #pylint: disable=invalid-name
+        self.classes[cid] = name
+
+    def _R(self, oid, cid, name, desc): #pylint: disable=invalid-name
+        room = self.objects.get(oid)
+        if room is None:
+            cls = self._class(cid, Room)
+            room = self.objects[oid] = cls.__new__(cls)
+            room.items = []
+            room.oid = oid
+        room.name = name
+        room.desc = desc
+
+    def _X(self, oid, *exits): #pylint: disable=invalid-name
+        self.objects[oid].exits = [self.objects[num - 1] if num else None for num in exits]
+
+    #pylint: disable-next=invalid-name,too-many-arguments
+    def _I(self, oid, cid, loc, name, sdesc, ldesc, flags):
+        loc = self.objects[loc]
+        item = self.objects.get(oid)
+        if item is None:
+            cls = self._class(cid, Item)
+            item = self.objects[oid] = cls.__new__(cls)
+            item.oid = oid
+        elif item.loc is not loc or item.name != name:
+            # ItemLists index by name, so take it out while it changes.
+            item.loc.items.discard(item)
+        else:
+            loc = None
+        item.name = name
+        item.sdesc = sdesc
+        item.ldesc = ldesc
+        item.flags = json.loads(flags) if flags else None
+        if loc is not None:
+            item.loc = loc
+            loc.items.append(item)
+
+    #pylint: disable-next=invalid-name,too-many-arguments
+    def _P(self, oid, cid, name, loc, inventory, colored):
+        player = self.objects.get(oid)
+        if player is None:
+            cls = self._class(cid, Player)
+            player = cls(self.objects[loc], self.instream, self.outstream, name=name)
+            player.oid = oid
+            self.objects[oid] = player
+            self.players.append(player)
+        elif player.loc is not self.objects[loc]:
+            player.move(self.objects[loc])
+        player.name = name
+        player.inventory = self.objects[inventory]
+        player.colored = bool(colored)
+
+    def _D(self, oid): #pylint: disable=invalid-name
+        item = self.objects.pop(oid, None)
+        if item is not None:
+            item.loc.items.discard(item)
+
+    #pylint: disable-next=invalid-name,too-many-arguments
+    def _E(self, oid, cid, loc, inventory, name, file_name):
+        entity = self.objects.get(oid)
+        if entity is None:
+            entity = self._class(cid, Entity)(self.objects[loc], file_name)
+            entity.oid = oid
+            self.objects[oid] = entity
+            self.entities.append(entity)
+        elif entity.loc is not self.objects[loc]:
+            entity.move(self.objects[loc])
+        entity.name = name
+        entity.inventory = self.objects[inventory]
+
+
+#pylint: disable-next=too-many-locals
+def read_world(file, instream=None, outstream=None, world_class=None):
+    #pylint: disable-next=line-too-long
+    """Read a World from a binary file written by write_world. Players get instream and outstream, since streams can't be saved. The World is a world_class, txtadv.World by default."""
+    reader = RecordReader(file)
+    objects = ObjectReader(instream=instream, outstream=outstream)
+    while True:
+        tag, fields = reader.record()
+        if tag == b"Z":
+            break
+        objects.apply(tag, fields)
+    if objects.meta is None:
+        raise SnapshotError("Snapshot has no World record")
+    name, author, desc, start, next_oid = objects.meta
+    if world_class is None:
+        # Looked up like the classes of the objects, since txtadv imports this module.
+        world_class = _load_class("txtadv:World", object)
+    world = world_class(objects.objects[start], author=author, name=name, desc=desc,
+                        stdoutin=False)
+    world.next_oid = next_oid
+    for player in objects.players:
+        world.add_player(player)
+    for entity in objects.entities:
+        world.add_entity(entity)
+    return world
+
+
+def world_objects(world) -> dict:
+    """Every Room, Item, Player and Entity of world that has an id, by id."""
+    objects = {}
+    for room in _rooms(world):
+        if getattr(room, "oid", None) is not None:
+            objects[room.oid] = room
+        for item in room.items:
+            if getattr(item, "oid", None) is not None:
+                objects[item.oid] = item
+    for player in list(world.players) + list(world.entities):
+        if getattr(player, "oid", None) is not None:
+            objects[player.oid] = player
+    return objects
+
+
+def save_world(world, file_name: str, compress: int = COMPRESS_ZLIB) -> None:
+    """Write a snapshot of world to a file, replacing it only once it's all written."""
+    with open(file_name + ".tmp", "wb") as file:
+        write_world(world, file, compress)
+    os.replace(file_name + ".tmp", file_name)
+
+
+def load_world(file_name: str, instream=None, outstream=None, world_class=None):
+    """Read a World from a snapshot file."""
+    with open(file_name, "rb") as file:
+        return read_world(file, instream, outstream, world_class)
+
+
+def is_snapshot(data: bytes) -> bool:
+    """Whether data is the start of a snapshot."""
+    return data[:len(MAGIC)] == MAGIC
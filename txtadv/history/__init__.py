@@ -0,0 +1,97 @@
+"""Bounded histories, like Player.transcript and Player.commands, that can spill to disk."""
+import collections
+import itertools
+import json
+import os
+import weakref
+
+# The History using each spill file, so that two of them never share one.
+_PATHS = weakref.WeakValueDictionary()
+
+
+def _claim(path, history):
+    """path, or path with -2, -3... before its extension if another History is using it."""
+    root, ext = os.path.splitext(path)
+    claimed = path
+    for number in itertools.count(2):
+        if _PATHS.get(claimed) is None:
+            break
+        claimed = f"{root}-{number}{ext}"
+    _PATHS[claimed] = history
+    return claimed
+
+
+class History:
+    #pylint: disable-next=line-too-long
+    """A list-like history that only keeps the newest maxlen entries in memory. If path isn't None, older entries are appended to that file as json lines instead of being forgotten. Whatever was in the file before is thrown away the first time anything is spilled, and if another History is using path, a file next to it is used instead."""
+
+    def __init__(self, maxlen=1000, path=None):
+        self.entries = collections.deque(maxlen=maxlen)
+        self.path = None if path is None else _claim(path, self)
+        self.spilled = 0
+        self._file = None
+
+    @property
+    def maxlen(self):
+        """The most entries that are kept in memory, or None for no limit"""
+        return self.entries.maxlen
+
+    def append(self, entry):
+        """Add an entry, spilling the oldest one to disk if the history is full"""
+        if self.path is not None and len(self.entries) == self.entries.maxlen:
+            self._spill(self.entries[0])
+        self.entries.append(entry)
+
+    def extend(self, entries):
+        """Add a number of entries"""
+        for entry in entries:
+            self.append(entry)
+
+    def clear(self):
+        """Forget the entries in memory. Anything spilled to disk is kept."""
+        self.entries.clear()
+
+    def all(self):
+        """Every entry ever added, oldest first, including the ones spilled to disk"""
+        if self.spilled:
+            self.flush()
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in itertools.islice(file, self.spilled):
+                    yield json.loads(line)
+        yield from self.entries
+
+    def flush(self):
+        """Make sure everything spilled is written to disk"""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Close the spill file. It is opened again if anything else is spilled."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _spill(self, entry):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # The first spill starts the file again, in case it's left over from an earlier run.
+            #pylint: disable-next=consider-using-with
+            self._file = open(self.path, 'a' if self.spilled else 'w', encoding='utf-8')
+        self._file.write(json.dumps(entry) + "\n")
+        self.spilled += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.entries)[index]
+        return self.entries[index]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self.entries)!r})"
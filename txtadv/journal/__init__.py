@@ -0,0 +1,91 @@
+"""A journal of reversible changes to a World, used to undo commands."""
+import collections
+import contextvars
+
+_ACTIVE = contextvars.ContextVar("txtadv_journal", default=None)
+
+
+class UndoConflict(ValueError):
+    """Raised by Journal.undo when someone else has changed what a command changed since."""
+
+
+def record(*delta):
+    """Record a change in the journal that is currently recording, if there is one."""
+    journal = _ACTIVE.get()
+    if journal is not None and journal.current is not None:
+        journal.current.append(delta)
+
+
+class Journal:
+    #pylint: disable-next=line-too-long
+    """Keeps the changes made by the last depth commands of every Player, so they can be undone without copying the World."""
+
+    def __init__(self, depth: int = 100):
+        self.depth = depth
+        self.groups = {}
+        self.current = None
+        self._player = None
+        self._token = None
+
+    def begin(self, player) -> None:
+        """Start recording the changes made by a command of player."""
+        self.current = []
+        self._player = player
+        self._token = _ACTIVE.set(self)
+
+    def commit(self) -> None:
+        """Stop recording. Commands that didn't change anything aren't kept."""
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+        if self.current:
+            if self._player not in self.groups:
+                self.groups[self._player] = collections.deque(maxlen=self.depth)
+            self.groups[self._player].append(self.current)
+        self.current = None
+        self._player = None
+
+    def forget(self, player) -> None:
+        """Forget everything recorded for player."""
+        self.groups.pop(player, None)
+
+    def undo(self, player) -> bool:
+        #pylint: disable-next=line-too-long
+        """Undo the last command of player that changed something. Returns False if there's nothing to undo. If someone else has changed the same things since, the command is forgotten, since it can't be undone any more, and UndoConflict is raised."""
+        groups = self.groups.get(player)
+        if not groups:
+            return False
+        group = groups[-1]
+        seen = set()
+        for delta in reversed(group):
+            # Only the last change to each object has to still be in place.
+            if (delta[0], id(delta[1])) in seen:
+                continue
+            seen.add((delta[0], id(delta[1])))
+            if not _DELTAS[delta[0]][0](*delta[1:]):
+                groups.pop()
+                raise UndoConflict("someone else has changed that since")
+        groups.pop()
+        # Reverting moves things back with move, which mustn't be recorded itself.
+        current, self.current = self.current, None
+        try:
+            for delta in reversed(group):
+                _DELTAS[delta[0]][1](*delta[1:])
+        finally:
+            self.current = current
+        return True
+
+
+def _loc_unchanged(obj, _old, new):
+    # An Item can be taken out of the items of its loc, with Room.remove_item, without moving it.
+    return obj.loc is new and (not obj.listed or obj in new.items)
+
+
+def _revert_loc(obj, old, _new):
+    obj.move(old)
+
+
+# What each kind of delta is checked and reverted with.
+_DELTAS = {
+    "loc": (_loc_unchanged, _revert_loc),
+}
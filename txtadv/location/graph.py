@@ -0,0 +1,151 @@
+"""A graph of the Rooms in a World, for finding paths between them."""
+import collections
+import weakref
+
+from txtadv.location import get_loc_from_num
+
+# Every RoomGraph, so that the ones a Room is in can be told when its exits change.
+_GRAPHS = weakref.WeakSet()
+
+
+def exits_changed(room) -> None:
+    #pylint: disable-next=line-too-long
+    """Mark the cached paths of every RoomGraph that room is in as stale. Called automatically when the exits of a Room are changed."""
+    for graph in list(_GRAPHS):
+        graph.changed(room)
+
+
+def room_renamed(room) -> None:
+    """Tell every RoomGraph that room is in about its new name. Called by Room.name."""
+    for graph in list(_GRAPHS):
+        graph.renamed(room)
+
+
+class RoomGraph:
+    #pylint: disable-next=line-too-long
+    """The Rooms reachable from a starting Room. Shortest paths are found with a breadth-first search that is cached for the last cache_size starting Rooms, and thrown away when the exits of a reachable Room change."""
+
+    def __init__(self, start, cache_size: int = 128):
+        self.start = start
+        self.cache_size = cache_size
+        # Bumped whenever the exits of a Room in this graph change, so caches know to look again.
+        self.version = 0
+        self._built = None
+        # Every reachable Room by lowercase name, or None until it's next needed.
+        self._names = None
+        # Every reachable Room, in the order they're reached, or None until it's worked out.
+        self._rooms = None
+        self._trees = collections.OrderedDict()
+        _GRAPHS.add(self)
+
+    def changed(self, room) -> None:
+        #pylint: disable-next=line-too-long
+        """Throw away the cached paths, which can go through Rooms that can't be reached from the starting Room, and mark the graph as stale if room is in it. Called by exits_changed."""
+        self._trees.clear()
+        if self._rooms is None or room in self._rooms:
+            self.version += 1
+
+    def renamed(self, room) -> None:
+        """Index room by its new name, if it's in this graph. Called by room_renamed."""
+        if self._rooms is not None and room in self._rooms:
+            self._names = None
+
+    def _check(self):
+        """Rebuild the index if any exits have changed since it was built."""
+        if self._built == self.version:
+            return
+        self._trees.clear()
+        self._names = None
+        self._rooms = {}
+        for room, _, _, _ in self._search(self.start):
+            self._rooms[room] = None
+        self._built = self.version
+
+    @staticmethod
+    def _search(start, limit=None):
+        """Yields every Room reachable from start with the Room it was reached from, the
+        direction taken and its distance, closest first."""
+        seen = {start}
+        queue = collections.deque([(start, None, -1, 0)])
+        while queue:
+            room, prev, direction, dist = queue.popleft()
+            yield room, prev, direction, dist
+            if limit is not None and dist >= limit:
+                continue
+            # Rooms from a txtadv.file.archive aren't filled in just to find out where they lead.
+            for index, exit_room in enumerate(room.peek()[1]):
+                if exit_room is not None and exit_room not in seen:
+                    seen.add(exit_room)
+                    queue.append((exit_room, room, index, dist + 1))
+
+    def _tree(self, source):
+        """The breadth-first search tree from source, from the cache if possible."""
+        self._check()
+        tree = self._trees.get(source)
+        if tree is not None:
+            self._trees.move_to_end(source)
+            return tree
+        tree = {}
+        for room, prev, direction, dist in self._search(source):
+            tree[room] = (prev, direction, dist)
+        self._trees[source] = tree
+        if len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return tree
+
+    def rooms(self) -> list:
+        """Every Room reachable from the starting Room"""
+        self._check()
+        return list(self._rooms)
+
+    def find(self, name: str):
+        """The reachable Room with that name (ignoring case), or None if there isn't one"""
+        self._check()
+        if self._names is None:
+            self._names = {}
+            for room in self._rooms:
+                self._names.setdefault(room.peek()[0].lower(), []).append(room)
+        rooms = self._names.get(name.lower())
+        if not rooms:
+            return None
+        return rooms[0]
+
+    def neighbours(self, room) -> dict:
+        """The Rooms next to room, by direction"""
+        return {
+            get_loc_from_num(index): exit_room
+            for index, exit_room in enumerate(room.exits) if exit_room is not None
+        }
+
+    def distance(self, source, target):
+        """How many steps it takes to get from source to target, or None if you can't"""
+        found = self._tree(source).get(target)
+        if found is None:
+            return None
+        return found[2]
+
+    def path(self, source, target):
+        #pylint: disable-next=line-too-long
+        """The directions to take to get from source to target as a list like ['north', 'up'], or None if you can't get there"""
+        tree = self._tree(source)
+        if target not in tree:
+            return None
+        path = []
+        room = target
+        while room is not source:
+            prev, direction, _ = tree[room]
+            path.append(get_loc_from_num(direction))
+            room = prev
+        path.reverse()
+        return path
+
+    def next_step(self, source, target):
+        """The direction to take first to get from source to target, or None"""
+        path = self.path(source, target)
+        if not path:
+            return None
+        return path[0]
+
+    def within(self, source, steps: int) -> dict:
+        """Every Room at most steps steps away from source, with its distance"""
+        return {room: dist for room, _, _, dist in self._search(source, steps)}
@@ -1,75 +1,147 @@
 """The messaging/error components of txtadv."""
-from inspect import FrameInfo
-import inspect
+import contextvars
+import sys
 
-from txtadv.color import colored
+from txtadv.color import colored, Styled
 
 
 def no_origin():
     """The no origin mode of logging."""
-    return [FrameInfo('', 0, '', '', 0, 0), FrameInfo('', 0, '', '', 0, 0)]
 
 
-origin = inspect.stack
+def origin():
+    """The origin mode of logging. Messages are prefixed with where they came from."""
+
+
+_MODE = contextvars.ContextVar("txtadv_infomode", default=origin)
+
+# What kind of target each type is, so that it only has to be found out once per type.
+_STREAM = "stream"
+_PLAYER = "player"
+_KINDS = {}
+# Players that have buffered output waiting to be flushed.
+_PENDING = []
+# Whether messages are thrown away instead of sent, see mute.
+_MUTED = False
+# The bytes of messages sent, counted only while txtadv.stats is recording.
+_SENT = None
 
 
 def setinfomode(mode):
     """Set the info mode of messaging."""
-    inspect.stack = mode
-
-
-def error(message, target):
-    """Print an error to the target."""
-    ocolored(message, target, 'red')
-
-
-def info(message, target):
-    """Print an info message to the target"""
-    ocolored(message, target, 'black')
-
-#pylint: disable-next=too-many-branches
-def ocolored(message, target, color):
-    """Print an colored message to the target if it is supported."""
-    write = True
-    try:
-        target.write("")
-    except AttributeError:
-        write = False
-    if write:
-        if target.colored:
-            if inspect.stack == origin:
-                target.write(
-                    colored(
-                        inspect.stack()[1].function.upper() + ": " + message,
-                        color))
-            else:
-                target.write(colored(message, color))
-        else:
-            if inspect.stack == origin:
-                target.write(inspect.stack()[1].function.upper() + ": " +
-                             message)
-            else:
-                target.write(message)
-    else:
-        if target.colored:
-            if inspect.stack == origin:
-                target.outstream.write(
-                    colored(
-                        inspect.stack()[1].function.upper() + ": " + message,
-                        color))
-                target.transcript.append(inspect.stack()[1].function.upper() + ": " + message)
-            else:
-                target.outstream.write(colored(message, color))
-                target.transcript.append(message)
+    _MODE.set(mode)
+
+
+def getinfomode():
+    """Get the info mode of messaging."""
+    return _MODE.get()
+
+
+def mute(on: bool) -> None:
+    """Start or stop throwing away every message instead of sending it, like txtadv.replay does."""
+    #pylint: disable-next=global-statement
+    global _MUTED
+    _MUTED = on
+
+
+def count_output(on: bool) -> None:
+    """Start or stop counting the bytes of messages sent. Used by txtadv.stats."""
+    #pylint: disable-next=global-statement
+    global _SENT
+    _SENT = [0] if on else None
+
+
+def sent() -> int:
+    """The bytes of messages sent since counting was started."""
+    return 0 if _SENT is None else _SENT[0]
+
+
+def error(message, target, source=None):
+    #pylint: disable-next=line-too-long
+    """Print an error to the target. In origin mode it is prefixed with source, or 'ERROR' if source is None."""
+    ocolored(message, target, 'red', source or "error")
+
+
+def info(message, target, source=None):
+    #pylint: disable-next=line-too-long
+    """Print an info message to the target. In origin mode it is prefixed with source, or 'INFO' if source is None."""
+    ocolored(message, target, 'black', source or "info")
+
+
+def _kind(target):
+    """Whether target is a stream or a Player, looked up once per type."""
+    kind = _KINDS.get(target.__class__)
+    if kind is None:
+        kind = _STREAM if callable(getattr(target, "write", None)) else _PLAYER
+        _KINDS[target.__class__] = kind
+    return kind
+
+
+def ocolored(message, target, color, source=None):
+    #pylint: disable-next=line-too-long
+    """Print an colored message to the target if it is supported. In origin mode it is prefixed with source, or the name of the calling function if source is None."""
+    if _MUTED:
+        return
+    if _MODE.get() is origin:
+        if source is None:
+            #pylint: disable-next=protected-access
+            source = sys._getframe(1).f_code.co_name
+        message = source.upper() + ": " + message
+    if _SENT is not None:
+        _SENT[0] += len(message)
+    # Styled messages only get escape sequences put together for targets that are colored.
+    styled = message.__class__ is Styled
+    if _kind(target) is _STREAM:
+        if getattr(target, "colored", False):
+            target.write(colored(message.render() if styled else message, color))
         else:
-            if inspect.stack == origin:
-                target.outstream.write(inspect.stack()[1].function.upper() +
-                                       ": " + message)
-                target.transcript.append(inspect.stack()[1].function.upper() + ": " + message)
-            else:
-                target.outstream.write(message)
-                target.transcript.append(message)
-    if write:
+            target.write(message.plain() if styled else message)
         target.flush()
+        return
+    if target.colored:
+        if styled:
+            target.transcript.append(message.plain())
+            message = message.render()
+        else:
+            target.transcript.append(message)
+        message = colored(message, color)
     else:
-        target.outstream.flush()
+        if styled:
+            message = message.plain()
+        target.transcript.append(message)
+    if target.buffered:
+        if not target.buffer:
+            _PENDING.append(target)
+        target.buffer.append(message)
+        return
+    target.outstream.write(message)
+    target.outstream.flush()
+
+
+def info_rendered(message, rendered, target):
+    #pylint: disable-next=line-too-long
+    """Send a message that has been put together and colored already, in one go. Players and streams that are colored get rendered, anything else gets message. Always in no origin mode."""
+    if _MUTED:
+        return
+    if _SENT is not None:
+        _SENT[0] += len(message)
+    if _kind(target) is _STREAM:
+        target.write(rendered if getattr(target, "colored", False) else message)
+        target.flush()
+        return
+    target.transcript.append(message)
+    if target.colored:
+        message = rendered
+    if target.buffered:
+        if not target.buffer:
+            _PENDING.append(target)
+        target.buffer.append(message)
+        return
+    target.outstream.write(message)
+    target.outstream.flush()
+
+
+def flush_pending():
+    """Flush every Player that has buffered output waiting."""
+    while _PENDING:
+        _PENDING.pop().flush()
@@ -0,0 +1,96 @@
+"""Working out which Items a Player means, from what they typed after the command.
+
+A phrase is split into lowercase words, leaving out articles, and it means every Item whose
+name has all of those words, so "key", "rusty key" and "the rusty key" all mean "a rusty key".
+A word can also be the plural of one in the name. "all" or "everything" at the start means
+every Item that matches the rest, or every Item if there isn't any rest. An Item whose name is
+exactly the phrase always wins, and so do Items whose name has no words other than the ones
+typed, so "get key" takes "key" even with "a rusty key" in the same Room.
+
+ItemList keeps an index from each word to the Items whose name has it, made the first time
+it's searched, so this doesn't look at every Item in the Room.
+"""
+import re
+
+ARTICLES = frozenset(("a", "an", "the", "some"))
+EVERYTHING = frozenset(("all", "everything"))
+
+_WORD = re.compile(r"[a-z0-9']+")
+# The words of every name and phrase split so far. Cleared when it gets too big.
+_WORDS = {}
+_MAX_WORDS = 1 << 16
+
+
+def words(text: str) -> tuple:
+    """The lowercase words of text, without articles."""
+    found = _WORDS.get(text)
+    if found is None:
+        if len(_WORDS) >= _MAX_WORDS:
+            _WORDS.clear()
+        found = _WORDS[text] = tuple(word for word in _WORD.findall(text.lower())
+                                     if word not in ARTICLES)
+    return found
+
+
+def parse(phrase: str) -> tuple:
+    """Split a phrase into (everything, words), where everything is whether it starts with all."""
+    found = words(phrase)
+    if found and found[0] in EVERYTHING:
+        return True, found[1:]
+    return False, found
+
+
+def _best(phrase: str, tokens: tuple, matches: list, name=lambda item: item.name) -> list:
+    """The matches that are named exactly what was typed, if any, or else all of them."""
+    exact = [match for match in matches if name(match) == phrase]
+    if exact:
+        return exact
+    exact = [match for match in matches if words(name(match)) == tokens]
+    return exact or matches
+
+
+def resolve(phrase: str, *item_lists) -> tuple:
+    #pylint: disable-next=line-too-long
+    """The Items of item_lists that phrase means, in order, as (items, everything). Unless everything is True only one of them is meant, and if they don't all have the same name the phrase is ambiguous."""
+    phrase = phrase.strip()
+    everything, tokens = parse(phrase)
+    if not everything:
+        named = [item for items in item_lists for item in items.named(phrase)]
+        if named or not tokens:
+            return named, False
+    if not tokens:
+        return [item for items in item_lists for item in items], True
+    matches = [item for items in item_lists for item in items.matching(tokens)]
+    if everything:
+        return matches, True
+    return _best(phrase, tokens, matches), False
+
+
+def resolve_names(phrase: str, names: list) -> list:
+    #pylint: disable-next=line-too-long
+    """Like resolve, for a plain list of names, looking at every one of them. Returns the names phrase takes: every match if it starts with all, otherwise one, or none if it's ambiguous."""
+    phrase = phrase.strip()
+    everything, tokens = parse(phrase)
+    if not tokens:
+        return list(names) if everything else []
+    matches = [name for name in names if matches_words(words(name), tokens)]
+    if everything:
+        return matches
+    matches = _best(phrase, tokens, matches, name=lambda name: name)
+    return matches[:1] if len(set(matches)) == 1 else []
+
+
+def matches_words(name_words: tuple, tokens: tuple) -> bool:
+    """Whether a name with name_words has every one of tokens, or its plural."""
+    for token in tokens:
+        if token not in name_words and not (token.endswith("s") and token[:-1] in name_words):
+            return False
+    return True
+
+
+def choices(items: list, most: int = 10) -> str:
+    """The different names of items, like 'rusty key, brass key or iron key'."""
+    names = list(dict.fromkeys(item.name for item in items))[:most]
+    if len(names) == 1:
+        return names[0]
+    return ", ".join(names[:-1]) + " or " + names[-1]
@@ -0,0 +1,706 @@
+"""The things a World is made of: Rooms, the Items in them, and the Players and Entities moving
+between them."""
+import sys
+import os
+import types
+import weakref
+from txtadv import script
+from txtadv.events import BUS, Subscriber, MoveEvent, UseEvent, EnterEvent
+from txtadv.history import History
+from txtadv.journal import record
+from txtadv.location.graph import exits_changed, room_renamed
+from txtadv.nouns import words
+from txtadv.messaging import setinfomode, origin, error as err
+
+
+# The sets of changed Objects and Rooms of everything tracking changes, like an Autosaver.
+_DIRTY = []
+
+
+def track_changes(dirty: set) -> None:
+    """Add every Object and Room that changes from now on to dirty."""
+    _DIRTY.append(dirty)
+
+
+def untrack_changes(dirty: set) -> None:
+    """Stop adding changed Objects and Rooms to dirty."""
+    if dirty in _DIRTY:
+        _DIRTY.remove(dirty)
+
+
+# Every World with an Entity waiting for something to happen, to tell when Items move.
+_LISTENING = weakref.WeakSet()
+
+
+def watch_moves(world) -> None:
+    """Call world.stir with the Rooms an Item moves between, whenever one moves."""
+    _LISTENING.add(world)
+
+
+def unwatch_moves(world) -> None:
+    """Stop telling world when Items move."""
+    _LISTENING.discard(world)
+
+
+class EventSource:
+    """Something that has its own Events, like an Object or a Room."""
+    # oid is the stable id given by txtadv.file.snapshot. __weakref__ lets BUS key Events by source.
+    __slots__ = ("oid", "__weakref__")
+    event_types = {}
+
+    def mark_dirty(self):
+        #pylint: disable-next=line-too-long
+        """Mark this as changed, so it is saved by the next autosave. Moves and exits are marked automatically, anything else you change has to be marked with this."""
+        for dirty in _DIRTY:
+            dirty.add(self)
+
+    @property
+    def events(self):
+        """The Events of this, by name"""
+        return {
+            name: BUS.event(name, self, event_type)
+            for name, event_type in self.event_types.items()
+        }
+
+    def on_event(self, event_name: str, subscriber: Subscriber):
+        """Makes subscriber be triggered when event_name is triggered on this."""
+        try:
+            event_type = self.event_types[event_name]
+        except KeyError as exc:
+            sys.tracebacklimit = -1
+            raise ValueError(f"Unknown event `{event_name}`") from exc
+        BUS.subscribe(event_name, subscriber, self, event_type)
+
+    @classmethod
+    def on_any_event(cls, event_name: str, subscriber: Subscriber):
+        """Makes subscriber be triggered when event_name is triggered on anything of this class."""
+        try:
+            event_type = cls.event_types[event_name]
+        except KeyError as exc:
+            sys.tracebacklimit = -1
+            raise ValueError(f"Unknown event `{event_name}`") from exc
+        BUS.subscribe(event_name, subscriber, None, event_type, cls)
+
+
+class Object(EventSource):
+    """A base Object. Do not use, instead use Item or Player."""
+    __slots__ = ("_name", "sdesc", "ldesc", "loc", "_flags")
+    event_types = {"move": MoveEvent}
+    default_flags = {}
+    # Whether this is one of the items of its loc, like an Item, rather than just being there.
+    listed = False
+
+    def __init__(self, name: str, sdesc: str, ldesc: str, location):
+        self.name = name
+        self.sdesc = sdesc
+        self.ldesc = ldesc
+        self.loc = location
+        self._flags = None
+        self.mark_dirty()
+
+    @property
+    def name(self):
+        """The name of this Object"""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        old = getattr(self, "_name", None)
+        self._name = name
+        if old is not None and old != name:
+            self._renamed()
+
+    def _renamed(self):
+        """Called after the name of this Object is changed."""
+
+    @property
+    def iname(self):
+        """The name this is found by. The same as name."""
+        return self.name
+
+    @iname.setter
+    def iname(self, name):
+        self.name = name
+
+    @property
+    def flags(self):
+        #pylint: disable-next=line-too-long
+        """The flags of this Object. Until they're first used they're the class's default_flags, and then they're copied so that changing them doesn't change every other Object's."""
+        if self._flags is None:
+            self._flags = dict(self.__class__.default_flags)
+        return self._flags
+
+    @flags.setter
+    def flags(self, flags):
+        self._flags = flags
+
+    def custom_flags(self):
+        #pylint: disable-next=line-too-long
+        """The flags of this Object, or None if they have never been used, so are still the default."""
+        return self._flags
+
+    @property
+    def location(self):
+        """The location of this Object"""
+        return self.loc
+
+    def move(self, newloc):
+        """Moves this Object to a different Room"""
+        oldloc = self.loc
+        record("loc", self, oldloc, newloc)
+        self.loc = newloc
+        self.mark_dirty()
+        BUS.trigger("move", self, self, oldloc, newloc)
+
+    def __getitem__(self, key):
+        """get item"""
+        return getattr(self, key)
+
+
+class Item(Object):
+    """An Item. Doesn't do much by default, although it can."""
+    __slots__ = ()
+    event_types = {**Object.event_types, "use": UseEvent}
+    default_flags = {"consume_on_use": False, "pickup_to_examine": True}
+    listed = True
+
+    def __init__(self, name: str, sdesc: str, ldesc: str, location):
+        super().__init__(name, sdesc, ldesc, location)
+        location.items.append(self)
+
+    def move(self, newloc):
+        oldloc = self.loc
+        oldloc.items.remove(self)
+        super().move(newloc)
+        newloc.items.append(self)
+        if _LISTENING:
+            for world in list(_LISTENING):
+                world.stir(oldloc, newloc)
+
+    def _renamed(self):
+        if self.loc is not None:
+            self.loc.items.renamed(self)
+
+    def use(self):
+        """Use the item"""
+        BUS.trigger("use", self, self.iname)
+
+
+# What the Items of an empty ItemList are, so that it doesn't need a dict of its own.
+_NO_ITEMS = types.MappingProxyType({})
+
+
+class ItemList:
+    #pylint: disable-next=line-too-long
+    """The Items in a Room. Works like a list that keeps the order Items were added in, but finding, adding and removing Items, by themselves or by name, doesn't have to look through every Item."""
+    # _items maps every Item to the name it's indexed by, which is only different from its name
+    # while it's being renamed. It's _NO_ITEMS until the first Item is added.
+    # _names maps a name to its Item, or to a dict of Items if more than one has that name, once
+    # the ItemList has been searched by name.
+    # version is bumped whenever an Item is added, removed or renamed, so caches look again.
+    # _words maps every word of a name to the Items that have it (see txtadv.nouns), once the
+    # ItemList has been searched by word.
+    __slots__ = ("_items", "_names", "version", "_words")
+
+    def __init__(self, items=()):
+        self._items = _NO_ITEMS
+        self._names = None
+        self.version = 0
+        self._words = None
+        for item in items:
+            self.append(item)
+
+    def append(self, item) -> None:
+        """Adds an Item to the end"""
+        if item in self._items:
+            return
+        if self._items is _NO_ITEMS:
+            self._items = {}
+        self._items[item] = item.name
+        self.version += 1
+        self._add_name(item, item.name)
+
+    def _add_name(self, item, name: str) -> None:
+        """Index an Item by name"""
+        if self._words is not None:
+            self._index(item, name)
+        if self._names is not None:
+            self._name(item, name)
+
+    def _name(self, item, name: str) -> None:
+        """Add an Item to the name index"""
+        named = self._names.get(name)
+        if named is None:
+            self._names[name] = item
+        elif isinstance(named, dict):
+            named[item] = None
+        else:
+            self._names[name] = {named: None, item: None}
+
+    def _remove_name(self, item, name: str) -> None:
+        """Stop indexing an Item by name"""
+        if self._words is not None:
+            # A name can have the same word more than once, like "a very very old map".
+            for word in dict.fromkeys(words(name)):
+                found = self._words[word]
+                del found[item]
+                if not found:
+                    del self._words[word]
+        if self._names is None:
+            return
+        named = self._names[name]
+        if not isinstance(named, dict):
+            del self._names[name]
+            return
+        del named[item]
+        if len(named) == 1:
+            self._names[name] = next(iter(named))
+
+    def extend(self, items) -> None:
+        """Adds a number of Items to the end"""
+        for item in items:
+            self.append(item)
+
+    def remove(self, item) -> None:
+        """Removes an Item. Raises ValueError if it isn't here."""
+        if item not in self._items:
+            raise ValueError(f"{item!r} is not in this ItemList")
+        name = self._items.pop(item)
+        self.version += 1
+        self._remove_name(item, name)
+        # So an autosave notices it's gone, if it isn't just being moved.
+        item.mark_dirty()
+
+    def renamed(self, item) -> None:
+        """Index an Item by its new name. Item.name does this for the ItemList the Item is in."""
+        name = self._items.get(item)
+        if name is None or name == item.name:
+            return
+        self._remove_name(item, name)
+        # Indexing the new words would put the Item after the ones already there, out of order,
+        # so the word index is made again the next time it's needed.
+        self._words = None
+        self._items[item] = item.name
+        self._add_name(item, item.name)
+        self.version += 1
+
+    def discard(self, item) -> None:
+        """Removes an Item if it is here"""
+        if item in self._items:
+            self.remove(item)
+
+    def pop(self, index=-1):
+        """Removes and returns the Item at index, the last one by default"""
+        if index == -1 and self._items:
+            item = next(reversed(self._items))
+        else:
+            item = self[index]
+        self.remove(item)
+        return item
+
+    def insert(self, index, item) -> None:
+        """Adds an Item at index. Unlike everything else, this has to look at every Item."""
+        items = list(self._items)
+        items.insert(index, item)
+        self.clear()
+        self.extend(items)
+
+    def index(self, item) -> int:
+        """The position of an Item. Unlike everything else, this has to look at every Item."""
+        for index, val in enumerate(self._items):
+            if val is item:
+                return index
+        raise ValueError(f"{item!r} is not in this ItemList")
+
+    def clear(self) -> None:
+        """Removes every Item"""
+        for item in self._items:
+            item.mark_dirty()
+        self._items = _NO_ITEMS
+        self._names = None
+        self.version += 1
+        self._words = None
+
+    def _by_name(self) -> dict:
+        """The name index, made the first time it's needed."""
+        if self._names is None:
+            self._names = {}
+            for item, name in self._items.items():
+                self._name(item, name)
+        return self._names
+
+    def find(self, name: str):
+        """The first Item with that name, or None if there isn't one"""
+        named = self._by_name().get(name)
+        if isinstance(named, dict):
+            return next(iter(named))
+        return named
+
+    def _index(self, item, name: str) -> None:
+        """Add an Item to the word index"""
+        for word in dict.fromkeys(words(name)):
+            found = self._words.get(word)
+            if found is None:
+                self._words[word] = {item: None}
+            else:
+                found[item] = None
+
+    def matching(self, tokens) -> list:
+        #pylint: disable-next=line-too-long
+        """Every Item whose name has all of tokens as words (see txtadv.nouns), or their plurals, in order"""
+        if self._words is None:
+            self._words = {}
+            for item, name in self._items.items():
+                self._index(item, name)
+        found = []
+        merged = False
+        for token in tokens:
+            items = self._words.get(token)
+            singular = self._words.get(token[:-1]) if token.endswith("s") else None
+            if items and singular:
+                # Both "keys" and "key" are names here, so a token matches either.
+                items = {**items, **singular}
+                merged = True
+            elif not items:
+                items = singular
+            if not items:
+                return []
+            found.append(items)
+        found.sort(key=len)
+        matches = [item for item in found[0] if all(item in items for items in found[1:])]
+        if merged and len(matches) > 1:
+            wanted = set(matches)
+            matches = [item for item in self._items if item in wanted]
+        return matches
+
+    def named(self, name: str) -> list:
+        """Every Item with that name"""
+        named = self._by_name().get(name)
+        if named is None:
+            return []
+        if isinstance(named, dict):
+            return list(named)
+        return [named]
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return key in self._by_name()
+        return key in self._items
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __reversed__(self):
+        return reversed(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return list(self._items)[index]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._items)!r})"
+
+
+class ExitList(list):
+    #pylint: disable-next=line-too-long
+    """The exits of a Room. Works like a list, but cached paths are thrown away when it changes, and version is bumped."""
+    __slots__ = ("owner", "version")
+
+    def __init__(self, exits=(), owner=None):
+        super().__init__(exits)
+        self.owner = owner
+        self.version = 0
+
+    def _changed(self):
+        self.version += 1
+        if self.owner is not None:
+            exits_changed(self.owner)
+            self.owner.mark_dirty()
+
+    def __setitem__(self, key, val):
+        super().__setitem__(key, val)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def append(self, val):
+        super().append(val)
+        self._changed()
+
+    def extend(self, vals):
+        super().extend(vals)
+        self._changed()
+
+    def insert(self, index, val):
+        super().insert(index, val)
+        self._changed()
+
+    def remove(self, val):
+        super().remove(val)
+        self._changed()
+
+    def pop(self, index=-1):
+        val = super().pop(index)
+        self._changed()
+        return val
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __iadd__(self, vals):
+        result = super().__iadd__(vals)
+        self._changed()
+        return result
+
+
+class Room(EventSource):
+    """The Room class can contain a number of items and have up to 6 exits:
+    north, south, east, west, up, and down."""
+    # _loader and _archived are used by Rooms that are loaded from a txtadv.file.archive.
+    # _render is what look shows for this Room, see txtadv.commands.render_room.
+    # _exits and _items are only made into an ExitList and ItemList the first time they're used,
+    # so a Room that hasn't been yet costs little more than the list of exits it was made with.
+    __slots__ = ("_name", "desc", "_exits", "_items", "_loader", "_archived", "_render")
+    event_types = {"enter": EnterEvent}
+    save   = ["name","desc","exits","items"]
+
+    def __init__(self, name: str, desc: str, exits, items) -> None:
+        self.name = name
+        self.desc = desc
+        if isinstance(exits, ExitList):
+            self.exits = exits
+        else:
+            self._exits = exits
+            self.mark_dirty()
+        self._items = items if isinstance(items, ItemList) else items or None
+        self._loader = None
+        self._archived = None
+        self._render = None
+
+    @property
+    def name(self):
+        """The name of this Room"""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        old = getattr(self, "_name", None)
+        self._name = name
+        if old is not None and old != name:
+            room_renamed(self)
+
+    @property
+    def iname(self):
+        """The name this is found by. The same as name."""
+        return self.name
+
+    @iname.setter
+    def iname(self, name):
+        self.name = name
+
+    @property
+    def exits(self):
+        """The exits of this Room, in the order north, south, east, west, up and down"""
+        exits = self._exits
+        if not isinstance(exits, ExitList):
+            exits = self._exits = ExitList(exits, self)
+        return exits
+
+    @exits.setter
+    def exits(self, exits):
+        if not isinstance(exits, ExitList):
+            exits = ExitList(exits)
+        exits.owner = self
+        self._exits = exits
+        exits_changed(self)
+        self.mark_dirty()
+
+    @property
+    def items(self):
+        """The Items in this Room"""
+        items = self._items
+        if not isinstance(items, ItemList):
+            items = self._items = ItemList(items or ())
+        return items
+
+    @items.setter
+    def items(self, items):
+        if not isinstance(items, ItemList):
+            items = ItemList(items)
+        self._items = items
+
+    def peek(self) -> tuple:
+        #pylint: disable-next=line-too-long
+        """The name and exits of this Room. Unlike name and exits, this doesn't fill in a Room from a txtadv.file.archive that hasn't been used yet."""
+        loader = getattr(self, "_loader", None)
+        if loader is not None:
+            return loader.peek(self)
+        return self.name, self.exits
+
+    def move_item(self, item: Item, newloc):
+        """Moves an Item to a different Room if it is in this Room"""
+        if item in self.items:
+            item.move(newloc)
+
+    def remove_item(self, item: Item):
+        """Removes an Item from this Room"""
+        if item in self.items:
+            self.items.remove(item)
+
+    def enter(self, player):
+        """Trigger the enter event with the Player passed"""
+        BUS.trigger("enter", self, player)
+
+    def __contains__(self, key):
+        if key in self.items:
+            return True
+        for i in self.exits:
+            if i is not None and key in (i.iname, i):
+                return True
+        return False
+
+    def __getattr__(self, key):
+        # Rooms from a txtadv.file.archive are only filled in the first time they're used.
+        loader = None if key == "_loader" else getattr(self, "_loader", None)
+        if loader is None or key.startswith("__"):
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{key}'")
+        self._loader = None
+        loader.load(self)
+        return getattr(self, key)
+
+    def __getitem__(self, key):
+        """get item"""
+        return getattr(self, key)
+
+
+#pylint: disable-next=invalid-name
+numPlayers = 0
+
+
+class Player(Object):
+    """A Player. Don't use, instead use World.create_player or just instance a new World."""
+    __slots__ = ("inventory", "instream", "outstream", "colored", "transcript", "commands",
+                 "buffered", "buffer", "world", "admin")
+    event_types = {**Object.event_types, "get": MoveEvent}
+    default_flags = {}
+    # How many transcript entries and commands are kept in memory. None means no limit.
+    history_size = 1000
+    # If this isn't None, older transcript entries and commands are appended to files in it.
+    history_dir = None
+
+    #pylint: disable-next=too-many-arguments
+    def __init__(self,
+                 startloc,
+                 instream,
+                 outstream,
+                 colored=True,
+                 name="Player",
+                 buffered=True,
+                 admin=False):
+        #pylint: disable-next=global-statement,invalid-name
+        global numPlayers
+        numPlayers += 1
+        if name == "Player":
+            name = "Player" + str(numPlayers)
+        super().__init__(name, "", "", startloc)
+        self.inventory = Room("Inventory", "How did you get here?", [], [])
+        self.instream = instream
+        self.outstream = outstream
+        self.colored = colored
+        self.name = name
+        self.transcript = History(self.history_size, self._history_path("transcript"))
+        self.commands = History(self.history_size, self._history_path("commands"))
+        self.buffered = buffered
+        self.buffer = []
+        self.world = None
+        # Whether this Player can use admin-only commands, like stats.
+        self.admin = admin
+
+    def flush(self):
+        """Writes everything buffered for this Player to their outstream in one go."""
+        if self.buffer:
+            self.outstream.write("".join(self.buffer))
+            self.buffer.clear()
+        self.outstream.flush()
+        self.transcript.flush()
+        self.commands.flush()
+
+    def _history_path(self, kind):
+        """The file older entries of a history are spilled to, if any"""
+        if self.history_dir is None:
+            return None
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.name)
+        return os.path.join(self.history_dir, f"{name}.{kind}.jsonl")
+
+    def move(self, newloc):
+        oldloc = self.loc
+        super().move(newloc)
+        if self.world is not None:
+            self.world.player_moved(self, oldloc, newloc)
+
+    def pickup(self, item: Item):
+        """Pickup an item."""
+        item.move(self.inventory)
+        BUS.trigger("get", self, player=self, item=item)
+
+
+    def __repr__(self):
+        fields = {}
+        for cls in reversed(self.__class__.__mro__):
+            for key in getattr(cls, "__slots__", ()):
+                if not key.startswith("__") and hasattr(self, key):
+                    fields[key] = getattr(self, key)
+        fields.update(getattr(self, "__dict__", {}))
+        return f"{self.__class__}({fields})"
+
+    def __str__(self):
+        return self.name
+
+
+class _NullStream:
+    """An outstream that throws away everything written to it."""
+
+    def write(self, data):
+        """Throw data away"""
+        return len(data)
+
+    def flush(self):
+        """Nothing to flush"""
+
+
+class Entity(Player):
+    #pylint: disable-next=line-too-long
+    """An Entity. Can be described as a scripted player. Its script (see txtadv.script) is compiled once, and steps_per_tick instructions of it are run every tick."""
+    __slots__ = ("file_name", "program", "pc", "heard")
+    # How many instructions of its script an Entity runs every tick.
+    steps_per_tick = 10
+
+    def __init__(self, startloc: Room, file_name: str):
+        super().__init__(startloc, None, _NullStream(), colored=False, buffered=False)
+        self.exec_from_file(file_name)
+
+    def exec_from_file(self, file_name):
+        """Set the file executed from, and start it from the top"""
+        self.file_name = file_name
+        self.program = script.load(file_name)
+        self.pc = 0
+        self.heard = None
+
+    def tick(self, world):
+        #pylint: disable-next=line-too-long
+        """Tickes the entity and makes it run the next steps_per_tick instructions of its script. Returns how many turns until it wants to be ticked again (None for the next turn), IDLE to not be ticked until World.wake is called, or LISTEN to not be ticked until something happens where it is (see World.stir)."""
+        return script.run(self.program, self, world, self.steps_per_tick)
+
+    def exec(self, instruction, world):
+        """Executes a single instruction for this Entity, returning what its command returned."""
+        cmd = world.resolve(instruction)
+        if cmd is None:
+            err("Invalid command. Run 'help' to get a list of commands.\n", sys.stderr)
+            return ""
+        setinfomode(origin)
+        return cmd(instruction, world, self) or ""
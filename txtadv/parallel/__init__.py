@@ -0,0 +1,322 @@
+"""Running the scripts of lots of Entities in worker processes.
+
+The Rooms of a World are split into regions of connected Rooms, and every turn the Entities
+that are due are sent off in one batch per region. A worker runs their scripts against a
+small copy of the Rooms around them and sends back intents: move, say, announce, get, drop,
+or a command that has to be run in the World. The World then applies the intents on the game
+thread, in the order of World.entities, so the result doesn't depend on which worker finished
+first. An Entity that walks out of what its worker can see stops for the turn, and carries on
+next turn from wherever it ended up.
+
+Entities see the World as it was at the start of the turn. Entities whose script uses
+`if <command> {`, and Entities with their own tick, still run on the game thread.
+"""
+import collections
+import concurrent.futures
+
+import txtadv
+from txtadv import commands, nouns, script
+from txtadv.location import get_num_from_loc
+from txtadv.schedule import IDLE, LISTEN
+
+# Exits that lead nowhere, and exits that lead out of what a worker can see.
+_NOWHERE = -1
+_UNSEEN = -2
+
+# Built-in commands that only print something, which nobody reads for an Entity.
+_QUIET = (commands.look, commands.examine, commands.inventory, commands.tahelp,
+          commands.about, commands.list_chat, commands.wait)
+
+
+def partition(world, regions: int) -> dict:
+    #pylint: disable-next=line-too-long
+    """Split the Rooms of world into regions regions of connected Rooms. Returns the region of every Room."""
+    rooms = world.graph.rooms()
+    size = max(1, -(-len(rooms) // max(1, regions)))
+    # Breadth-first order keeps Rooms that are next to each other together.
+    return {room: index // size for index, room in enumerate(rooms)}
+
+
+def _arg(text: str) -> str:
+    """What comes after the command in an instruction."""
+    parts = text.split(" ", 1)
+    return parts[1].strip() if len(parts) > 1 else ""
+
+
+def _intent(cmd, text: str):
+    """The intent an instruction turns into, as (kind, arg)."""
+    if cmd is None or cmd.func in _QUIET:
+        return "skip", None
+    direction = getattr(cmd.func, "direction", None)
+    if direction is not None:
+        return "move", get_num_from_loc(direction)
+    if cmd.func is commands.move:
+        num = get_num_from_loc(_arg(text))
+        return ("move", num) if num != -1 else ("skip", None)
+    if cmd.func is commands.say:
+        return "say", _arg(text)
+    if cmd.func is commands.announce:
+        return "announce", _arg(text)
+    if cmd.func is commands.get:
+        return "get", _arg(text)
+    if cmd.func is commands.drop:
+        return "drop", _arg(text)
+    return "command", None
+
+
+def _translate(program, world):
+    #pylint: disable-next=line-too-long
+    """The code of program as (op, kind, arg, target) for a worker, or None if it can't run there."""
+    code = []
+    for index, (op, arg, target) in enumerate(program.link(world)):
+        if op == script.OP_IF:
+            return None
+        if op == script.OP_COMMAND:
+            kind, value = _intent(*arg)
+            code.append((op, kind, index if kind == "command" else value, target))
+        else:
+            code.append((op, None, arg, target))
+    return code
+
+
+def _run_region(programs: dict, rooms: dict, entities: list, chat: list) -> list:
+    #pylint: disable-next=line-too-long
+    """Run the scripts of entities in a worker. Returns (entity, pc, delay, intents) for every Entity, where delay is None once its script has ended and 0 if it's waiting for something to happen, like script.run."""
+    results = []
+    for eid, pid, loc, pc, since, steps in entities:
+        code = programs[pid]
+        start = pc
+        intents = []
+        delay = 1
+        ran = 0
+        acted = False
+        while ran < steps and pc < len(code):
+            op, kind, arg, target = code[pc]
+            pc += 1
+            ran += 1
+            if op == script.OP_COMMAND:
+                acted = True
+                if kind == "move":
+                    dest = rooms[loc][0][arg]
+                    if dest == _NOWHERE:
+                        continue
+                    intents.append(("move", arg))
+                    if dest not in rooms:
+                        # Out of what this worker can see, so the rest waits until next turn.
+                        break
+                    loc = dest
+                elif kind == "get":
+                    items = rooms[loc][1]
+                    taken = nouns.resolve_names(arg, items)
+                    if taken:
+                        for name in taken:
+                            items.remove(name)
+                        intents.append(("get", arg))
+                elif kind != "skip":
+                    intents.append((kind, arg))
+            elif op == script.OP_SAID:
+                if not _heard(chat, loc, arg, since):
+                    pc = target
+                else:
+                    acted = True
+            elif op == script.OP_JUMP:
+                pc = target
+            elif op == script.OP_WAIT:
+                break
+            elif op == script.OP_SLEEP:
+                delay = max(1, target)
+                break
+        if pc >= len(code):
+            delay = None
+        elif not acted and pc == start and delay == 1:
+            delay = 0
+        results.append((eid, pc, delay, intents))
+    return results
+
+
+def _heard(chat: list, loc: int, text: str, since) -> bool:
+    """Like script._said, for the copy of the chat a worker gets."""
+    if since is None:
+        return False
+    for seq, room, full, said in reversed(chat):
+        if seq < since:
+            break
+        if room in (None, loc) and text in (full, said):
+            return True
+    return False
+
+
+class ParallelTicker:
+    #pylint: disable-next=line-too-long
+    """Runs the Entity ticks of a World in processes worker processes, with the World split into regions regions. processes=0 runs the regions one after another on the game thread, which gives the same result and is handy for testing."""
+
+    def __init__(self, world, processes=None, regions=None):
+        self.world = world
+        self.processes = processes
+        self.regions = regions
+        self.pending = []
+        self._pool = None
+        self._partition = None
+        self._programs = {}
+
+    def start(self) -> None:
+        """Start running Entity ticks in parallel."""
+        if self.processes != 0:
+            self._pool = concurrent.futures.ProcessPoolExecutor(self.processes)
+        if self.regions is None:
+            self.regions = self._pool._max_workers if self._pool is not None else 1 #pylint: disable=protected-access
+        self.world.parallel = self
+
+    def close(self) -> None:
+        """Go back to running Entity ticks on the game thread."""
+        if self.world.parallel is self:
+            self.world.parallel = None
+        self.run()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def add(self, entity) -> bool:
+        #pylint: disable-next=line-too-long
+        """Called by World for every Entity that is due. Returns False if it has to be ticked on the game thread instead."""
+        if entity.__class__.tick is not txtadv.Entity.tick:
+            return False
+        if self._code(entity.program) is None:
+            return False
+        self.pending.append(entity)
+        return True
+
+    def _code(self, program):
+        """The translated code of a Program, cached until the World's commands change."""
+        return self._translated(program)[2]
+
+    def _reach(self, program) -> int:
+        """How many moves there are in program, which is as far as it can get in one tick."""
+        return self._translated(program)[3]
+
+    def _translated(self, program) -> tuple:
+        """(program, commands version, translated code, number of moves) for a Program."""
+        key = id(program)
+        version = getattr(self.world.cmds, "version", None)
+        cached = self._programs.get(key)
+        if cached is None or cached[0] is not program or cached[1] != version:
+            code = _translate(program, self.world)
+            moves = 0 if code is None else sum(kind == "move" for _, kind, _, _ in code)
+            cached = self._programs[key] = (program, version, code, moves)
+        return cached
+
+    def _regions(self) -> dict:
+        """The region of every Room, worked out again when any exits change."""
+        version = (self.world.graph, self.world.graph.version)
+        if self._partition is None or self._partition[0] != version:
+            self._partition = (version, partition(self.world, self.regions))
+        return self._partition[1]
+
+    def run(self) -> None:
+        """Tick every pending Entity in parallel and apply what they did."""
+        if not self.pending:
+            return
+        entities, self.pending = self.pending, []
+        regions = self._regions()
+        batches = collections.defaultdict(list)
+        for entity in entities:
+            batches[regions.get(entity.loc, 0)].append(entity)
+        chat = self._chat(entities)
+        heard = self.world.chat.messages[-1].seq + 1 if self.world.chat.messages else 0
+        jobs = [self._job(batch, regions, chat) for _, batch in sorted(batches.items())]
+        if self._pool is None:
+            results = [_run_region(*job) for job in jobs]
+        else:
+            results = list(self._pool.map(_run_region, *zip(*jobs)))
+        order = {entity: index for index, entity in enumerate(self.world.entities)}
+        done = [(entity, result) for batch, found in zip(sorted(batches.items()), results)
+                for entity, result in zip(batch[1], found)]
+        done.sort(key=lambda pair: order.get(pair[0], len(order)))
+        for entity, (_, pc, delay, intents) in done:
+            self._apply(entity, intents)
+            entity.pc = pc
+            entity.heard = heard
+            if delay is None:
+                delay = IDLE
+            elif delay == 0:
+                # Unless something it hasn't heard yet was said while intents were applied.
+                messages = self.world.chat.messages
+                delay = 1 if messages and messages[-1].seq >= heard else LISTEN
+            #pylint: disable-next=protected-access
+            self.world._ticked(entity, delay)
+
+    def _chat(self, entities) -> list:
+        """The chat messages the Entities haven't heard yet, with Rooms as numbers."""
+        since = [entity.heard for entity in entities if entity.heard is not None]
+        if not since:
+            return []
+        oldest = min(since)
+        chat = []
+        for message in reversed(self.world.chat.messages):
+            if message.seq < oldest:
+                break
+            room = None if message.room is None else id(message.room)
+            chat.append((message.seq, room, message.text,
+                         message.text.split(" says: ", 1)[-1]))
+        chat.reverse()
+        return chat
+
+    def _job(self, batch, regions, chat):
+        """The arguments of _run_region for the Entities of one region."""
+        rooms = {}
+        reach = {}
+        programs = {}
+        for entity in batch:
+            region = regions.get(entity.loc, 0)
+            # Every Room of the region the Entity could walk to this tick.
+            stack = [(entity.loc, min(self._reach(entity.program), entity.steps_per_tick))]
+            while stack:
+                room, left = stack.pop()
+                if reach.get(room, -1) >= left:
+                    continue
+                reach[room] = left
+                self._view(rooms, room, regions, region)
+                if left:
+                    stack.extend((exit_room, left - 1) for exit_room in room.exits
+                                 if exit_room is not None and regions.get(exit_room) == region)
+            programs[id(entity.program)] = self._code(entity.program)
+        entities = [(index, id(entity.program), id(entity.loc), entity.pc, entity.heard,
+                     entity.steps_per_tick) for index, entity in enumerate(batch)]
+        return programs, rooms, entities, chat
+
+    @staticmethod
+    def _view(rooms, room, regions, region) -> None:
+        """Add what a worker needs to know about a Room."""
+        key = id(room)
+        if key in rooms:
+            return
+        exits = []
+        for exit_room in list(room.exits)[:6]:
+            if exit_room is None:
+                exits.append(_NOWHERE)
+            elif regions.get(exit_room) == region:
+                exits.append(id(exit_room))
+            else:
+                exits.append(_UNSEEN)
+        exits += [_NOWHERE] * (6 - len(exits))
+        rooms[key] = (exits, [item.name for item in room.items])
+
+    def _apply(self, entity, intents) -> None:
+        """Apply the intents of an Entity to the World."""
+        world = self.world
+        for kind, arg in intents:
+            if kind == "move":
+                dest = entity.loc.exits[arg] if arg < len(entity.loc.exits) else None
+                if dest is not None:
+                    entity.move(dest)
+            elif kind == "say":
+                world.chat_event.trigger(arg, entity.name, local=entity.loc)
+            elif kind == "announce":
+                world.chat_event.trigger(arg, entity.name, local=None)
+            elif kind == "get":
+                commands.get(f"get {arg}", world, entity)
+            elif kind == "drop":
+                commands.drop(f"drop {arg}", world, entity)
+            else:
+                cmd, text = entity.program.link(world)[arg][1]
+                cmd(text, world, entity)
@@ -0,0 +1,179 @@
+"""Replaying recorded sessions against a fresh World, for load tests and regression checks.
+
+    capture = replay.capture(world, seed=1234)        # what every Player typed, and the end state
+    replay.save_capture(capture, "traffic.json")
+    ...
+    result = replay.replay(build_world, replay.load_capture("traffic.json"), render=False)
+    result.verify()                                   # raises ReplayMismatch if the state differs
+
+Commands are run the way World.run runs them: one line of every Player in turn, then a new
+turn. For a replay to end up where the original did, the original World has to have been
+seeded the same way (World.rng.seed(seed)), built the same way, and driven by World.run.
+Player.commands only keeps the last Player.history_size lines in memory, so set
+Player.history_dir (or make history_size None) on a server whose traffic will be captured.
+Timers counted in seconds go by the clock, so they aren't replayed exactly.
+"""
+import hashlib
+import io
+import json
+import random
+import time
+
+import txtadv
+from txtadv import messaging
+
+
+class ReplayMismatch(ValueError):
+    """Raised by ReplayResult.verify when a replay didn't end up where it was expected to."""
+
+    def __init__(self, differences: list):
+        super().__init__("replay doesn't match: " + "; ".join(differences[:10]))
+        self.differences = differences
+
+
+def state(world) -> dict:
+    #pylint: disable-next=line-too-long
+    """Where everything in world is, as a json-ready dict that doesn't depend on object ids. Rooms are keyed by their place in World.graph.rooms() and their name, since names don't have to be unique."""
+    rooms = world.graph.rooms()
+    keys = {room: f"{index}:{room.name}" for index, room in enumerate(rooms)}
+
+    def key(room):
+        return keys.get(room, None if room is None else f"?:{room.name}")
+
+    return {
+        "rooms": {keys[room]: sorted(item.name for item in room.items) for room in rooms},
+        "players": {player.name: {"loc": key(player.loc),
+                                  "inventory": sorted(item.name for item in player.inventory.items)}
+                    for player in world.players},
+        "entities": [{"name": entity.name, "loc": key(entity.loc), "pc": entity.pc,
+                      "inventory": sorted(item.name for item in entity.inventory.items)}
+                     for entity in world.entities],
+        "chat": len(world.chat.messages),
+        "turns": world.scheduler.turns,
+    }
+
+
+def digest(saved_state: dict) -> str:
+    """A short hash of a state, to compare states without keeping them around."""
+    data = json.dumps(saved_state, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def capture(world, seed=None) -> dict:
+    #pylint: disable-next=line-too-long
+    """Everything the Players of world have typed, with the seed its World.rng was given and its current state."""
+    return {
+        "seed": seed,
+        "players": {player.name: list(player.commands.all()) for player in world.players},
+        "state": state(world),
+    }
+
+
+def save_capture(captured: dict, file_name: str) -> None:
+    """Write a capture to a json file."""
+    with open(file_name, "w", encoding="utf-8") as file:
+        json.dump(captured, file)
+
+
+def load_capture(file_name: str) -> dict:
+    """Read a capture written by save_capture."""
+    with open(file_name, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+class ReplayResult:
+    """What a replay did: the World it ended with, its state and how fast it went."""
+
+    #pylint: disable-next=too-many-arguments
+    def __init__(self, world, commands: int, turns: int, seconds: float, expected=None):
+        self.world = world
+        self.commands = commands
+        self.turns = turns
+        self.seconds = seconds
+        self.expected = expected
+        self.state = state(world)
+
+    @property
+    def commands_per_second(self) -> float:
+        """How many commands were replayed per second."""
+        return self.commands / self.seconds if self.seconds else 0.0
+
+    def digest(self) -> str:
+        """The digest of the state the replay ended in."""
+        return digest(self.state)
+
+    def differences(self, expected=None) -> list:
+        #pylint: disable-next=line-too-long
+        """How the state differs from expected, a state or a digest, or from the state in the capture if it's None."""
+        expected = self.expected if expected is None else expected
+        if expected is None:
+            return []
+        if isinstance(expected, str):
+            return [] if expected == self.digest() else [f"digest {self.digest()} != {expected}"]
+        found = []
+        for section in sorted(set(expected) | set(self.state)):
+            want = expected.get(section)
+            got = self.state.get(section)
+            if isinstance(want, dict) and isinstance(got, dict):
+                for name in sorted(set(want) | set(got), key=str):
+                    if want.get(name) != got.get(name):
+                        found.append(f"{section}[{name}]: {got.get(name)!r} != {want.get(name)!r}")
+            elif want != got:
+                found.append(f"{section}: {got!r} != {want!r}")
+        return found
+
+    def verify(self, expected=None) -> None:
+        """Raise ReplayMismatch if the state isn't what was expected."""
+        found = self.differences(expected)
+        if found:
+            raise ReplayMismatch(found)
+
+
+#pylint: disable-next=too-many-locals
+def replay(build_world, captured: dict, seed=None, render: bool = True) -> ReplayResult:
+    #pylint: disable-next=line-too-long
+    """Run the commands of a capture against the fresh World that build_world() returns, as fast as possible. seed defaults to the seed of the capture. If render is False, messages aren't even put together, let alone sent anywhere."""
+    world = build_world()
+    seed = captured.get("seed") if seed is None else seed
+    if seed is not None:
+        world.rng.seed(seed)
+        random.seed(seed)
+    logs = []
+    for name, lines in captured["players"].items():
+        player = txtadv.Player(world.start, io.StringIO(), txtadv._NullStream(), #pylint: disable=protected-access
+                               colored=False, name=name, buffered=False)
+        world.add_player(player)
+        logs.append((player, iter(lines)))
+    commands = 0
+    turns = 0
+    if not render:
+        messaging.mute(True)
+    start = time.perf_counter()
+    try:
+        while logs:
+            ran = False
+            for entry in list(logs):
+                player, lines = entry
+                line = next(lines, None)
+                if line is None:
+                    # Still there when the capture was taken, just without anything more to say.
+                    logs.remove(entry)
+                    continue
+                ran = True
+                try:
+                    world.handle_input(player, line)
+                except SystemExit:
+                    # Someone typed quit, which would have stopped the server.
+                    logs.clear()
+                    break
+                commands += 1
+            if not ran:
+                break
+            world.advance()
+            messaging.flush_pending()
+            turns += 1
+    finally:
+        if not render:
+            messaging.mute(False)
+    elapsed = time.perf_counter() - start
+    return ReplayResult(world, commands, turns, elapsed, captured.get("state"))
@@ -0,0 +1,100 @@
+"""A scheduler for things that should happen later, counted in turns or in seconds.
+
+Every World has one as World.scheduler. A turn is one round of World.run, or one tick of
+World.run_async. Only the work that's due is looked at each turn, so sleeping Entities and
+far-off timers cost nothing until then.
+"""
+import heapq
+import itertools
+import time
+
+# Returned by Entity.tick to say it has nothing more to do until something wakes it up.
+IDLE = "idle"
+# Returned by Entity.tick to say it's only waiting for something to happen where it is: something
+# being said, or a Player or Item moving in or out of its Room or inventory.
+LISTEN = "listen"
+
+
+class Timer:
+    """Something scheduled to be called later. Cancel it with Timer.cancel."""
+    __slots__ = ("when", "func", "args", "kwargs", "cancelled")
+
+    def __init__(self, when, func, args, kwargs):
+        self.when = when
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop this Timer from being called. It is thrown away when it comes up."""
+        self.cancelled = True
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+
+class Scheduler:
+    #pylint: disable-next=line-too-long
+    """Keeps a heap of Timers counted in turns and a heap of Timers counted in seconds of clock, and calls the ones that are due."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.turns = 0
+        self._by_turn = []
+        self._by_time = []
+        self._order = itertools.count()
+
+    def at_turn(self, turn: int, func, *args, **kwargs) -> Timer:
+        """Call func(*args, **kwargs) once turn turn has come."""
+        timer = Timer(turn, func, args, kwargs)
+        heapq.heappush(self._by_turn, (turn, next(self._order), timer))
+        return timer
+
+    def after_turns(self, turns: int, func, *args, **kwargs) -> Timer:
+        """Call func(*args, **kwargs) in turns turns."""
+        return self.at_turn(self.turns + turns, func, *args, **kwargs)
+
+    def at_time(self, when: float, func, *args, **kwargs) -> Timer:
+        """Call func(*args, **kwargs) once the clock reaches when."""
+        timer = Timer(when, func, args, kwargs)
+        heapq.heappush(self._by_time, (when, next(self._order), timer))
+        return timer
+
+    def after_seconds(self, seconds: float, func, *args, **kwargs) -> Timer:
+        """Call func(*args, **kwargs) in seconds seconds."""
+        return self.at_time(self.clock() + seconds, func, *args, **kwargs)
+
+    def advance(self) -> int:
+        """Start the next turn and call everything that's due. Returns how many were called."""
+        self.turns += 1
+        return self.run_due()
+
+    def run_due(self) -> int:
+        #pylint: disable-next=line-too-long
+        """Call everything that's due this turn or by now, without starting a new turn. Returns how many were called."""
+        called = 0
+        heap = self._by_turn
+        while heap and heap[0][0] <= self.turns:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer()
+                called += 1
+        heap = self._by_time
+        if heap:
+            now = self.clock()
+            while heap and heap[0][0] <= now:
+                timer = heapq.heappop(heap)[2]
+                if not timer.cancelled:
+                    timer()
+                    called += 1
+        return called
+
+    def next_time(self):
+        """When the next Timer counted in seconds is due, or None if there isn't one."""
+        while self._by_time and self._by_time[0][2].cancelled:
+            heapq.heappop(self._by_time)
+        return self._by_time[0][0] if self._by_time else None
+
+    def __len__(self):
+        return sum(not entry[2].cancelled for entry in self._by_turn + self._by_time)
@@ -0,0 +1,181 @@
+"""Entity scripts. A script is compiled once into a list of instructions, which a small VM
+runs a few at a time, every tick.
+
+Every line of a script is one instruction:
+    <command>           run a command, like "say hello" or "north"
+    if <command> {      run the lines up to the matching } only if the command did what it
+                        was asked, like "if get key {" or "if north {" (commands return
+                        something true when they do, see txtadv.commands.Command)
+    if said <text> {    run the lines up to the matching } only if someone in the same Room (or
+                        the whole World) said text since the last tick
+    }                   the end of an if block
+    wait                stop running instructions until the next turn
+    sleep <turns>       stop running instructions for turns turns
+    repeat              start again from the top
+Blank lines and lines starting with # are ignored. When the end of the script is reached the
+Entity stops doing anything, and isn't ticked any more. A tick that ends where it started
+without running a command or getting into an if block would do the same thing every turn, so
+the Entity isn't ticked again until something happens where it is.
+"""
+import os
+import sys
+
+from txtadv.messaging import error, setinfomode, no_origin
+from txtadv.schedule import IDLE, LISTEN
+
+OP_COMMAND = 0
+OP_IF = 1
+OP_SAID = 2
+OP_JUMP = 3
+OP_WAIT = 4
+OP_SLEEP = 5
+
+# Compiled scripts by file name, with the time the file was changed when it was compiled.
+_PROGRAMS = {}
+
+
+class ScriptError(ValueError):
+    """Raised when a script can't be compiled."""
+
+
+class Program:
+    #pylint: disable-next=line-too-long
+    """A compiled script. code is a list of (op, text, target, line) tuples, where target is the instruction to jump to for OP_IF, OP_SAID and OP_JUMP."""
+
+    def __init__(self, code: list, name: str = "<script>"):
+        self.code = code
+        self.name = name
+        self._linked = None
+
+    def link(self, world) -> list:
+        #pylint: disable-next=line-too-long
+        """The code with every command looked up in the commands of world, as (op, arg, target) tuples. It's only looked up again if the commands change."""
+        cmds = world.cmds
+        version = getattr(cmds, "version", None)
+        if self._linked is not None and self._linked[0] is cmds and self._linked[1] == version:
+            return self._linked[2]
+        linked = []
+        for op, text, target, line in self.code:
+            arg = text
+            if op in (OP_COMMAND, OP_IF):
+                cmd = world.resolve(text)
+                if cmd is None:
+                    error(f"{self.name}:{line}: '{text}' isn't a command, so it's skipped.\n",
+                          sys.stderr)
+                arg = (cmd, text)
+            linked.append((op, arg, target))
+        self._linked = (cmds, version, linked)
+        return linked
+
+    def __len__(self):
+        return len(self.code)
+
+
+def compile_script(lines, name: str = "<script>") -> Program:
+    """Compile the lines of a script. Raises ScriptError if its blocks don't match up."""
+    code = []
+    blocks = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line == "}":
+            if not blocks:
+                raise ScriptError(f"{name}:{line_no}: '}}' without an if block to end")
+            start = blocks.pop()
+            code[start][2] = len(code)
+            continue
+        if line.endswith("{"):
+            head = line[:-1].strip()
+            if not head.startswith("if "):
+                raise ScriptError(f"{name}:{line_no}: only if blocks can be started with '{{'")
+            cond = head[3:].strip()
+            if cond.startswith("said "):
+                code.append([OP_SAID, cond[5:].strip(), None, line_no])
+            else:
+                code.append([OP_IF, cond, None, line_no])
+            blocks.append(len(code) - 1)
+        elif line == "wait":
+            code.append([OP_WAIT, "", None, line_no])
+        elif line.startswith("sleep ") and line[6:].strip().isdigit():
+            code.append([OP_SLEEP, "", int(line[6:]), line_no])
+        elif line == "repeat":
+            code.append([OP_JUMP, "", 0, line_no])
+        else:
+            code.append([OP_COMMAND, line, None, line_no])
+    if blocks:
+        raise ScriptError(f"{name}:{code[blocks[-1]][3]}: if block is never ended with '}}'")
+    return Program([tuple(instruction) for instruction in code], name)
+
+
+def load(file_name: str) -> Program:
+    """Compile a script file, or get it from the cache if it hasn't changed since."""
+    path = os.path.abspath(file_name)
+    mtime = os.path.getmtime(path)
+    cached = _PROGRAMS.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="ascii") as file:
+        program = compile_script(file, file_name)
+    _PROGRAMS[path] = (mtime, program)
+    return program
+
+
+def _said(world, entity, text: str, since) -> bool:
+    """Whether text was said in the Room of entity, or to the World, since message number since."""
+    if since is None:
+        return False
+    for message in reversed(world.chat.messages):
+        if message.seq < since:
+            break
+        if message.room is not None and message.room is not entity.loc:
+            continue
+        said = message.text.split(" says: ", 1)[-1]
+        if text in (message.text, said):
+            return True
+    return False
+
+
+def run(program: Program, entity, world, steps: int):
+    #pylint: disable-next=line-too-long
+    """Run up to steps instructions of program for entity, carrying on from entity.pc. Returns how many turns until it should be run again, IDLE if the script has ended, or LISTEN if it's waiting for something to happen."""
+    code = program.link(world)
+    pc = start = entity.pc
+    since = entity.heard
+    ran = 0
+    delay = 1
+    acted = False
+    setinfomode(no_origin)
+    while ran < steps and pc < len(code):
+        op, arg, target = code[pc]
+        pc += 1
+        ran += 1
+        if op == OP_COMMAND:
+            if arg[0] is not None:
+                arg[0](arg[1], world, entity)
+                acted = True
+        elif op == OP_IF:
+            if arg[0] is None or not arg[0](arg[1], world, entity):
+                pc = target
+            else:
+                acted = True
+        elif op == OP_SAID:
+            if not _said(world, entity, arg, since):
+                pc = target
+            else:
+                acted = True
+        elif op == OP_JUMP:
+            pc = target
+        elif op == OP_WAIT:
+            break
+        elif op == OP_SLEEP:
+            delay = max(1, target)
+            break
+    entity.pc = pc
+    messages = world.chat.messages
+    entity.heard = messages[-1].seq + 1 if messages else 0
+    if pc >= len(code):
+        return IDLE
+    if not acted and pc == start and delay == 1:
+        return LISTEN
+    return delay
@@ -0,0 +1,181 @@
+"""Optional instrumentation of commands, Event Subscribers and Entity ticks.
+
+    stats = txtadv.stats.enable()
+    ...
+    stats.summary()                 # everything recorded so far, by kind and name
+    stats.top(txtadv.stats.COMMAND) # the commands that took the most time
+
+While it's on, every Command call, every Subscriber an Event triggers, every Entity tick and
+every line of input a World handles is timed, and the bytes of output sent while it ran are
+counted. Times and output are inclusive, so a command that runs another command counts the
+time of both. While it's off (the default) all that costs is checking that ACTIVE is None.
+"""
+import collections
+import json
+import os
+import time
+
+from txtadv import messaging
+
+# The kinds of things that are timed.
+DISPATCH = "dispatch"
+COMMAND = "command"
+SUBSCRIBER = "subscriber"
+TICK = "tick"
+KINDS = (DISPATCH, COMMAND, SUBSCRIBER, TICK)
+
+# The Stats being recorded to, or None when instrumentation is off.
+ACTIVE = None
+
+
+class Timing:
+    #pylint: disable-next=line-too-long
+    """How often something ran, for how long and how much output it sent. The tail latencies are worked out from the last keep runs."""
+    __slots__ = ("count", "total", "max", "output", "recent")
+
+    def __init__(self, keep: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.output = 0
+        self.recent = collections.deque(maxlen=keep)
+
+    def add(self, seconds: float, output: int) -> None:
+        """Record one run."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.output += output
+        self.recent.append(seconds)
+
+    def summary(self) -> dict:
+        """This Timing as a json-ready dict, with times in milliseconds."""
+        recent = sorted(self.recent)
+
+        def percentile(fraction):
+            if not recent:
+                return 0.0
+            return 1000 * recent[min(len(recent) - 1, int(fraction * len(recent)))]
+
+        return {
+            "count": self.count,
+            "total_ms": 1000 * self.total,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": 1000 * self.max,
+            "output_bytes": self.output,
+        }
+
+
+class Stats:
+    """The Timings of everything that was timed, by kind and name."""
+
+    def __init__(self, keep: int = 1000):
+        self.keep = keep
+        self.timings = {kind: {} for kind in KINDS}
+        self.started = time.time()
+
+    def record(self, kind: str, name: str, seconds: float, output: int = 0) -> None:
+        """Record one run of name."""
+        timings = self.timings.setdefault(kind, {})
+        timing = timings.get(name)
+        if timing is None:
+            timing = timings[name] = Timing(self.keep)
+        timing.add(seconds, output)
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        self.timings = {kind: {} for kind in KINDS}
+        self.started = time.time()
+
+    def summary(self) -> dict:
+        """Everything recorded so far as a json-ready dict."""
+        return {
+            "started": self.started,
+            "seconds": time.time() - self.started,
+            **{kind: {name: timing.summary() for name, timing in timings.items()}
+               for kind, timings in self.timings.items()},
+        }
+
+    def top(self, kind: str, count: int = 10, key: str = "total_ms") -> list:
+        """The count names of kind with the highest key, as (name, summary) pairs."""
+        found = [(name, timing.summary()) for name, timing in self.timings.get(kind, {}).items()]
+        found.sort(key=lambda pair: pair[1][key], reverse=True)
+        return found[:count]
+
+    def dump(self, file_name: str) -> None:
+        """Write the summary to a json file, replacing it in one go."""
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_name + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2)
+            file.write("\n")
+        os.replace(file_name + ".tmp", file_name)
+
+
+def enable(stats=None) -> Stats:
+    """Start recording to stats, or to a new Stats if it's None. Returns what is recorded to."""
+    #pylint: disable-next=global-statement
+    global ACTIVE
+    ACTIVE = Stats() if stats is None else stats
+    messaging.count_output(True)
+    return ACTIVE
+
+
+def disable():
+    """Stop recording. Returns the Stats that were recorded to, if any."""
+    #pylint: disable-next=global-statement
+    global ACTIVE
+    stats, ACTIVE = ACTIVE, None
+    messaging.count_output(False)
+    return stats
+
+
+def name_of(func) -> str:
+    """A readable name for a function, like module.Class.method."""
+    func = getattr(func, "func", func)
+    name = getattr(func, "__qualname__", None) or func.__class__.__qualname__
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+def timed(kind: str, name: str, func, *args, **kwargs):
+    """Call func(*args, **kwargs) and record how long it took and what it sent."""
+    stats = ACTIVE
+    if stats is None:
+        return func(*args, **kwargs)
+    sent = messaging.sent()
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        stats.record(kind, name, time.perf_counter() - start, messaging.sent() - sent)
+
+
+class Dumper:
+    #pylint: disable-next=line-too-long
+    """Dumps the Stats being recorded to file_name every interval seconds, on the scheduler of world."""
+
+    def __init__(self, world, file_name: str, interval: float = 60.0):
+        self.world = world
+        self.file_name = file_name
+        self.interval = interval
+        self._timer = None
+
+    def start(self) -> None:
+        """Start dumping."""
+        self.close()
+        self._timer = self.world.scheduler.after_seconds(self.interval, self._dump)
+
+    def _dump(self) -> None:
+        if ACTIVE is not None:
+            ACTIVE.dump(self.file_name)
+        self._timer = self.world.scheduler.after_seconds(self.interval, self._dump)
+
+    def close(self) -> None:
+        """Stop dumping."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
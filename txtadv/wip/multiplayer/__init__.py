@@ -1,3 +1,4 @@
 """Multiplayer support (Very WIP, don't use)"""
 
-SERVER = "" # https://txtadv-server.sdft.repl.co will be the default server eventually
+HOST = "127.0.0.1"
+PORT = 4000
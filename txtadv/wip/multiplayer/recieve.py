@@ -1,20 +1,24 @@
-"""Recieving messages on a multiplayer game"""
+"""Recieving events on a multiplayer game"""
 
-import json
-from txtadv.multiplayer import SERVER
 import txtadv
-import asyncio
-#import requests
+from txtadv.wip.multiplayer.server import Server
+
 
 class RecieveEvent(txtadv.Event):
-    """This event is used to trigger something when a event is recieved"""
-    def __init__(self, event: type):
-        super(self,RecieveEvent).__init__()
-        asyncio.ensure_future(self.listenFor(event))
-    async def listenFor(self, event: type):
-        if not event==txtadv.Event:
+    """This event is triggered every time an event of a type is published on a Server"""
+
+    def __init__(self, server: Server, event: type):
+        if not issubclass(event, txtadv.Event):
             raise TypeError("event is incorrect type, expected txtadv.Event")
-        while True:
-            data = requests.get(SERVER + "/event/" + event.__name__)
-            if json.loads(data).response is not None:
-                self.trigger(data=json.loads(data), event=event)
+        super().__init__()
+        self.server = server
+        self.event = event
+        self.subscriber = txtadv.Subscriber(self._recieve)
+        server.subscribe(event, self.subscriber)
+
+    def _recieve(self, **data):
+        self.trigger(data=data, event=self.event)
+
+    def close(self):
+        """Stop recieving events"""
+        self.server.unsubscribe(self.event, self.subscriber)
@@ -1,12 +1,12 @@
 """Sending multiplayer events"""
 
-import json
-from txtadv.multiplayer import SERVER
 import txtadv
-#import requests
+from txtadv.wip.multiplayer.server import Server
 
-def SendEvent(event: txtadv.Event) -> bool:
-    if not event==txtadv.Event:
+
+#pylint: disable-next=invalid-name
+def SendEvent(server: Server, event: type, **data) -> None:
+    """Publish an event on a Server"""
+    if not issubclass(event, txtadv.Event):
         raise TypeError("event is incorrect type, expected txtadv.Event")
-    data = requests.post(SERVER + "/event/" + event.__name__)
-    return json.loads(data).response
+    server.publish(event, **data)
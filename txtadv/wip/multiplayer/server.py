@@ -0,0 +1,135 @@
+"""A local TCP server for multiplayer games"""
+
+import asyncio
+import json
+import txtadv
+from txtadv.wip.multiplayer import HOST, PORT
+
+
+class SocketOutstream:
+    """An outstream that writes to a connected socket"""
+
+    def __init__(self, writer: asyncio.StreamWriter, encoding="utf-8"):
+        self.writer = writer
+        self.encoding = encoding
+
+    def write(self, text: str) -> None:
+        """Write text to the socket"""
+        if not self.writer.is_closing():
+            self.writer.write(text.encode(self.encoding))
+
+    def flush(self) -> None:
+        """The transport sends as soon as it can, so there's nothing to do here"""
+
+    def close(self) -> None:
+        """Close the socket"""
+        self.writer.close()
+
+
+class Server:
+    #pylint: disable-next=line-too-long
+    """A TCP server for a World. Every connection gets its own Player, and Events are pushed to everyone subscribed to them instead of being polled for."""
+
+    def __init__(self, world: txtadv.World, host: str = HOST, port: int = PORT):
+        self.world = world
+        self.host = host
+        self.port = port
+        self.connections = {}
+        self.subscribers = {}
+        self.listeners = {}
+        self._servers = []
+        world.chat_event.add_subscriber(txtadv.Subscriber(self._on_chat))
+        world.move_event.add_subscriber(txtadv.Subscriber(self._on_move))
+        world.leave_event.add_subscriber(txtadv.Subscriber(self._on_leave))
+
+    async def start(self, event_port=None) -> None:
+        #pylint: disable-next=line-too-long
+        """Start accepting connections. Players connect to Server.port, and if event_port isn't None, event listeners can connect to it and send `subscribe ChatEvent` to be pushed every ChatEvent as a line of json."""
+        server = await asyncio.start_server(self._connect, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._servers.append(server)
+        if event_port is not None:
+            server = await asyncio.start_server(self._listen, self.host, event_port)
+            self.event_port = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+
+    async def serve_forever(self, prompt: str = "> ", event_port=None) -> None:
+        """Start the server and run the World until World.stop is called"""
+        await self.start(event_port)
+        try:
+            await self.world.run_async(prompt, stop_when_empty=False)
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop accepting connections and disconnect everyone"""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        for player in list(self.connections):
+            self.world.remove_player(player)
+        for writer in list(self.listeners):
+            writer.close()
+        self.listeners = {}
+
+    def subscribe(self, event: type, subscriber: txtadv.Subscriber) -> None:
+        """Make subscriber be called with the data of every event of that type that is published"""
+        self.subscribers.setdefault(event.__name__, []).append(subscriber)
+
+    def unsubscribe(self, event: type, subscriber: txtadv.Subscriber) -> None:
+        """Stop calling subscriber for events of that type"""
+        if subscriber in self.subscribers.get(event.__name__, []):
+            self.subscribers[event.__name__].remove(subscriber)
+
+    def publish(self, event: type, **data) -> None:
+        """Push an event to everyone subscribed to it"""
+        for sub in list(self.subscribers.get(event.__name__, [])):
+            sub(**data)
+        line = None
+        for writer, names in list(self.listeners.items()):
+            if event.__name__ in names and not writer.is_closing():
+                if line is None:
+                    line = json.dumps({"event": event.__name__, "data": data}) + "\n"
+                writer.write(line.encode())
+
+    async def _connect(self, reader, writer) -> None:
+        """Give a new connection its own Player"""
+        player = self.world.create_player(reader, SocketOutstream(writer))
+        self.connections[player] = writer
+
+    async def _listen(self, reader, writer) -> None:
+        """Read `subscribe <event>` and `unsubscribe <event>` lines from an event listener"""
+        self.listeners[writer] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode().split()
+                if len(words) != 2:
+                    continue
+                if words[0] == "subscribe":
+                    self.listeners[writer].add(words[1])
+                elif words[0] == "unsubscribe":
+                    self.listeners[writer].discard(words[1])
+        finally:
+            self.listeners.pop(writer, None)
+            writer.close()
+
+    def _on_chat(self, message, source, local=None) -> None:
+        self.publish(txtadv.ChatEvent,
+                     message=message,
+                     source=str(source),
+                     room=None if local is None else local.name)
+
+    def _on_move(self, player, old, new) -> None:
+        self.publish(txtadv.MoveEvent,
+                     player=player.name,
+                     old=None if old is None else old.name,
+                     new=None if new is None else new.name)
+
+    def _on_leave(self, player) -> None:
+        writer = self.connections.pop(player, None)
+        if writer is not None:
+            writer.close()